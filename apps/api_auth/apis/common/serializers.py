@@ -1,5 +1,20 @@
+from typing import Any
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
+from apps.api_auth.authentication import get_token_user
+from apps.api_auth.services.token_revocation import is_token_revoked, revoke_token
+from apps.api_auth.tokens import RefreshToken, UntypedToken
+from apps.api_auth.utils import TOKEN_VERSION_CLAIM, set_user_claims
 from apps.users.models import User
 
 # User Serializer
@@ -11,3 +26,75 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ["id", "user_type", "username", "email", "first_name", "last_name"]
         read_only_fields = ["id", "user_type", "username"]
+
+
+# Token Serializers
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Same as `TokenRefreshSerializer`, but rejects revoked refresh tokens and revokes the rotated ones.
+    The user is read from the cache, and the revocation filter rules out most tokens,
+    so a refresh usually needs no query.
+    """
+
+    token_class = RefreshToken
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, str]:
+        refresh = self.token_class(attrs["refresh"])
+        assert isinstance(refresh, RefreshToken)
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        user = get_token_user(str(user_id), refresh.get(TOKEN_VERSION_CLAIM, 0)) if user_id else None
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        if is_token_revoked(refresh, user):
+            raise TokenError(_("Token is revoked"))
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_token(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            # The user may have changed since the token was issued
+            set_user_claims(refresh, user)
+            return {"access": str(refresh.access_token), "refresh": str(refresh)}
+        return {"access": str(refresh.access_token)}
+
+
+class KeyRingTokenVerifySerializer(TokenVerifySerializer):
+    """Same as `TokenVerifySerializer`, but for tokens signed with the configured keys."""
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        UntypedToken(attrs["token"])
+        return {}
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        revoke_token(RefreshToken(attrs["refresh"]))
+        return {}
+
+
+class TokenIntrospectSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.TOKEN_INTROSPECTION_MAX_TOKENS,
+        write_only=True,
+    )
+
+
+class TokenIntrospectionSerializer(serializers.Serializer):
+    active = serializers.BooleanField()
+    token_type = serializers.CharField(allow_null=True)
+    claims = serializers.DictField(allow_null=True)
+    expires_at = serializers.DateTimeField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
+
+
+class TokenIntrospectResponseSerializer(serializers.Serializer):
+    results = TokenIntrospectionSerializer(many=True)
@@ -1,19 +1,26 @@
 import structlog
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from rest_framework_simplejwt.serializers import (
-    TokenRefreshSerializer,
-    TokenVerifySerializer,
-)
 
-from apps.api_auth.apis.common.serializers import UserSerializer
+from apps.api_auth.apis.common.serializers import (
+    KeyRingTokenVerifySerializer,
+    RevocableTokenRefreshSerializer,
+    TokenIntrospectResponseSerializer,
+    TokenIntrospectSerializer,
+    TokenRevokeSerializer,
+    UserSerializer,
+)
+from apps.api_auth.services.token_introspection import introspect_tokens
+from apps.api_auth.services.token_revocation import revoke_user_tokens
+from apps.api_auth.throttling import TokenIPThrottle
+from apps.utils.permissions import IsTokenIntrospectionService
 from apps.utils.views import PublicEndpoint
 
 logger = structlog.get_logger(__name__)
@@ -34,15 +41,26 @@ class MeCommonViewSet(GenericViewSet):
         serializer = self.get_serializer(instance=self.request.user)
         return Response(status=status.HTTP_200_OK, data=serializer.data)
 
+    @extend_schema(request=None, responses={204: None})
+    @action(detail=False, methods=["post"], url_path="revoke-tokens")
+    def revoke_tokens(self, request: Request, *args, **kwargs):
+        """
+        Log out of every session: revoke all the refresh tokens issued to the current user.
+        Access tokens are rejected as well, except by the endpoints that trust the token claims alone.
+        """
+        revoke_user_tokens(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 # Token
 # ----------------------------------------------------------------------------------------------------------------------
 
 
 class TokenCommonViewSet(PublicEndpoint, GenericViewSet):
-    @extend_schema(responses={200: TokenVerifySerializer})
-    @action(detail=False, methods=["post"], serializer_class=TokenVerifySerializer)
-    @transaction.atomic
+    throttle_classes = (TokenIPThrottle,)
+
+    @extend_schema(responses={200: KeyRingTokenVerifySerializer})
+    @action(detail=False, methods=["post"], serializer_class=KeyRingTokenVerifySerializer)
     def verify(self, request: Request, *args, **kwargs):
         """Verify an access token."""
         try:
@@ -52,8 +70,8 @@ class TokenCommonViewSet(PublicEndpoint, GenericViewSet):
         except TokenError as e:
             raise InvalidToken(e.args[0])
 
-    @extend_schema(responses={200: TokenRefreshSerializer})
-    @action(detail=False, methods=["post"], serializer_class=TokenRefreshSerializer)
+    @extend_schema(responses={200: RevocableTokenRefreshSerializer})
+    @action(detail=False, methods=["post"], serializer_class=RevocableTokenRefreshSerializer)
     @transaction.atomic
     def refresh(self, request, *args, **kwargs):
         """Refresh an access token."""
@@ -63,3 +81,36 @@ class TokenCommonViewSet(PublicEndpoint, GenericViewSet):
             return Response(status=status.HTTP_200_OK, data=serializer.validated_data)
         except TokenError as e:
             raise InvalidToken(e.args[0])
+
+    @extend_schema(responses={204: None})
+    @action(detail=False, methods=["post"], serializer_class=TokenRevokeSerializer)
+    def revoke(self, request, *args, **kwargs):
+        """Revoke a refresh token (log out)."""
+        try:
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+    @extend_schema(
+        responses={200: TokenIntrospectResponseSerializer},
+        parameters=[OpenApiParameter("X-Service-Key", location=OpenApiParameter.HEADER, required=True)],
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        serializer_class=TokenIntrospectSerializer,
+        permission_classes=(IsTokenIntrospectionService,),
+    )
+    def introspect(self, request: Request, *args, **kwargs):
+        """
+        Check a batch of tokens: validity, claims and expiry of each, in the same order.
+        For services that validate many tokens, instead of verifying them one request at a time.
+        Only for the services holding a key (`TOKEN_INTROSPECTION_SERVICE_KEYS`), which must be sent as `X-Service-Key`.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = introspect_tokens(serializer.validated_data["tokens"])
+        res_serializer = TokenIntrospectResponseSerializer(instance={"results": results})
+        return Response(status=status.HTTP_200_OK, data=res_serializer.data)
@@ -1,6 +1,5 @@
 import structlog
-from django.contrib.auth import authenticate, get_user_model
-from django.db import transaction
+from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
@@ -15,46 +14,42 @@ from apps.api_auth.apis.customer.serializers import (
     LoginCustomerSerializer,
     UserAuthCustomerSerializer,
 )
+from apps.api_auth.throttling import LoginIPThrottle, LoginUsernameThrottle
 from apps.api_auth.utils import jwt_encode
 from apps.users.choices import UserTypes
+from apps.utils.throttling import FailFastThrottlingMixin
 from apps.utils.views import PublicEndpoint
 
 logger = structlog.get_logger(__name__)
-User = get_user_model()
 
 
 # Customer Login
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-class AuthCustomerViewSet(PublicEndpoint, GenericViewSet):
+class AuthCustomerViewSet(FailFastThrottlingMixin, PublicEndpoint, GenericViewSet):
     """
     Login using username/email and password.
     Used by the web portals specially for Customers.
     But can be used by any user that has password authentication set-up.
     """
 
+    # By IP first, the account throttle needs the request body
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
+
     @extend_schema(responses={200: LoginCustomerResponseSerializer})
     @action(detail=False, methods=["post"], serializer_class=LoginCustomerSerializer)
-    @transaction.atomic
     def login(self, request: Request, *args, **kwargs):
         """Login using username/email and password."""
+        # Not in a transaction, so no connection is held open while the password hash is verified
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get("username")
         email = serializer.validated_data.get("email")
         password = serializer.validated_data.get("password")
 
-        # Try to infer the username using the email given
-        if email is not None:
-            try:
-                tmp_user = User.objects.get(email=email, user_type=UserTypes.CUSTOMER)
-                username = tmp_user.get_username()
-            except (User.DoesNotExist, User.MultipleObjectsReturned):
-                pass
-
-        # Authenticate using username and password
-        user = authenticate(request, username=username, password=password)
+        # Username or email are resolved in a single query by the authentication backend
+        user = authenticate(request, username=username, email=email, password=password)
         if user is None:
             raise ValidationError(_("Unable to log in with provided credentials"))
         if user.user_type != UserTypes.CUSTOMER:
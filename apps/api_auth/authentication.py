@@ -0,0 +1,99 @@
+from typing import Optional
+
+from django.conf import settings
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.api_auth.services.token_revocation import is_revoked_with_user_tokens
+from apps.api_auth.utils import TOKEN_VERSION, TOKEN_VERSION_CLAIM
+from apps.users.models import User
+from apps.utils.cache import cache_function_result
+from apps.utils.cache_codecs import ModelCodec
+
+
+@cache_function_result(
+    "jwt_user",
+    timeout=settings.JWT_USER_CACHE_TIMEOUT,
+    # v2: without the password hash
+    version=2,
+    tags=lambda user_id, token_version: [f"user:{user_id}"],
+    # Password hashes stay in the database, the cached user's `password` is deferred
+    codec=ModelCodec(exclude=["password"]),
+)
+def get_token_user(user_id: str, token_version: int) -> Optional[User]:
+    """User of an access token. Cached until the user is saved or deleted (`user:<id>` tag)."""
+    return User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+
+
+@cache_function_result(
+    "jwt_user_password",
+    timeout=settings.JWT_USER_CACHE_TIMEOUT,
+    tags=lambda user_id: [f"user:{user_id}"],
+)
+def get_token_user_password_digest(user_id: str) -> Optional[str]:
+    """Digest of the password hash of a user, checked against the tokens with `CHECK_REVOKE_TOKEN`."""
+    password = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list("password", flat=True).first()
+    return get_md5_hash_password(password) if password is not None else None
+
+
+def get_token_users(keys: list[tuple[str, int]]) -> list[Optional[User]]:
+    """
+    Users of several tokens, same as `get_token_user` for each `(user_id, token_version)` in `keys`, but with a
+    single cache round trip and a single query for the users missing from the cache.
+    """
+
+    def load_users(calls: list[tuple]) -> list[Optional[User]]:
+        users = User.objects.filter(
+            **{f"{api_settings.USER_ID_FIELD}__in": {user_id for user_id, _ in calls}}
+        ).order_by()
+        users_by_id = {str(getattr(user, api_settings.USER_ID_FIELD)): user for user in users}
+        return [users_by_id.get(user_id) for user_id, _ in calls]
+
+    return get_token_user.get_many(keys, load_users)  # type: ignore[attr-defined]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Same as `JWTAuthentication`, but the user is read from the cache instead of being queried on every request.
+    """
+
+    def get_user(self, validated_token: Token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_token_user(str(user_id), validated_token.get(TOKEN_VERSION_CLAIM, 0))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if is_revoked_with_user_tokens(validated_token, user):
+            raise AuthenticationFailed(_("Token is revoked"), code="token_revoked")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            password_digest = get_token_user_password_digest(str(user_id))
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    Builds a lightweight user (`TokenUser`) from the signed claims of the access token, without any lookup.
+    Only for views that need nothing but the user id, `user_type` and `is_active`: the claims are as old as
+    the token, so changes to the user are only seen once the token is refreshed.
+    Tokens issued before these claims existed fall back to the cached user lookup.
+    """
+
+    def get_user(self, validated_token: Token):
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) < TOKEN_VERSION:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token.get("is_active", False):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return api_settings.TOKEN_USER_CLASS(validated_token)
@@ -0,0 +1,86 @@
+from typing import Optional
+
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Upper
+
+from apps.api_auth.services.password_hashing import hash_password, verify_password
+from apps.users.choices import UserTypes
+from apps.users.models import User
+
+
+class OffloadedModelBackend(ModelBackend):
+    """
+    Same as `ModelBackend`, but passwords are hashed in the bounded password hashing pool,
+    so a burst of logins cannot take up the CPU of every request worker.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+        user = self.get_user_by_credentials(username, **kwargs)
+        if user is None:
+            # Hash the password anyway, so a missing user takes as long as a wrong password
+            hash_password(password)
+            return None
+
+        is_correct, must_update = verify_password(password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            # Hasher parameters changed, store the hash with the new ones
+            user.set_password(password)
+            user.save(update_fields=["password"])
+        return user
+
+    def get_user_by_credentials(self, username=None, **kwargs) -> Optional[User]:
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None:
+            return None
+        try:
+            return User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            return None
+
+
+class UsernameOrEmailBackend(OffloadedModelBackend):
+    """
+    Authenticates with a username or an email (case insensitive), looking the user up with a single query.
+    Emails are not unique, so they only identify users of `email_user_types`, and only if a single one matches.
+    If both are given, the email is tried first.
+    """
+
+    email_user_types = [UserTypes.CUSTOMER]
+
+    def get_user_by_credentials(self, username=None, email=None, **kwargs) -> Optional[User]:
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None and email is None:
+            return None
+
+        users = list(self.filter_users(username, email))
+        if email is not None:
+            email_users = [
+                user
+                for user in users
+                if user.email is not None
+                and user.email.lower() == email.lower()
+                and user.user_type in self.email_user_types
+            ]
+            if len(email_users) == 1:
+                return email_users[0]
+        if username is not None:
+            return next((user for user in users if user.get_username() == username), None)
+        return None
+
+    def filter_users(self, username: Optional[str], email: Optional[str]) -> QuerySet[User]:
+        """Users of the username or the email, both served by an index."""
+        query = Q()
+        if username is not None:
+            query |= Q(**{User.USERNAME_FIELD: username})
+        if email is not None:
+            # Same expression as the index of emails
+            query |= Q(email_upper=Upper(Value(email)), user_type__in=self.email_user_types)
+        # No ordering, there are a few rows at most
+        return User._default_manager.alias(email_upper=Upper("email")).filter(query).order_by()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.api_auth.services.token_revocation import rebuild_revocation_filter
+
+
+class Command(BaseCommand):
+    help = "Deletes expired revoked tokens and rebuilds the revoked tokens filter in redis (run it daily)"
+
+    def handle(self, *args, **options):
+        rebuild_revocation_filter()
+        self.stdout.write(self.style.SUCCESS("Revoked tokens filter rebuilt"))
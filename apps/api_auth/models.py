@@ -0,0 +1,21 @@
+from django.db import models
+from model_utils.models import TimeStampedModel
+
+# Revoked Token
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class RevokedToken(TimeStampedModel, models.Model):
+    """
+    Refresh tokens that were revoked (logged out or rotated) before they expired.
+    Only read when the revocation filter (see `apps.api_auth.services.token_revocation`) reports a possible match.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-created"]
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+import structlog
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import Throttled
+
+logger = structlog.get_logger(__name__)
+
+# Argon2 releases the GIL while hashing, so a thread pool is enough to run hashes in parallel.
+# It is created lazily, per process, so gunicorn/celery forks do not inherit a pool without threads.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+# Bounds the number of hashes running or waiting for a thread
+_slots: Optional[threading.BoundedSemaphore] = None
+
+
+class PasswordHashingBusy(Throttled):
+    # A 4xx, so shedding load is not reported as a server error
+    default_detail = _("Too many login attempts are being processed, try again shortly.")
+    default_code = "password_hashing_busy"
+
+    def __init__(self):
+        super().__init__(wait=1)
+
+
+def verify_password(password: str, encoded: str) -> tuple[bool, bool]:
+    """
+    Verify a password against its hash in the password hashing pool.
+
+    Returns:
+        Whether the password is correct, and whether the hash must be updated (eg. hasher parameters changed).
+
+    Raises:
+        PasswordHashingBusy: If too many hashes are already queued, or the hash is not done in time.
+    """
+    must_update = []
+    is_correct = _run(check_password, password, encoded, setter=lambda _: must_update.append(True))
+    return is_correct, bool(must_update)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password in the password hashing pool. See `verify_password`."""
+    return _run(make_password, password)
+
+
+def _run(fn, *args, **kwargs):
+    executor, slots = _get_executor()
+    # Shed load instead of queueing up requests that would time out anyway
+    if not slots.acquire(blocking=False):
+        logger.warning("password hashing queue is full")
+        raise PasswordHashingBusy()
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=settings.PASSWORD_HASHING_TIMEOUT)
+    except FutureTimeoutError:
+        logger.warning("password hashing timed out")
+        raise PasswordHashingBusy()
+
+
+def _get_executor() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _executor, _executor_pid, _slots
+    pid = os.getpid()
+    if _executor is None or _slots is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _slots is None or _executor_pid != pid:
+                workers = settings.PASSWORD_HASHING_WORKERS
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hashing")
+                _slots = threading.BoundedSemaphore(workers + settings.PASSWORD_HASHING_MAX_QUEUE)
+                _executor_pid = pid
+    return _executor, _slots
+
+
+@receiver(setting_changed)
+def reset_password_hashing_pool(setting, **kwargs):
+    global _executor, _slots
+    if setting in ("PASSWORD_HASHING_WORKERS", "PASSWORD_HASHING_MAX_QUEUE"):
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor, _slots = None, None
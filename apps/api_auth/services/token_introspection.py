@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.api_auth.authentication import get_token_users
+from apps.api_auth.services.token_revocation import (
+    get_revoked_jtis,
+    is_revoked_with_user_tokens,
+)
+from apps.api_auth.tokens import UntypedToken
+from apps.api_auth.utils import TOKEN_VERSION_CLAIM
+
+
+def introspect_tokens(raw_tokens: list[str]) -> list[dict[str, Any]]:
+    """
+    Validity, claims and expiry of each token, in the same order.
+
+    Signatures are checked in process. Users are read from the cache all at once (see `get_token_users`), and the
+    ids of refresh tokens are checked against the revocation filter all at once, so the database is only queried
+    once for cache misses and once for possibly revoked tokens.
+    """
+    results: list[dict[str, Any]] = []
+    tokens: list[Optional[UntypedToken]] = []
+    for raw_token in raw_tokens:
+        try:
+            tokens.append(UntypedToken(raw_token))  # type: ignore[arg-type]
+            results.append({"active": True, "error": None})
+        except TokenError as e:
+            tokens.append(None)
+            results.append({"active": False, "error": str(e.args[0])})
+
+    refresh_jtis = [
+        token[api_settings.JTI_CLAIM]
+        for token in tokens
+        if token is not None and token.get(api_settings.TOKEN_TYPE_CLAIM) == "refresh"
+    ]
+    revoked_jtis = get_revoked_jtis(refresh_jtis)
+    # Users of all the tokens are read together, the ones missing from the cache with a single query
+    user_keys = list(
+        {
+            (str(token[api_settings.USER_ID_CLAIM]), token.get(TOKEN_VERSION_CLAIM, 0))
+            for token in tokens
+            if token is not None and token.get(api_settings.USER_ID_CLAIM)
+        }
+    )
+    users = dict(zip(user_keys, get_token_users(user_keys)))
+
+    for token, result in zip(tokens, results):
+        if token is None:
+            result.update({"token_type": None, "claims": None, "expires_at": None})
+            continue
+        result.update(
+            {
+                "token_type": token.get(api_settings.TOKEN_TYPE_CLAIM),
+                "claims": token.payload,
+                "expires_at": datetime.fromtimestamp(token["exp"], tz=timezone.utc),
+            }
+        )
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        user = users.get((str(user_id), token.get(TOKEN_VERSION_CLAIM, 0))) if user_id else None
+        if user is None:
+            result.update({"active": False, "error": _("User not found")})
+        elif not user.is_active:
+            result.update({"active": False, "error": _("User is inactive")})
+        elif is_revoked_with_user_tokens(token, user) or token.get(api_settings.JTI_CLAIM) in revoked_jtis:
+            result.update({"active": False, "error": _("Token is revoked")})
+    return results
@@ -0,0 +1,207 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import structlog
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone as django_timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from apps.api_auth.models import RevokedToken
+from apps.api_auth.utils import TOKEN_GENERATION_CLAIM
+from apps.users.models import User
+from apps.utils.cache import get_redis_client, invalidate_tag
+from apps.utils.cache_breaker import CACHE_BACKEND_ERRORS, cache_breaker
+
+logger = structlog.get_logger(__name__)
+
+# Bloom filter of the `jti` of revoked refresh tokens, a redis bitmap.
+# A miss means the token is not revoked. A hit is confirmed against the `RevokedToken` table.
+REVOCATION_FILTER_KEY = "revoked_tokens:bloom"
+# Held from when a lost filter is found until it is rebuilt, so only one rebuild is enqueued
+REVOCATION_FILTER_LOCK_KEY = "revoked_tokens:bloom:lock"
+# Time (in seconds) after which the rebuild is enqueued again, if the enqueued one has not finished (eg. no worker)
+REVOCATION_FILTER_LOCK_TIMEOUT = 10 * 60
+# Revocations created while the filter is rebuilt are added again once it is swapped in
+REVOCATION_FILTER_REBUILD_MARGIN = timedelta(minutes=1)
+# Sets the bits of revoked tokens in the filter. A missing filter is left missing, as it would not hold
+# the tokens revoked before, and a rebuild from the database is enqueued instead when it is next read.
+SET_BITS_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV do
+    redis.call("SETBIT", KEYS[1], ARGV[i], 1)
+end
+return 1
+"""
+
+
+def revoke_token(token: Token):
+    """Revoke a refresh token, until it expires. A single insert (ignored if already revoked) and a filter update."""
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token["exp"], tz=timezone.utc)
+    RevokedToken.objects.bulk_create([RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True)
+    _add_to_filter([jti])
+
+
+def revoke_user_tokens(user_id):
+    """
+    Revoke every token issued to a user until now, with a single update of the user.
+    Tokens carry the generation they were issued in, so tokens issued right after (even in the same second) are valid.
+    """
+    User.objects.filter(pk=user_id).update(
+        token_generation=F("token_generation") + 1, tokens_revoked_at=django_timezone.now()
+    )
+    invalidate_tag(f"user:{user_id}")
+
+
+def is_token_revoked(token: Token, user: User) -> bool:
+    """
+    Whether a token was revoked, by itself or with all tokens of its user.
+    Tokens are only looked up in the database if the revocation filter might contain them.
+    """
+    if is_revoked_with_user_tokens(token, user):
+        return True
+    jti = token.get(api_settings.JTI_CLAIM)
+    return jti is not None and bool(get_revoked_jtis([jti]))
+
+
+def is_revoked_with_user_tokens(token: Token, user: User) -> bool:
+    """Whether a token was issued before all the tokens of its user were revoked (see `revoke_user_tokens`)."""
+    if TOKEN_GENERATION_CLAIM in token:
+        return token[TOKEN_GENERATION_CLAIM] < user.token_generation
+    # Issued before tokens had a generation, `iat` is in whole seconds
+    return user.tokens_revoked_at is not None and token.get("iat", 0) < user.tokens_revoked_at.timestamp()
+
+
+def get_revoked_jtis(jtis: list[str]) -> set[str]:
+    """
+    The revoked ones of the given token ids, checked with a single filter lookup,
+    and a single query for the ones the filter might contain.
+    """
+    candidates = _filter_possibly_revoked(jtis)
+    if not candidates:
+        return set()
+    return set(RevokedToken.objects.filter(jti__in=candidates).values_list("jti", flat=True))
+
+
+def rebuild_revocation_filter():
+    """
+    Build the revocation filter from the tokens that are revoked and not expired yet, and swap it in.
+    Expired tokens are dropped from the filter (so it does not fill up) and from the database.
+    """
+    started_at = django_timezone.now()
+    RevokedToken.objects.filter(expires_at__lte=started_at).delete()
+    client = get_redis_client()
+    if client is None:
+        return
+
+    building_key = f"{REVOCATION_FILTER_KEY}:{uuid.uuid4().hex}"
+    # Allocates the whole bitmap, so an empty filter still exists
+    client.setbit(building_key, settings.TOKEN_REVOCATION_FILTER_BITS - 1, 0)
+    jtis = RevokedToken.objects.filter(expires_at__gt=started_at).values_list("jti", flat=True)
+    batch: list[str] = []
+    for jti in jtis.iterator(chunk_size=2000):
+        batch.append(jti)
+        if len(batch) >= 2000:
+            _set_bits(client, building_key, batch)
+            batch = []
+    _set_bits(client, building_key, batch)
+    client.rename(building_key, REVOCATION_FILTER_KEY)
+
+    # Revocations added to the previous filter while this one was built
+    created_since = started_at - REVOCATION_FILTER_REBUILD_MARGIN
+    _set_bits(client, REVOCATION_FILTER_KEY, list(jtis.filter(created__gte=created_since)))
+    logger.info("token revocation filter rebuilt", duration=(django_timezone.now() - started_at).total_seconds())
+
+
+def rebuild_missing_revocation_filter():
+    """Rebuild the filter found missing by a request (see `tasks.rebuild_token_revocation_filter`)."""
+    try:
+        rebuild_revocation_filter()
+    finally:
+        client = get_redis_client()
+        if client is not None:
+            client.delete(REVOCATION_FILTER_LOCK_KEY)
+
+
+def _filter_possibly_revoked(jtis: list[str]) -> list[str]:
+    if not jtis:
+        return []
+    client = get_redis_client()
+    if client is None or not cache_breaker.allow_request():
+        # No filter to rule the tokens out
+        return jtis
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.exists(REVOCATION_FILTER_KEY)
+        for jti in jtis:
+            operation = pipe.bitfield(REVOCATION_FILTER_KEY)
+            for position in _get_bit_positions(jti):
+                operation.get("u1", position)
+            operation.execute()
+        exists, *bits = pipe.execute()
+    except CACHE_BACKEND_ERRORS as e:
+        cache_breaker.record_failure(e)
+        logger.warning("could not check token revocation filter", e=e)
+        return jtis
+    cache_breaker.record_success()
+
+    if not exists:
+        # Never built or lost (eg. redis was flushed), the database has every revoked token until it is rebuilt
+        _enqueue_filter_rebuild(client)
+        return jtis
+    return [jti for jti, jti_bits in zip(jtis, bits) if all(jti_bits)]
+
+
+def _enqueue_filter_rebuild(client):
+    # Imported here, the tasks module imports this one
+    from apps.api_auth.tasks import rebuild_token_revocation_filter
+
+    try:
+        if not client.set(REVOCATION_FILTER_LOCK_KEY, 1, nx=True, ex=REVOCATION_FILTER_LOCK_TIMEOUT):
+            return
+    except CACHE_BACKEND_ERRORS as e:
+        cache_breaker.record_failure(e)
+        logger.error("could not enqueue token revocation filter rebuild", e=e)
+        return
+
+    logger.warning("token revocation filter is missing, enqueuing a rebuild")
+    try:
+        rebuild_token_revocation_filter.delay()
+    except Exception as e:
+        # The lock is kept until it expires, so requests do not all retry the broker in the meantime
+        logger.error("could not enqueue token revocation filter rebuild", e=e)
+
+
+def _add_to_filter(jtis: list[str]):
+    client = get_redis_client()
+    if client is None or not cache_breaker.allow_request():
+        # Missed revocations are added by the next `rebuild_revocation_filter`
+        return
+    try:
+        _set_bits(client, REVOCATION_FILTER_KEY, jtis)
+    except CACHE_BACKEND_ERRORS as e:
+        cache_breaker.record_failure(e)
+        logger.error("could not add tokens to revocation filter, it must be rebuilt", jtis=jtis, e=e)
+    else:
+        cache_breaker.record_success()
+
+
+def _set_bits(client, key: str, jtis: list[str]):
+    if not jtis:
+        return
+    positions = [position for jti in jtis for position in _get_bit_positions(jti)]
+    client.register_script(SET_BITS_SCRIPT)(keys=[key], args=positions)
+
+
+def _get_bit_positions(jti: str) -> list[int]:
+    # Double hashing, k positions from two 64 bit hashes
+    digest = hashlib.sha256(jti.encode()).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:16], "big") | 1
+    size = settings.TOKEN_REVOCATION_FILTER_BITS
+    return [(h1 + i * h2) % size for i in range(settings.TOKEN_REVOCATION_FILTER_HASHES)]
@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt import ExpiredSignatureError, InvalidAlgorithmError, InvalidTokenError
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from rest_framework_simplejwt import settings as simplejwt_settings
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import (
+    TokenBackendError,
+    TokenBackendExpiredToken,
+)
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    private_key: Any
+    public_key: Any
+    # Public key as published in the JWKS
+    jwk: dict[str, str]
+
+
+def load_signing_key(pem: bytes) -> SigningKey:
+    """Load a P-256 (ES256) or Ed25519 (EdDSA) private key in PEM format."""
+    private_key = serialization.load_pem_private_key(pem, password=None)
+    if isinstance(private_key, ec.EllipticCurvePrivateKey) and isinstance(private_key.curve, ec.SECP256R1):
+        algorithm, jwk = "ES256", ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+        thumbprint_members: tuple[str, ...] = ("crv", "kty", "x", "y")
+    elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+        algorithm, jwk = "EdDSA", OKPAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+        thumbprint_members = ("crv", "kty", "x")
+    else:
+        raise ImproperlyConfigured("JWT signing keys must be P-256 (ES256) or Ed25519 (EdDSA) private keys")
+
+    # The key id is the RFC 7638 thumbprint of the key, so it needs no configuration and changes with the key
+    thumbprint = json.dumps({member: jwk[member] for member in thumbprint_members}, separators=(",", ":"))
+    kid = base64.urlsafe_b64encode(hashlib.sha256(thumbprint.encode()).digest()).rstrip(b"=").decode()
+    jwk = {**jwk, "kid": kid, "alg": algorithm, "use": "sig"}
+    return SigningKey(kid, algorithm, private_key, private_key.public_key(), jwk)
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    Signs tokens with the first of the keys, and sets its id in the `kid` header. Tokens are verified with the key
+    of their `kid`, so the keys can be rotated: publish a new key at the end of the list, make it the first one
+    once every verifier has fetched it (see `JWKS_CACHE_MAX_AGE`), and remove the old key once the tokens it
+    signed have expired (see `REFRESH_TOKEN_LIFETIME`).
+
+    Without keys, tokens are signed and verified as configured in `SIMPLE_JWT` (HS256 by default).
+    Tokens without `kid` are verified that way as well, while `JWT_VERIFY_LEGACY_TOKENS` is on.
+    """
+
+    def __init__(self, keys: list[SigningKey], verify_legacy_tokens: bool = True):
+        api_settings = simplejwt_settings.api_settings
+        super().__init__(
+            api_settings.ALGORITHM,
+            api_settings.SIGNING_KEY,
+            api_settings.VERIFYING_KEY,
+            api_settings.AUDIENCE,
+            api_settings.ISSUER,
+            api_settings.JWK_URL,
+            api_settings.LEEWAY,
+            api_settings.JSON_ENCODER,
+        )
+        self.active_key: Optional[SigningKey] = keys[0] if keys else None
+        self.keys = {key.kid: key for key in keys}
+        self.verify_legacy_tokens = verify_legacy_tokens or not keys
+        self.jwks = {"keys": [key.jwk for key in keys]}
+        self.jwks_etag = hashlib.sha256(json.dumps(self.jwks, sort_keys=True).encode()).hexdigest()[:32]
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        if self.active_key is None:
+            return super().encode(payload)
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+        return jwt.encode(
+            jwt_payload,
+            self.active_key.private_key,
+            algorithm=self.active_key.algorithm,
+            headers={"kid": self.active_key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify: bool = True) -> dict[str, Any]:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+        if kid is None:
+            if not self.verify_legacy_tokens:
+                raise TokenBackendError(_("Token is invalid"))
+            return super().decode(token, verify=verify)
+        key = self.keys.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid"))
+
+        try:
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={"verify_aud": self.audience is not None, "verify_signature": verify},
+            )
+        except InvalidAlgorithmError as e:
+            raise TokenBackendError(_("Invalid algorithm specified")) from e
+        except ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken(_("Token is expired")) from e
+        except InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+
+@cache
+def get_token_backend() -> KeyRingTokenBackend:
+    """Token backend of the configured keys, loaded once per process."""
+    keys = [load_signing_key(Path(path).read_bytes()) for path in settings.JWT_SIGNING_KEY_FILES]
+    return KeyRingTokenBackend(keys, verify_legacy_tokens=settings.JWT_VERIFY_LEGACY_TOKENS)
+
+
+@receiver(setting_changed)
+def reset_token_backend(setting, **kwargs):
+    if setting in ("SIMPLE_JWT", "JWT_SIGNING_KEY_FILES", "JWT_VERIFY_LEGACY_TOKENS"):
+        get_token_backend.cache_clear()
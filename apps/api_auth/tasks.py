@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from apps.api_auth.services.token_revocation import rebuild_missing_revocation_filter
+
+
+@shared_task
+def rebuild_token_revocation_filter():
+    """Rebuild the token revocation filter, enqueued by the first request that finds it missing."""
+    rebuild_missing_revocation_filter()
@@ -1,11 +1,11 @@
 import logging
 
-from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.users.models import User
+from apps.utils.testing import TestCase
 
 
 class AuthMeTestCase(TestCase):
@@ -1,20 +1,29 @@
 import logging
 
 import jwt
-from django.test import TestCase, override_settings
+from django.conf import settings
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.api_auth.services.token_revocation import revoke_token
 from apps.api_auth.utils import jwt_encode
 from apps.users.models import User
+from apps.utils.cache import clear_caches
+from apps.utils.testing import TestCase
+from apps.utils.throttling import local_token_buckets
 
 
 class AuthTokenTestCase(TestCase):
     def setUp(self):
         logging.disable(logging.CRITICAL)
+        local_token_buckets.clear()
         self.user = User.objects.create_user(username="testuser", password="password")
 
+    def tearDown(self):
+        clear_caches()
+
     # ------------------------------------------------------------------------------------------------------------------
     def test_token_verify_accepts_valid_access_token(self):
         client = APIClient()
@@ -58,3 +67,84 @@ class AuthTokenTestCase(TestCase):
         url = reverse("common-auth-token-refresh")
         response = client.post(url, {"refresh": "blahblah"}, format="json")
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @override_settings(TOKEN_INTROSPECTION_SERVICE_KEYS=["service-key"])
+    def test_token_introspect_checks_batch_of_tokens(self):
+        access_token, refresh_token = jwt_encode(self.user)
+        _, revoked_refresh_token = jwt_encode(self.user)
+        revoke_token(revoked_refresh_token)
+        client = APIClient()
+        client.credentials(HTTP_X_SERVICE_KEY="service-key")
+        url = reverse("common-auth-token-introspect")
+        tokens = [str(access_token), "blahblah", str(refresh_token), str(revoked_refresh_token)]
+
+        client.post(url, {"tokens": tokens}, format="json")
+        # Users are cached, and the revoked refresh tokens are looked up together
+        with self.assertNumQueries(1):
+            response = client.post(url, {"tokens": tokens}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual([result["active"] for result in results], [True, False, True, False])
+        self.assertEqual(results[0]["token_type"], "access")
+        self.assertEqual(results[0]["claims"]["user_id"], str(self.user.id))
+        self.assertIsNotNone(results[0]["expires_at"])
+        self.assertIsNone(results[1]["claims"])
+        self.assertEqual(results[3]["error"], "Token is revoked")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @override_settings(TOKEN_INTROSPECTION_SERVICE_KEYS=["service-key"])
+    def test_token_introspect_reads_users_of_cold_cache_with_one_query(self):
+        users = [User.objects.create_user(username=f"user{i}", password="password") for i in range(50)]
+        tokens = [str(jwt_encode(user)[0]) for user in users]
+        client = APIClient()
+        client.credentials(HTTP_X_SERVICE_KEY="service-key")
+        url = reverse("common-auth-token-introspect")
+
+        clear_caches()
+        # Warms up the global settings, read by the maintenance middleware
+        client.post(url, {"tokens": ["blahblah"]}, format="json")
+        with self.assertNumQueries(1):
+            response = client.post(url, {"tokens": tokens}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertTrue(all(result["active"] for result in results))
+        self.assertEqual([result["claims"]["user_id"] for result in results], [str(user.id) for user in users])
+
+        # The users are cached for the next batch, and for the authentication of their requests
+        with self.assertNumQueries(0):
+            response = client.post(url, {"tokens": tokens}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @override_settings(TOKEN_INTROSPECTION_SERVICE_KEYS=["service-key"])
+    def test_token_introspect_requires_service_key(self):
+        access_token, _ = jwt_encode(self.user)
+        client = APIClient()
+        url = reverse("common-auth-token-introspect")
+
+        response = client.post(url, {"tokens": [str(access_token)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        client.credentials(HTTP_X_SERVICE_KEY="other-key")
+        response = client.post(url, {"tokens": [str(access_token)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        # A signed in user is not a service either
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        response = client.post(url, {"tokens": [str(access_token)]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        with override_settings(TOKEN_INTROSPECTION_SERVICE_KEYS=[]):
+            client.credentials(HTTP_X_SERVICE_KEY="")
+            response = client.post(url, {"tokens": [str(access_token)]}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @override_settings(TOKEN_INTROSPECTION_SERVICE_KEYS=["service-key"])
+    def test_token_introspect_rejects_empty_or_too_large_batches(self):
+        client = APIClient()
+        client.credentials(HTTP_X_SERVICE_KEY="service-key")
+        url = reverse("common-auth-token-introspect")
+        response = client.post(url, {"tokens": []}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        tokens = ["blahblah"] * (settings.TOKEN_INTROSPECTION_MAX_TOKENS + 1)
+        response = client.post(url, {"tokens": tokens}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,17 +1,25 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-from django.test import TestCase
+from django.contrib.auth.hashers import make_password
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from apps.api_auth.services import password_hashing
 from apps.users.choices import UserTypes
 from apps.users.models import User
+from apps.utils.testing import TestCase
+from apps.utils.throttling import local_token_buckets
 
 
 class EmployeeAuthTestCase(TestCase):
     def setUp(self):
         logging.disable(logging.CRITICAL)
+        local_token_buckets.clear()
         self.user = User.objects.create_user(
             username="testuser",
             email="testuser@example.com",
@@ -93,3 +101,100 @@ class EmployeeAuthTestCase(TestCase):
         url = reverse("customer-auth-login")
         response = client.post(url, {"username": "unsetuser", "password": "password"}, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_updates_password_hash_of_old_hasher(self):
+        self.user.password = make_password("password", hasher="pbkdf2_sha256")
+        self.user.save()
+
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        response = client.post(url, {"username": "testuser", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_is_rejected_when_password_hashing_queue_is_full(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        with (
+            ThreadPoolExecutor(max_workers=1) as executor,
+            mock.patch.object(password_hashing, "_get_executor", return_value=(executor, slots)),
+        ):
+            response = client.post(url, {"username": "testuser", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_concurrent_hashes_beyond_the_queue_are_rejected(self):
+        release = threading.Event()
+        results: list[str] = []
+
+        def slow_check_password(password, encoded, setter=None):
+            release.wait(timeout=5)
+            return True
+
+        def attempt():
+            try:
+                password_hashing.verify_password("password", "encoded")
+                results.append("verified")
+            except password_hashing.PasswordHashingBusy:
+                results.append("rejected")
+
+        with (
+            self.settings(PASSWORD_HASHING_WORKERS=2, PASSWORD_HASHING_MAX_QUEUE=1),
+            mock.patch.object(password_hashing, "check_password", slow_check_password),
+        ):
+            # Like request threads of a gunicorn worker, logging in at the same time
+            threads = [threading.Thread(target=attempt) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for _ in range(100):
+                if results.count("rejected") == 3:
+                    break
+                time.sleep(0.05)
+            self.assertEqual(results, ["rejected"] * 3)
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(sorted(results), ["rejected"] * 3 + ["verified"] * 3)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_looks_up_user_with_a_single_query(self):
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        # Warm up the global settings read by the middleware
+        client.post(url, {"email": "testuser@example.com", "password": "wrongpass"}, format="json")
+
+        with self.assertNumQueries(1):
+            response = client.post(url, {"email": "TestUser@Example.com", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["user"]["id"], str(self.user.id))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_fails_with_email_shared_by_customers(self):
+        User.objects.create_user(
+            username="otheruser", email="testuser@example.com", password="password", user_type=UserTypes.CUSTOMER
+        )
+
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        response = client.post(url, {"email": "testuser@example.com", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = client.post(
+            url, {"username": "otheruser", "email": "testuser@example.com", "password": "password"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_hashes_password_of_unknown_user(self):
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        with mock.patch("apps.api_auth.backends.hash_password") as hash_password:
+            response = client.post(url, {"email": "wrong@example.com", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        hash_password.assert_called_once_with("password")
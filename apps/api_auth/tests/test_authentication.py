@@ -0,0 +1,139 @@
+import logging
+import pickle
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.api_auth.authentication import StatelessJWTAuthentication, get_token_user
+from apps.api_auth.utils import TOKEN_VERSION, jwt_encode
+from apps.users.choices import UserTypes
+from apps.users.models import User
+from apps.utils.cache import clear_caches
+from apps.utils.cache_breaker import shared_cache
+from apps.utils.testing import TestCase
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.user = User.objects.create_user(
+            username="testuser", password="password", first_name="Test", user_type=UserTypes.CUSTOMER
+        )
+
+    def tearDown(self):
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_user_is_read_from_cache(self):
+        access_token, _ = jwt_encode(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        url = reverse("common-auth-me")
+
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], str(self.user.id))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_password_hash_is_not_cached(self):
+        access_token, _ = jwt_encode(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        with mock.patch.object(shared_cache, "set", wraps=shared_cache.set) as cache_set:
+            response = client.get(reverse("common-auth-me"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        payloads = [pickle.dumps(call.args[1]) for call in cache_set.call_args_list]
+        self.assertTrue(payloads)
+        self.assertFalse(any(self.user.password.encode() in payload for payload in payloads))
+        user = get_token_user(str(self.user.id), TOKEN_VERSION)
+        assert user is not None
+        self.assertIn("password", user.get_deferred_fields())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_password_change_revokes_tokens_with_check_revoke_token(self):
+        # Modules keep the `api_settings` they imported, which `override_settings` replaces
+        with mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True):
+            access_token, _ = jwt_encode(self.user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+            url = reverse("common-auth-me")
+
+            self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+            with self.assertNumQueries(0):
+                self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+
+            self.user.set_password("new-password")
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.save()
+            self.assertEqual(client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cached_user_is_invalidated_on_save(self):
+        access_token, _ = jwt_encode(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        url = reverse("common-auth-me")
+
+        self.assertEqual(client.get(url).json()["first_name"], "Test")
+        self.user.first_name = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(client.get(url).json()["first_name"], "Changed")
+
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cached_user_is_invalidated_on_delete(self):
+        access_token, _ = jwt_encode(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        url = reverse("common-auth-me")
+
+        self.assertEqual(client.get(url).status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_stateless_user_is_built_from_claims(self):
+        access_token, _ = jwt_encode(self.user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+        with self.assertNumQueries(0):
+            result = StatelessJWTAuthentication().authenticate(request)
+        assert result is not None
+        user, _ = result
+        assert isinstance(user, TokenUser)
+        self.assertEqual(user.id, str(self.user.id))
+        self.assertEqual(user.user_type, UserTypes.CUSTOMER)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_stateless_rejects_inactive_user_claims(self):
+        self.user.is_active = False
+        access_token, _ = jwt_encode(self.user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+        with self.assertRaises(AuthenticationFailed):
+            StatelessJWTAuthentication().authenticate(request)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_stateless_looks_up_user_of_tokens_without_claims(self):
+        access_token = TokenObtainPairSerializer.get_token(self.user).access_token  # type: ignore[attr-defined]
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+        result = StatelessJWTAuthentication().authenticate(request)
+        assert result is not None
+        self.assertEqual(result[0], self.user)
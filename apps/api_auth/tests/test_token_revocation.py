@@ -0,0 +1,169 @@
+import logging
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.api_auth import tasks
+from apps.api_auth.models import RevokedToken
+from apps.api_auth.services import token_revocation
+from apps.api_auth.services.token_revocation import is_token_revoked, revoke_token
+from apps.api_auth.utils import TOKEN_GENERATION_CLAIM, jwt_encode
+from apps.users.choices import UserTypes
+from apps.users.models import User
+from apps.utils.cache import clear_caches
+from apps.utils.cache_breaker import cache_breaker
+from apps.utils.testing import TestCase
+from apps.utils.throttling import local_token_buckets
+
+
+class TokenRevocationTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        cache_breaker.reset()
+        local_token_buckets.clear()
+        self.user = User.objects.create_user(username="testuser", password="password", user_type=UserTypes.CUSTOMER)
+
+    def tearDown(self):
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_refresh_rotates_and_revokes_used_token(self):
+        _, refresh_token = jwt_encode(self.user)
+        client = APIClient()
+        url = reverse("common-auth-token-refresh")
+
+        response = client.post(url, {"refresh": str(refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        new_refresh_token = response.json()["refresh"]
+        self.assertNotEqual(new_refresh_token, str(refresh_token))
+        self.assertTrue(RevokedToken.objects.filter(jti=refresh_token["jti"]).exists())
+
+        response = client.post(url, {"refresh": str(refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = client.post(url, {"refresh": new_refresh_token}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_revoked_token_cannot_be_refreshed(self):
+        _, refresh_token = jwt_encode(self.user)
+        client = APIClient()
+
+        response = client.post(reverse("common-auth-token-revoke"), {"refresh": str(refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = client.post(reverse("common-auth-token-refresh"), {"refresh": str(refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_revoke_tokens_revokes_all_tokens_of_user(self):
+        access_token, refresh_token = jwt_encode(self.user)
+        _, other_refresh_token = jwt_encode(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+
+        with mock.patch("django.utils.timezone.now", return_value=self.user.date_joined.replace(year=2999)):
+            response = client.post(reverse("common-auth-revoke-tokens"))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(client.get(reverse("common-auth-me")).status_code, status.HTTP_401_UNAUTHORIZED)
+        client.credentials()
+        for token in (refresh_token, other_refresh_token):
+            response = client.post(reverse("common-auth-token-refresh"), {"refresh": str(token)}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_tokens_issued_right_after_revoking_all_are_valid(self):
+        _, old_refresh_token = jwt_encode(self.user)
+        # Revoked later in the second the new tokens are issued, which `iat` (in whole seconds) can not tell apart
+        revoked_at = django_timezone.now().replace(microsecond=999999)
+        with mock.patch.object(token_revocation.django_timezone, "now", return_value=revoked_at):
+            token_revocation.revoke_user_tokens(self.user.pk)
+        self.user.refresh_from_db()
+        access_token, refresh_token = jwt_encode(self.user)
+        self.assertLess(refresh_token["iat"], revoked_at.timestamp())
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
+        self.assertEqual(client.get(reverse("common-auth-me")).status_code, status.HTTP_200_OK)
+        client.credentials()
+        url = reverse("common-auth-token-refresh")
+        response = client.post(url, {"refresh": str(refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = client.post(url, {"refresh": str(old_refresh_token)}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_tokens_without_generation_are_checked_by_issue_time(self):
+        _, refresh_token = jwt_encode(self.user)
+        del refresh_token[TOKEN_GENERATION_CLAIM]
+        self.assertFalse(is_token_revoked(refresh_token, self.user))
+
+        self.user.tokens_revoked_at = django_timezone.now().replace(year=2999)
+        self.assertTrue(is_token_revoked(refresh_token, self.user))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_filter_miss_needs_no_query(self):
+        _, refresh_token = jwt_encode(self.user)
+        client = mock.Mock()
+        client.pipeline.return_value.execute.return_value = [1, [1, 0, 1, 1, 1, 1, 1]]
+
+        with mock.patch.object(token_revocation, "get_redis_client", return_value=client), self.assertNumQueries(0):
+            self.assertFalse(is_token_revoked(refresh_token, self.user))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_filter_hit_is_confirmed_in_database(self):
+        _, refresh_token = jwt_encode(self.user)
+        client = mock.Mock()
+        client.pipeline.return_value.execute.return_value = [1, [1, 1, 1, 1, 1, 1, 1]]
+
+        with mock.patch.object(token_revocation, "get_redis_client", return_value=client):
+            with self.assertNumQueries(1):
+                self.assertFalse(is_token_revoked(refresh_token, self.user))
+            revoke_token(refresh_token)
+            self.assertTrue(is_token_revoked(refresh_token, self.user))
+
+        positions = token_revocation._get_bit_positions(refresh_token["jti"])
+        client.register_script.return_value.assert_called_once_with(
+            keys=[token_revocation.REVOCATION_FILTER_KEY], args=positions
+        )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_missing_filter_falls_back_to_database_and_enqueues_rebuild(self):
+        revoked_token = RefreshToken.for_user(self.user)
+        revoke_token(revoked_token)
+        client = mock.Mock()
+        client.pipeline.return_value.execute.return_value = [0, [0, 0, 0, 0, 0, 0, 0]]
+        client.set.side_effect = [True, False]
+
+        with (
+            mock.patch.object(token_revocation, "get_redis_client", return_value=client),
+            mock.patch.object(tasks.rebuild_token_revocation_filter, "delay") as delay,
+        ):
+            self.assertTrue(is_token_revoked(revoked_token, self.user))
+            # Rebuild is already enqueued
+            self.assertTrue(is_token_revoked(revoked_token, self.user))
+
+        delay.assert_called_once_with()
+        client.set.assert_called_with(
+            token_revocation.REVOCATION_FILTER_LOCK_KEY, 1, nx=True, ex=token_revocation.REVOCATION_FILTER_LOCK_TIMEOUT
+        )
+        client.rename.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_rebuild_task_rebuilds_filter_from_database(self):
+        revoked_token = RefreshToken.for_user(self.user)
+        revoke_token(revoked_token)
+        client = mock.Mock()
+
+        with mock.patch.object(token_revocation, "get_redis_client", return_value=client):
+            tasks.rebuild_token_revocation_filter()
+
+        building_key = client.rename.call_args.args[0]
+        client.rename.assert_called_once_with(building_key, token_revocation.REVOCATION_FILTER_KEY)
+        client.register_script.return_value.assert_any_call(
+            keys=[building_key], args=token_revocation._get_bit_positions(revoked_token["jti"])
+        )
+        client.delete.assert_called_once_with(token_revocation.REVOCATION_FILTER_LOCK_KEY)
@@ -0,0 +1,100 @@
+import logging
+import os
+import tempfile
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from apps.api_auth.services.token_signing import get_token_backend
+from apps.api_auth.tokens import AccessToken
+from apps.api_auth.utils import jwt_encode
+from apps.users.choices import UserTypes
+from apps.users.models import User
+from apps.utils.testing import TestCase
+
+
+class TokenSigningTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.user = User.objects.create_user(username="testuser", password="password", user_type=UserTypes.CUSTOMER)
+        self.key_dir = tempfile.TemporaryDirectory()
+        self.ec_key_file = self.write_key("ec.pem", ec.generate_private_key(ec.SECP256R1()))
+        self.ed_key_file = self.write_key("ed.pem", ed25519.Ed25519PrivateKey.generate())
+
+    def tearDown(self):
+        self.key_dir.cleanup()
+
+    def write_key(self, name, private_key) -> str:
+        path = os.path.join(self.key_dir.name, name)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        with open(path, "wb") as f:
+            f.write(pem)
+        return path
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_tokens_can_be_verified_with_published_keys(self):
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ec_key_file, self.ed_key_file]):
+            response = APIClient().get(reverse("jwks"))
+            access_token = str(jwt_encode(self.user)[0])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        keys = {key["kid"]: key for key in response.json()["keys"]}
+        self.assertEqual([key["alg"] for key in keys.values()], ["ES256", "EdDSA"])
+
+        # As a gateway would, with nothing but the JWKS
+        kid = jwt.get_unverified_header(access_token)["kid"]
+        public_key = jwt.PyJWK(keys[kid]).key
+        claims = jwt.decode(access_token, public_key, algorithms=["ES256"])
+        self.assertEqual(claims["user_id"], str(self.user.id))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_tokens_of_rotated_keys_are_verified_until_key_is_removed(self):
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ec_key_file, self.ed_key_file]):
+            access_token = str(jwt_encode(self.user)[0])
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ed_key_file, self.ec_key_file]):
+            self.assertEqual(AccessToken(access_token)["user_id"], str(self.user.id))  # type: ignore[arg-type]
+            new_access_token = str(jwt_encode(self.user)[0])
+            self.assertEqual(jwt.get_unverified_header(new_access_token)["alg"], "EdDSA")
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ed_key_file]):
+            with self.assertRaises(TokenError):
+                AccessToken(access_token)  # type: ignore[arg-type]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_legacy_tokens_are_verified_until_disabled(self):
+        legacy_token = str(TokenObtainPairSerializer.get_token(self.user).access_token)  # type: ignore[attr-defined]
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ec_key_file]):
+            self.assertEqual(AccessToken(legacy_token)["user_id"], str(self.user.id))  # type: ignore[arg-type]
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ec_key_file], JWT_VERIFY_LEGACY_TOKENS=False):
+            with self.assertRaises(TokenError):
+                AccessToken(legacy_token)  # type: ignore[arg-type]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_signed_tokens_authenticate_requests(self):
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ed_key_file]):
+            client = APIClient()
+            response = client.post(
+                reverse("customer-auth-login"), {"username": "testuser", "password": "password"}, format="json"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+            self.assertEqual(client.get(reverse("common-auth-me")).status_code, status.HTTP_200_OK)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_jwks_is_cacheable(self):
+        client = APIClient()
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.ed_key_file]):
+            response = client.get(reverse("jwks"))
+            self.assertIn("public", response["Cache-Control"])
+            self.assertIn("max-age=3600", response["Cache-Control"])
+            response = client.get(reverse("jwks"), HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(get_token_backend().jwks, {"keys": []})
@@ -0,0 +1,13 @@
+from apps.utils.throttling import IPTokenBucketThrottle, UsernameTokenBucketThrottle
+
+
+class LoginIPThrottle(IPTokenBucketThrottle):
+    scope = "login_ip"
+
+
+class LoginUsernameThrottle(UsernameTokenBucketThrottle):
+    scope = "login_username"
+
+
+class TokenIPThrottle(IPTokenBucketThrottle):
+    scope = "token_ip"
@@ -0,0 +1,23 @@
+from rest_framework_simplejwt import tokens
+
+from apps.api_auth.services.token_signing import KeyRingTokenBackend, get_token_backend
+
+
+class KeyRingTokenMixin:
+    """Signs and verifies tokens with the configured keys (see `KeyRingTokenBackend`)."""
+
+    @property
+    def token_backend(self) -> KeyRingTokenBackend:
+        return get_token_backend()
+
+
+class AccessToken(KeyRingTokenMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(KeyRingTokenMixin, tokens.RefreshToken):  # type: ignore[misc]
+    access_token_class = AccessToken
+
+
+class UntypedToken(KeyRingTokenMixin, tokens.UntypedToken):
+    pass
@@ -1,10 +1,25 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import Token
 
+from apps.api_auth.tokens import RefreshToken
 from apps.users.models import User
 
+# Version of the user claims added to the tokens. Bump it when they change, so tokens issued
+# before that are not trusted by `StatelessJWTAuthentication` and the user is looked up instead.
+TOKEN_VERSION = 1
+TOKEN_VERSION_CLAIM = "ver"
+# Generation of the tokens of the user (`User.token_generation`) the token was issued in
+TOKEN_GENERATION_CLAIM = "gen"
+
 
 def jwt_encode(user: User):
-    refresh = TokenObtainPairSerializer.get_token(user)
-    assert isinstance(refresh, RefreshToken)
+    refresh = RefreshToken.for_user(user)
+    set_user_claims(refresh, user)
     return refresh.access_token, refresh
+
+
+def set_user_claims(refresh: Token, user: User):
+    # Claims of the refresh token are copied to every access token created from it
+    refresh[TOKEN_VERSION_CLAIM] = TOKEN_VERSION
+    refresh[TOKEN_GENERATION_CLAIM] = user.token_generation
+    refresh["user_type"] = user.user_type
+    refresh["is_active"] = user.is_active
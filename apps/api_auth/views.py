@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from apps.api_auth.services.token_signing import get_token_backend
+
+
+@require_GET
+@cache_control(
+    public=True,
+    max_age=settings.JWKS_CACHE_MAX_AGE,
+    stale_while_revalidate=settings.JWKS_CACHE_MAX_AGE,
+    stale_if_error=24 * 60 * 60,
+)
+@condition(etag_func=lambda request: get_token_backend().jwks_etag)
+def jwks_view(request):
+    """Public keys of the tokens (JWK Set), so other services can verify them without calling the API."""
+    return JsonResponse(get_token_backend().jwks)
@@ -1,25 +1,66 @@
-from django.http import HttpRequest, JsonResponse
-from django.utils.deprecation import MiddlewareMixin
+import json
+import re
+from typing import Optional
 
-from apps.dashboard.models import get_current_global_settings
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest, HttpResponse
 
+from apps.dashboard.models import (
+    GlobalSetting,
+    aget_current_global_settings,
+    get_current_global_settings,
+)
 
-class MaintenanceModeMiddleware(MiddlewareMixin):
-    def process_request(self, request: HttpRequest):
-        if request.path.startswith("/api/v1"):
+# Paths that are unavailable while in maintenance mode
+MAINTENANCE_MODE_PATH_PREFIXES = ("/api/v1",)
+DEFAULT_MAINTENANCE_MODE_MESSAGE = "Service temporarily unavailable, try again later"
+
+
+class MaintenanceModeMiddleware:
+    """
+    Responds with 503 to API requests while the current global settings are in maintenance mode.
+    Supports both sync and async requests, so it does not need to be adapted under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_pattern = re.compile("|".join(re.escape(prefix) for prefix in MAINTENANCE_MODE_PATH_PREFIXES))
+        # Rendered 503 body of the last seen settings: ((pk, modified), body)
+        self.rendered_body: Optional[tuple[tuple, bytes]] = None
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.path_pattern.match(request.path):
             settings = get_current_global_settings()
             if settings.is_maintenance_mode:
-                return JsonResponse(
+                return self.maintenance_response(settings)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        if self.path_pattern.match(request.path):
+            settings = await aget_current_global_settings()
+            if settings.is_maintenance_mode:
+                return self.maintenance_response(settings)
+        return await self.get_response(request)
+
+    def maintenance_response(self, settings: GlobalSetting) -> HttpResponse:
+        # The body only changes when the settings are saved, so it is rendered once per version
+        version = (settings.pk, settings.modified)
+        if self.rendered_body is None or self.rendered_body[0] != version:
+            body = {
+                "type": "service_unavailable",
+                "errors": [
                     {
-                        "type": "service_unavailable",
-                        "errors": [
-                            {
-                                "code": "maintenance",
-                                "detail": settings.maintenance_mode_message
-                                or "Service temporarily unavailable, try again later",
-                            }
-                        ],
-                    },
-                    status=503,
-                )
-        return None
+                        "code": "maintenance",
+                        "detail": settings.maintenance_mode_message or DEFAULT_MAINTENANCE_MODE_MESSAGE,
+                    }
+                ],
+            }
+            self.rendered_body = (version, json.dumps(body).encode())
+        return HttpResponse(self.rendered_body[1], status=503, content_type="application/json")
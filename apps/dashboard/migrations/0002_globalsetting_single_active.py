@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+
+def deactivate_duplicate_active_settings(apps, schema_editor):
+    # Keep the most recently modified active setting, the constraint allows a single one
+    GlobalSetting = apps.get_model("dashboard", "GlobalSetting")
+    active_settings = GlobalSetting.objects.filter(is_active=True).order_by("-modified", "-created")
+    latest = active_settings.first()
+    if latest is not None:
+        active_settings.exclude(pk=latest.pk).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dashboard", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_duplicate_active_settings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="globalsetting",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_active", True)),
+                fields=("is_active",),
+                name="dashboard_globalsetting_single_active",
+            ),
+        ),
+    ]
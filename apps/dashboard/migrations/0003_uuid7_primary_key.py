@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:37
+
+import apps.utils.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dashboard", "0002_globalsetting_single_active"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="globalsetting",
+            name="id",
+            field=models.UUIDField(
+                default=apps.utils.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
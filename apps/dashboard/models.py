@@ -1,21 +1,42 @@
-from django.core.cache import cache
-from django.db import models
-from model_utils.models import TimeStampedModel, UUIDModel
+import functools
+from typing import Any
 
-from apps.utils.cache import cache_global_property
+from django.db import models, transaction
+from model_utils.models import TimeStampedModel
 
+from apps.utils.cache import cache_global_property, invalidate_global_property
+from apps.utils.cache_codecs import ModelCodec
+from apps.utils.models import UUIDv7Model
 
-@cache_global_property("current_global_settings", timeout=60)
+# Shared by the sync and async getters, so both use the same cache entry
+GLOBAL_SETTINGS_CACHE_OPTIONS: dict[str, Any] = {
+    "cache_key": "current_global_settings",
+    "timeout": 60,
+    "local_timeout": 5,
+    "stale_timeout": 30,
+    "single_flight": True,
+    "early_expiration": 1,
+    "codec": ModelCodec(),
+}
+
+
+@cache_global_property(**GLOBAL_SETTINGS_CACHE_OPTIONS, warmup=True)
 def get_current_global_settings():
     setting, _ = GlobalSetting.objects.get_or_create(is_active=True, defaults={"name": "Default"})
     return setting
 
 
+@cache_global_property(**GLOBAL_SETTINGS_CACHE_OPTIONS)
+async def aget_current_global_settings():
+    setting, _ = await GlobalSetting.objects.aget_or_create(is_active=True, defaults={"name": "Default"})
+    return setting
+
+
 # Global Setting
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-class GlobalSetting(UUIDModel, TimeStampedModel, models.Model):
+class GlobalSetting(UUIDv7Model, TimeStampedModel, models.Model):
     name = models.CharField(max_length=127, unique=True)
     is_active = models.BooleanField(default=True)
     is_maintenance_mode = models.BooleanField(default=False)
@@ -23,12 +44,23 @@ class GlobalSetting(UUIDModel, TimeStampedModel, models.Model):
 
     class Meta:
         ordering = ["-created"]
+        constraints = [
+            # Also the index of the current settings lookup
+            models.UniqueConstraint(
+                fields=["is_active"], condition=models.Q(is_active=True), name="dashboard_globalsetting_single_active"
+            ),
+        ]
+
+    def validate_constraints(self, exclude=None):
+        # Saving an active setting deactivates the others, so it does not conflict with them
+        super().validate_constraints(exclude={*(exclude or ()), "is_active"})
 
     def save(self, *args, **kwargs):
         if self.is_active:
             GlobalSetting.objects.exclude(pk=self.pk).update(is_active=False)
-        cache.delete("current_global_settings")
         super().save(*args, **kwargs)
+        # After commit, or other workers could cache the previous settings again before the new ones are visible
+        transaction.on_commit(functools.partial(invalidate_global_property, "current_global_settings"))
 
     def __str__(self):
         return self.name
@@ -1,10 +1,10 @@
 import logging
 
-from django.test import TestCase
 from django.urls import reverse
 from django_celery_beat.models import IntervalSchedule, PeriodicTask
 
 from apps.users.models import User
+from apps.utils.testing import TestCase
 
 
 class BackgroundTasksAdminTestCase(TestCase):
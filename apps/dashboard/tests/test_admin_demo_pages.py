@@ -1,10 +1,10 @@
 import logging
 
-from django.core.cache import cache
-from django.test import TestCase
 from django.urls import reverse
 
 from apps.users.models import User
+from apps.utils.cache import clear_caches
+from apps.utils.testing import TestCase
 
 
 class DemoPagesAdminTestCase(TestCase):
@@ -14,13 +14,14 @@ class DemoPagesAdminTestCase(TestCase):
         self.client.login(username="tadmin", password="pass")
 
     def tearDown(self):
-        cache.clear()
+        clear_caches()
 
     # ------------------------------------------------------------------------------------------------------------------
     def test_admin_home_page(self):
         url = reverse("admin:index")
         response = self.client.get(url)
         self.assertContains(response, "Media Storage", status_code=200)
+        self.assertContains(response, "Hot Cache Keys")
 
     # ------------------------------------------------------------------------------------------------------------------
     def test_schema(self):
@@ -1,13 +1,13 @@
 import logging
 
-from django.core.cache import cache
-from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.users.choices import UserTypes
 from apps.users.models import User
+from apps.utils.cache import clear_caches
+from apps.utils.testing import TestCase
 
 
 class GlobalSettingsCommonViewSetTestCase(TestCase):
@@ -16,7 +16,7 @@ class GlobalSettingsCommonViewSetTestCase(TestCase):
         self.user = User.objects.create_user(username="user", user_type=UserTypes.CUSTOMER)
 
     def tearDown(self):
-        cache.clear()
+        clear_caches()
 
     def test_current_anonymous_user_returns_global_settings(self):
         client = APIClient()
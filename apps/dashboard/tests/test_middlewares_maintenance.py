@@ -1,12 +1,13 @@
 import logging
 
-from django.core.cache import cache
-from django.test import TestCase
+from django.test import AsyncClient
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.dashboard.models import GlobalSetting
+from apps.utils.cache import clear_caches
+from apps.utils.testing import TestCase
 
 
 class MaintenanceModeMiddlewareTestCase(TestCase):
@@ -14,7 +15,7 @@ class MaintenanceModeMiddlewareTestCase(TestCase):
         logging.disable(logging.CRITICAL)
 
     def tearDown(self):
-        cache.clear()
+        clear_caches()
 
     def test_response_ok_when_maintenance_mode_off(self):
         setting = GlobalSetting.objects.create(name="Default Setting")
@@ -33,3 +34,38 @@ class MaintenanceModeMiddlewareTestCase(TestCase):
         url = reverse("common-settings-current")
         response = client.get(url, format="json")
         self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_response_body_follows_maintenance_message(self):
+        setting = GlobalSetting.objects.create(name="Default Setting", is_maintenance_mode=True)
+
+        client = APIClient()
+        url = reverse("common-settings-current")
+        response = client.get(url, format="json")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["errors"][0]["detail"], "Service temporarily unavailable, try again later")
+
+        setting.maintenance_mode_message = "Upgrading the database"
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.save()
+        response = client.get(url, format="json")
+        self.assertEqual(response.json()["errors"][0]["code"], "maintenance")
+        self.assertEqual(response.json()["errors"][0]["detail"], "Upgrading the database")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_response_ok_for_paths_outside_api_when_maintenance_mode_on(self):
+        GlobalSetting.objects.create(name="Default Setting", is_maintenance_mode=True)
+
+        client = APIClient()
+        response = client.get(reverse("schema"))
+        self.assertNotEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_response_when_maintenance_mode_on(self):
+        await GlobalSetting.objects.acreate(name="Default Setting", is_maintenance_mode=True)
+
+        client = AsyncClient()
+        url = reverse("common-settings-current")
+        response = await client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["errors"][0]["code"], "maintenance")
@@ -1,9 +1,14 @@
 import logging
 
 from django.core.cache import cache
-from django.test import TestCase
+from django.db import IntegrityError
 
-from apps.dashboard.models import GlobalSetting, get_current_global_settings
+from apps.dashboard.models import (
+    GlobalSetting,
+    aget_current_global_settings,
+    get_current_global_settings,
+)
+from apps.utils.testing import TestCase
 
 
 class GlobalSettingModelTestCase(TestCase):
@@ -22,6 +27,12 @@ class GlobalSettingModelTestCase(TestCase):
         self.assertFalse(setting1.is_active)
         self.assertTrue(setting2.is_active)
 
+    def test_database_allows_a_single_active_global_setting(self):
+        GlobalSetting.objects.create(name="Setting1", is_active=True)
+        setting2 = GlobalSetting.objects.create(name="Setting2", is_active=False)
+        with self.assertRaises(IntegrityError):
+            GlobalSetting.objects.filter(pk=setting2.pk).update(is_active=True)
+
     def test_global_setting_str_returns_name(self):
         setting = GlobalSetting.objects.create(name="MySetting")
         self.assertEqual(str(setting), "MySetting")
@@ -29,7 +40,10 @@ class GlobalSettingModelTestCase(TestCase):
     def test_save_clears_cache(self):
         setting = GlobalSetting.objects.create(name="CacheTest")
         cache.set("current_global_settings", setting)
-        setting.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.save()
+            # Not before the change is committed
+            self.assertIsNotNone(cache.get("current_global_settings"))
         self.assertIsNone(cache.get("current_global_settings"))
 
     def test_get_current_global_settings_creates_if_not_exist(self):
@@ -37,3 +51,8 @@ class GlobalSettingModelTestCase(TestCase):
         setting = get_current_global_settings()
         self.assertIsInstance(setting, GlobalSetting)
         self.assertTrue(setting.is_active)
+
+    async def test_aget_current_global_settings_returns_active_setting(self):
+        setting = await GlobalSetting.objects.acreate(name="AsyncSetting")
+        current = await aget_current_global_settings()
+        self.assertEqual(current.pk, setting.pk)
@@ -0,0 +1,17 @@
+import logging
+
+from apps.dashboard.models import GlobalSetting
+from apps.utils.testing import QueryPlanTestCase
+
+
+class GlobalSettingQueryPlanTestCase(QueryPlanTestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        GlobalSetting.objects.create(name="Inactive", is_active=False)
+        GlobalSetting.objects.create(name="Default")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_current_settings_lookup_uses_single_active_index(self):
+        queryset = GlobalSetting.objects.filter(is_active=True)
+        self.assertUsesIndex(queryset, "dashboard_globalsetting_single_active")
+        self.assertEqual(queryset.get().name, "Default")
@@ -1,3 +1,4 @@
+from apps.utils.cache_metrics import get_hot_keys
 from apps.utils.services import get_cache_info, get_celery_info, get_storage_info
 
 
@@ -5,4 +6,5 @@ def dashboard_callback(request, context):
     context["celery_info"] = get_celery_info()
     context["cache_info"] = get_cache_info()
     context["storage_info"] = get_storage_info()
+    context["cache_hot_keys"] = get_hot_keys()
     return context
@@ -0,0 +1,72 @@
+import os
+import time
+
+import argon2
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Benchmarks Argon2 parameters on this host and suggests the strongest ones within the target time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=100, help="Maximum time of a single hash")
+        parser.add_argument("--time-costs", type=int, nargs="+", default=[1, 2, 3, 4], help="Time costs to try")
+        parser.add_argument(
+            "--memory-costs",
+            type=int,
+            nargs="+",
+            default=[19456, 47104, 65536, 102400],
+            help="Memory costs (KiB) to try",
+        )
+        parser.add_argument(
+            "--parallelism",
+            type=int,
+            nargs="+",
+            default=sorted({1, 2, min(os.cpu_count() or 1, 8)}),
+            help="Parallelism (lanes) to try",
+        )
+        parser.add_argument("--iterations", type=int, default=5, help="Number of hashes per parameter set")
+
+    def handle(self, *args, **options):
+        current = (settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM)
+        current_duration = self.measure(*current, options["iterations"])
+        self.stdout.write(
+            f"Current: time_cost={current[0]} memory_cost={current[1]} parallelism={current[2]} "
+            f"({current_duration:.1f} ms per hash)"
+        )
+        self.stdout.write(f"{'time_cost':>10} {'memory_cost':>12} {'parallelism':>12} {'ms':>10}")
+
+        best = None
+        for memory_cost in options["memory_costs"]:
+            for parallelism in options["parallelism"]:
+                for time_cost in options["time_costs"]:
+                    duration = self.measure(time_cost, memory_cost, parallelism, options["iterations"])
+                    self.stdout.write(f"{time_cost:>10} {memory_cost:>12} {parallelism:>12} {duration:>10.1f}")
+                    if duration > options["target_ms"]:
+                        # Higher time costs are only slower
+                        break
+                    # Prefer more memory then more passes, as that is what makes cracking expensive
+                    strength = (memory_cost * time_cost, -parallelism)
+                    if best is None or strength > best[0]:
+                        best = (strength, time_cost, memory_cost, parallelism, duration)
+
+        if best is None:
+            self.stdout.write(self.style.ERROR(f"No parameters hash within {options['target_ms']} ms"))
+            return
+        _, time_cost, memory_cost, parallelism, duration = best
+        self.stdout.write(self.style.SUCCESS(f"Suggested parameters ({duration:.1f} ms per hash):"))
+        self.stdout.write(f"ARGON2_TIME_COST={time_cost}")
+        self.stdout.write(f"ARGON2_MEMORY_COST={memory_cost}")
+        self.stdout.write(f"ARGON2_PARALLELISM={parallelism}")
+
+    def measure(self, time_cost: int, memory_cost: int, parallelism: int, iterations: int) -> float:
+        """Median time of a hash in milliseconds."""
+        hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        durations = []
+        for _ in range(iterations):
+            started_at = time.perf_counter()
+            hasher.hash("calibrate-hasher-password")
+            durations.append((time.perf_counter() - started_at) * 1000)
+        durations.sort()
+        return durations[len(durations) // 2]
@@ -0,0 +1,190 @@
+import io
+import multiprocessing
+import os
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from apps.users.choices import UserTypes
+from apps.users.models import User
+from apps.utils.models import make_uuid7
+
+FIRST_NAMES = (
+    "Amal Ashan Chamari Dilani Emma Hiruni Ishara James Kasun Liam Malith Maya Nimal Noah Olivia Priya Ravi Sara"
+).split()
+LAST_NAMES = (
+    "Bandara Brown Dias Fernando Garcia Jayasuriya Kumara Mendis Miller Nguyen Perera Silva Smith Weerasinghe "
+    "Wickramasinghe Williams Wilson"
+).split()
+# Users joined before this date unless `--until` is given. Fixed, so a seed alone reproduces the same users (and ids).
+DEFAULT_UNTIL = date(2026, 1, 1)
+# Columns written for every user, in the order of the generated rows
+COLUMNS = [
+    "id",
+    "password",
+    "last_login",
+    "is_superuser",
+    "is_staff",
+    "is_active",
+    "date_joined",
+    "user_type",
+    "username",
+    "first_name",
+    "last_name",
+    "email",
+    "token_generation",
+]
+
+
+class Command(BaseCommand):
+    help = "Generates users for load tests and benchmarks, deterministically from a seed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100_000, help="Number of users to generate")
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same users (also part of the usernames)")
+        parser.add_argument(
+            "--user-types",
+            nargs="+",
+            default=[f"{UserTypes.CUSTOMER}=95", f"{UserTypes.UNSET}=5"],
+            help="Weights of the user types, eg. CUSTOMER=95 UNSET=5",
+        )
+        parser.add_argument("--days", type=int, default=3 * 365, help="Users joined within this many days")
+        parser.add_argument(
+            "--until", help=f"Users joined before this date (YYYY-MM-DD, defaults to {DEFAULT_UNTIL.isoformat()})"
+        )
+        parser.add_argument("--password", default="password", help="Password of every user, hashed once")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Number of users inserted per statement")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1, help="Number of processes (1 on SQLite)"
+        )
+
+    def handle(self, *args, **options):
+        until = date.fromisoformat(options["until"]) if options["until"] else DEFAULT_UNTIL
+        config = {
+            "seed": options["seed"],
+            "user_types": self.parse_user_types(options["user_types"]),
+            "until": datetime(until.year, until.month, until.day, tzinfo=timezone.utc),
+            "days": options["days"],
+            "password": make_password(options["password"]),
+        }
+        if User.objects.filter(username__startswith=get_username_prefix(options["seed"])).exists():
+            raise CommandError(f"Users of seed {options['seed']} already exist, use another --seed")
+
+        batch_size = options["batch_size"]
+        batches = [
+            (config, start, min(batch_size, options["users"] - start))
+            for start in range(0, options["users"], batch_size)
+        ]
+        # SQLite has a single writer, and test databases are only visible to this process
+        workers = 1 if connection.vendor == "sqlite" else max(1, min(options["workers"], len(batches)))
+
+        started_at = time.perf_counter()
+        created = 0
+        if workers == 1:
+            for batch in batches:
+                created += seed_batch(batch)
+        else:
+            # Workers open their own connections, inherited ones must not be shared
+            connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for count in pool.imap_unordered(seed_batch, batches):
+                    created += count
+                    self.stdout.write(f"{created}/{options['users']} users")
+
+        duration = time.perf_counter() - started_at
+        rate = created / duration if duration else 0
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} users in {duration:.1f}s ({rate:.0f}/s, {workers} workers)")
+        )
+
+    def parse_user_types(self, values: list[str]) -> dict[str, float]:
+        user_types = {}
+        for value in values:
+            user_type, _, weight = value.partition("=")
+            if user_type not in UserTypes.values:
+                raise CommandError(f"Unknown user type {user_type}, expected one of {', '.join(UserTypes.values)}")
+            try:
+                user_types[user_type] = float(weight)
+            except ValueError:
+                raise CommandError(f"Invalid weight of {user_type}: {weight}")
+        if sum(user_types.values()) <= 0:
+            raise CommandError("At least one user type must have a positive weight")
+        return user_types
+
+
+def get_username_prefix(seed: int) -> str:
+    return f"seed{seed}_"
+
+
+def seed_batch(batch: tuple[dict, int, int]) -> int:
+    """Generate and insert a batch of users, in this process or in a worker."""
+    config, start, count = batch
+    rows = generate_users(config, start, count)
+    if connection.vendor == "postgresql":
+        copy_users(rows)
+    else:
+        User.objects.bulk_create([User(**dict(zip(COLUMNS, row))) for row in rows], batch_size=len(rows))
+    return len(rows)
+
+
+def generate_users(config: dict, start: int, count: int) -> list[tuple]:
+    # Seeded per batch, so the users do not depend on the number of workers or the order batches run in
+    rng = random.Random(f"{config['seed']}:{start}")
+    user_types, weights = list(config["user_types"]), list(config["user_types"].values())
+    period = timedelta(days=config["days"]).total_seconds()
+    rows = []
+    for index in range(start, start + count):
+        # Sign ups grow over time, recent dates are more likely
+        date_joined = config["until"] - timedelta(seconds=period * (1 - rng.random() ** 0.5))
+        last_login = None
+        if rng.random() < 0.7:
+            last_login = date_joined + (config["until"] - date_joined) * rng.random()
+        user_type = rng.choices(user_types, weights)[0]
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{get_username_prefix(config['seed'])}{index}"
+        email = f"{first_name}.{last_name}.{username}@example.com".lower() if user_type == UserTypes.CUSTOMER else None
+        # Time ordered ids of the join date, as if the users had signed up then
+        timestamp = int(date_joined.timestamp() * 1000 * 4096)
+        rows.append(
+            (
+                make_uuid7(timestamp, rng.getrandbits(62)),
+                config["password"],
+                last_login,
+                False,
+                False,
+                rng.random() < 0.98,
+                date_joined,
+                user_type,
+                username,
+                first_name,
+                last_name,
+                email,
+                0,
+            )
+        )
+    return rows
+
+
+def copy_users(rows: list[tuple]):
+    """Insert users with a single COPY, much faster than an INSERT on PostgreSQL."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    columns = ", ".join(connection.ops.quote_name(column) for column in COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {User._meta.db_table} ({columns}) FROM STDIN", buffer)
+
+
+def _copy_value(value) -> str:
+    # Text format of COPY
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
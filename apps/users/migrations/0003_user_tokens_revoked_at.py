@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_alter_user_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="tokens_revoked_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:34
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0003_user_tokens_revoked_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Upper("email"),
+                models.F("user_type"),
+                name="users_user_email_ci_type_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["-date_joined"], name="users_user_date_joined_idx"),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:40
+
+import apps.users.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_uuid7_primary_key"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", apps.users.models.UserManager()),
+            ],
+        ),
+    ]
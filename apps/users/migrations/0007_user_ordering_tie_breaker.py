@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0006_user_manager"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="user",
+            options={"ordering": ["-date_joined", "-id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="user",
+            name="users_user_date_joined_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["-date_joined", "-id"], name="users_user_date_joined_idx"),
+        ),
+    ]
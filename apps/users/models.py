@@ -1,26 +1,136 @@
+import functools
+from typing import ClassVar, Iterable, Optional
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from model_utils.models import UUIDModel
+from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import connection, models, transaction
+from django.db.models.functions import Upper
 
 from apps.users.choices import UserTypes
+from apps.utils.cache import invalidate_tag
+from apps.utils.models import UUIDv7Model
 
 # User
 # ----------------------------------------------------------------------------------------------------------------------
 
 
-class User(UUIDModel, AbstractUser):
+class UserManager(DjangoUserManager["User"]):
+    """
+    `User.save` runs `full_clean`, which looks up every unique field of the user before writing it, so saving
+    users one by one costs a few queries each. To create or update many users, use `bulk_create_validated` and
+    `bulk_update_validated`: the users are validated together, with a single query per unique field for the
+    whole batch, and written with batched statements. Like `bulk_create` and `bulk_update`, they skip `save`
+    and send no signals.
+    """
+
+    def bulk_create_validated(self, users: list["User"], batch_size: Optional[int] = None) -> list["User"]:
+        self.validate_users(users)
+        return self.bulk_create(users, batch_size=batch_size)
+
+    def bulk_update_validated(
+        self, users: list["User"], fields: Iterable[str], batch_size: Optional[int] = None
+    ) -> int:
+        fields = list(fields)
+        self.validate_users(users, fields=fields)
+        updated = self.bulk_update(users, fields, batch_size=batch_size)
+        transaction.on_commit(functools.partial(invalidate_tag, *(f"user:{user.pk}" for user in users)))
+        return updated
+
+    def validate_users(self, users: list["User"], fields: Optional[list[str]] = None):
+        """
+        Validate users like `full_clean` would, all at once. Only the given fields are validated, if any.
+        Errors are raised together, by field. Conditional constraints are left to the database.
+        """
+        exclude = None
+        if fields is not None:
+            exclude = {field.name for field in self.model._meta.fields if field.name not in fields}
+        errors: dict[str, list[ValidationError]] = {}
+        for user in users:
+            try:
+                user.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                for field, messages in e.error_dict.items():
+                    errors.setdefault(field, []).extend(messages)
+
+        # Same checks as `validate_unique` (unique fields, unique together and unique constraints)
+        unique_checks, _ = self.model()._get_unique_checks(  # type: ignore[attr-defined]
+            exclude=exclude, include_meta_constraints=True
+        )
+        for model_class, unique_check in unique_checks:
+            key = unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+            for user in self._get_unique_conflicts(users, model_class, unique_check):
+                errors.setdefault(key, []).append(user.unique_error_message(model_class, unique_check))
+        if errors:
+            raise ValidationError(errors)
+
+    def _get_unique_conflicts(self, users: list["User"], model_class, unique_check: tuple[str, ...]) -> list["User"]:
+        # Users with the same values, skipping the ones with empty values (as `validate_unique` does)
+        users_by_values: dict[tuple, list["User"]] = {}
+        fields = [model_class._meta.get_field(name) for name in unique_check]
+        for user in users:
+            if not user._state.adding and any(field.primary_key for field in fields):
+                continue
+            values = tuple(getattr(user, field.attname) for field in fields)
+            if any(v is None or (v == "" and connection.features.interprets_empty_strings_as_nulls) for v in values):
+                continue
+            users_by_values.setdefault(values, []).append(user)
+        if not users_by_values:
+            return []
+
+        if len(unique_check) == 1:
+            lookup = models.Q(**{f"{unique_check[0]}__in": [values[0] for values in users_by_values]})
+        else:
+            lookup = models.Q()
+            for values in users_by_values:
+                lookup |= models.Q(**dict(zip(unique_check, values)))
+        # Rows of the updated users are about to change, their new values are checked within the batch
+        updated_pks = [user.pk for user in users if not user._state.adding]
+        existing = set(
+            model_class._default_manager.filter(lookup).exclude(pk__in=updated_pks).values_list(*unique_check)
+        )
+
+        conflicts = []
+        for values, same_users in users_by_values.items():
+            conflicts.extend(same_users if values in existing else same_users[1:])
+        return conflicts
+
+
+class User(UUIDv7Model, AbstractUser):
     user_type = models.CharField(max_length=15, choices=UserTypes.choices, default=UserTypes.UNSET)
     username = models.CharField(max_length=63, unique=True)
     first_name = models.CharField(max_length=31, blank=True)
     last_name = models.CharField(max_length=31, blank=True)
     email = models.EmailField(null=True, blank=True)  # type: ignore
+    # Bumped when all the tokens of the user are revoked, tokens of an older generation are rejected.
+    # See `apps.api_auth.services.token_revocation.revoke_user_tokens`.
+    token_generation = models.PositiveIntegerField(default=0)
+    # Tokens issued before this are revoked, only checked for tokens without a generation claim
+    tokens_revoked_at = models.DateTimeField(null=True, blank=True)
+
+    objects: ClassVar[UserManager] = UserManager()
 
     class Meta:
-        ordering = ["-date_joined"]
+        # Ends with the primary key so it is stable, as required by `KeysetPagination`
+        ordering = ["-date_joined", "-id"]
+        indexes = [
+            # Login by email (see `UsernameOrEmailBackend`), emails are matched case insensitively
+            models.Index(Upper("email"), "user_type", name="users_user_email_ci_type_idx"),
+            # Default ordering, and pages of `KeysetPagination`
+            models.Index(fields=["-date_joined", "-id"], name="users_user_date_joined_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
+        # After commit, or other workers could cache the previous user again before the change is visible
+        transaction.on_commit(functools.partial(invalidate_tag, f"user:{self.pk}"))
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(functools.partial(invalidate_tag, f"user:{pk}"))
+        return result
 
     def __str__(self):
         return self.get_full_name()
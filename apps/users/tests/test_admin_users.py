@@ -1,10 +1,10 @@
 import logging
 
-from django.test import TestCase
 from django.urls import reverse
 
 from apps.users.choices import UserTypes
 from apps.users.models import User
+from apps.utils.testing import TestCase
 
 
 class UsersAdminTestCase(TestCase):
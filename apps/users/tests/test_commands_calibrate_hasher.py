@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from apps.utils.testing import TestCase
+
+
+class CalibrateHasherCommandTest(TestCase):
+    def test_suggests_parameters_within_target(self):
+        out = StringIO()
+        call_command(
+            "calibrate_hasher",
+            "--target-ms=10000",
+            "--time-costs=1",
+            "--memory-costs=1024",
+            "--parallelism=1",
+            "--iterations=1",
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("ARGON2_TIME_COST=1", output)
+        self.assertIn("ARGON2_MEMORY_COST=1024", output)
+        self.assertIn("ARGON2_PARALLELISM=1", output)
+
+    def test_reports_when_no_parameters_fit_target(self):
+        out = StringIO()
+        call_command(
+            "calibrate_hasher",
+            "--target-ms=0",
+            "--time-costs=1",
+            "--memory-costs=1024",
+            "--parallelism=1",
+            "--iterations=1",
+            stdout=out,
+        )
+        self.assertIn("No parameters hash within", out.getvalue())
@@ -0,0 +1,53 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+
+from apps.users.choices import UserTypes
+from apps.users.management.commands import seed_data
+from apps.users.models import User
+from apps.utils.testing import TestCase
+
+
+class SeedDataCommandTest(TestCase):
+    def seed(self, *args: str):
+        call_command("seed_data", "--users=250", "--batch-size=100", "--until=2026-01-01", *args, stdout=StringIO())
+
+    def test_creates_users_of_each_type(self):
+        self.seed("--user-types", f"{UserTypes.CUSTOMER}=3", f"{UserTypes.UNSET}=1")
+        users = User.objects.all()
+        self.assertEqual(users.count(), 250)
+        self.assertTrue(
+            users.filter(user_type=UserTypes.CUSTOMER).count() > users.filter(user_type=UserTypes.UNSET).count()
+        )
+        self.assertFalse(users.filter(user_type=UserTypes.UNSET, email__isnull=False).exists())
+
+        user = users.filter(is_active=True)[0]
+        self.assertTrue(user.check_password("password"))
+        self.assertEqual(user.id.version, 7)
+        self.assertEqual(users.values("password").distinct().count(), 1)
+
+    def test_same_seed_creates_same_users(self):
+        self.seed("--seed=1")
+        first = list(User.objects.order_by("username").values_list("id", "username", "email", "date_joined"))
+        User.objects.all().delete()
+        self.seed("--seed=1")
+        second = list(User.objects.order_by("username").values_list("id", "username", "email", "date_joined"))
+        self.assertEqual(first, second)
+
+        with self.assertRaises(CommandError):
+            self.seed("--seed=1")
+        self.seed("--seed=2")
+        self.assertEqual(User.objects.count(), 500)
+
+    def test_default_until_does_not_depend_on_today(self):
+        call_command("seed_data", "--users=50", "--seed=3", stdout=StringIO())
+        first = list(User.objects.order_by("username").values_list("id", "date_joined"))
+        User.objects.all().delete()
+        with mock.patch.object(seed_data, "date", wraps=date) as mocked_date:
+            mocked_date.today.return_value = date(2030, 6, 1)
+            call_command("seed_data", "--users=50", "--seed=3", stdout=StringIO())
+        second = list(User.objects.order_by("username").values_list("id", "date_joined"))
+        self.assertEqual(first, second)
+        self.assertTrue(all(date_joined.date() < seed_data.DEFAULT_UNTIL for _, date_joined in second))
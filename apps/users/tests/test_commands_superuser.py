@@ -2,7 +2,8 @@ from io import StringIO
 
 from django.contrib.auth import get_user_model
 from django.core.management import call_command
-from django.test import TestCase
+
+from apps.utils.testing import TestCase
 
 
 class SuperUserCommandTest(TestCase):
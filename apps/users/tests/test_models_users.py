@@ -1,8 +1,8 @@
 from django.core.exceptions import ValidationError
-from django.test import TestCase
 
 from apps.users.choices import UserTypes
 from apps.users.models import User
+from apps.utils.testing import TestCase
 
 
 class UserModelTestCase(TestCase):
@@ -41,3 +41,39 @@ class UserModelTestCase(TestCase):
         with self.assertRaises(ValidationError) as e:
             User.objects.create_user(username="test1", user_type=UserTypes.CUSTOMER)
         self.assertIn("username", e.exception.message_dict)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_bulk_create_validates_batch_with_single_query_per_unique_field(self):
+        users = [User(username=f"test{i}", password="password") for i in range(50)]
+        # Unique checks of the primary key and the username
+        with self.assertNumQueries(3):
+            User.objects.bulk_create_validated(users)
+        self.assertEqual(User.objects.count(), 50)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_bulk_create_rejects_existing_and_duplicate_usernames(self):
+        User.objects.create_user(username="test1", password="password")
+        users = [User(username=username, password="password") for username in ("test1", "test2", "test2", "test3")]
+        with self.assertRaises(ValidationError) as e:
+            User.objects.bulk_create_validated(users)
+        self.assertEqual(len(e.exception.message_dict["username"]), 2)
+        self.assertEqual(User.objects.count(), 1)
+
+        users[0].username = ""
+        with self.assertRaises(ValidationError) as e:
+            User.objects.bulk_create_validated(users[:2])
+        self.assertIn("username", e.exception.message_dict)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_bulk_update_validates_only_updated_fields(self):
+        users = User.objects.bulk_create_validated([User(username=f"test{i}", password="password") for i in range(3)])
+        users[0].username, users[1].username = "test3", "test4"
+        users[2].first_name = "Test"
+        with self.assertNumQueries(2):
+            User.objects.bulk_update_validated(users, ["username", "first_name"])
+        self.assertEqual(User.objects.get(pk=users[0].pk).username, "test3")
+
+        users[2].username = "test3"
+        with self.assertRaises(ValidationError) as e:
+            User.objects.bulk_update_validated(users[2:], ["username"])
+        self.assertIn("username", e.exception.message_dict)
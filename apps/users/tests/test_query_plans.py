@@ -0,0 +1,35 @@
+import logging
+
+from apps.api_auth.backends import UsernameOrEmailBackend
+from apps.users.choices import UserTypes
+from apps.users.models import User
+from apps.utils.testing import QueryPlanTestCase
+
+
+class UserQueryPlanTestCase(QueryPlanTestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password", user_type=UserTypes.CUSTOMER
+        )
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_by_email_uses_email_index(self):
+        queryset = UsernameOrEmailBackend().filter_users(None, "TestUser@example.com")
+        self.assertUsesIndex(queryset, "users_user_email_ci_type_idx")
+        self.assertEqual(queryset.count(), 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_by_username_or_email_uses_indexes(self):
+        queryset = UsernameOrEmailBackend().filter_users("testuser", "testuser@example.com")
+        self.assertUsesIndex(queryset, "users_user_email_ci_type_idx")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_default_ordering_uses_date_joined_index(self):
+        self.assertUsesIndex(User.objects.all()[:10], "users_user_date_joined_idx", ordered=True)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_keyset_page_uses_date_joined_index(self):
+        user = User.objects.get()
+        queryset = User.objects.filter(date_joined__lt=user.date_joined)[:11]
+        self.assertUsesIndex(queryset, "users_user_date_joined_idx", ordered=True)
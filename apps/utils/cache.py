@@ -1,51 +1,605 @@
+import asyncio
+import dataclasses
+import datetime
 import functools
-from typing import Any, Callable, Optional, TypeVar
+import hashlib
+import inspect
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional, TypeVar
 from uuid import UUID
 
+import redis
+import structlog
+from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.core.cache import cache
+from django.db import models
 from django.http import HttpRequest
+from rest_framework import serializers
+
+from apps.utils.cache_breaker import cache_breaker, shared_cache
+from apps.utils.cache_codecs import CacheCodec
+from apps.utils.cache_metrics import record_hit, record_miss
+from apps.utils.memo import get_current_memo_scope
+from apps.utils.warmup import register_warmup
+
+logger = structlog.get_logger(__name__)
 
 T = TypeVar("T")
 
+# Redis pub/sub channel used to tell every process to drop its in-process (L1) copy of a key.
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Time in seconds between checks for the value while another caller is recomputing it.
+_LOCK_POLL_INTERVAL = 0.05
+
+# Objects given to a serializer batch loader that it left out, resolved by the decorated method instead
+_UNRESOLVED: Any = object()
+
+# Process local (L1) cache: cache_key -> (expires_at, value). Expiry uses `time.monotonic()`.
+_local_cache: dict[str, tuple[float, Any]] = {}
+_redis_client_pid: Optional[int] = None
+_redis_client: Optional[redis.Redis] = None
+_listener_pid: Optional[int] = None
+_listener_lock = threading.Lock()
+
+
+@dataclasses.dataclass(slots=True)
+class _CacheEntry:
+    """Value stored in the Django cache by `cache_global_property` along with its (soft) expiry metadata."""
+
+    value: Any
+    # Wall clock time (shared between processes) after which the value should be recomputed
+    expires_at: float
+    # Time taken to compute the value, used for probabilistic early expiration
+    delta: float
+
 
 def cache_global_property(
-    cache_key: str, timeout: Optional[int] = None
+    cache_key: str,
+    timeout: Optional[int] = None,
+    local_timeout: Optional[float] = None,
+    stale_timeout: Optional[int] = None,
+    single_flight: bool = False,
+    early_expiration: float = 0,
+    lock_timeout: float = 5,
+    negative_timeout: Optional[int] = None,
+    codec: Optional[CacheCodec] = None,
+    warmup: bool = False,
 ) -> Callable[[Callable[[], T]], Callable[[], T]]:
     """
     Decorator to cache the result of a global function using Django's cache.
 
     Usage:
         ```
-        @cache_result("current_global_settings", timeout=60)
+        @cache_global_property("current_global_settings", timeout=60, local_timeout=5)
         def get_current_global_settings():
             return GlobalSettings.objects.first()
         ```
 
     On first call, result is cached and reused until timeout expires.
+    Coroutine functions are supported as well, in which case the async cache API is used.
+    Values are stored as they are (pickled by the cache backend) unless a `codec` is given, see `cache_codecs`.
+    Negative results (`None` or empty values) are cached as well, using `negative_timeout` if given.
+
+    If `local_timeout` is given, the result is also kept in a process local (L1) dictionary in front of
+    the Django cache (L2), so the hot path does not need a cache round trip. Use `invalidate_global_property`
+    to drop the value everywhere: L2 is cleared and every process is notified over Redis pub/sub to drop
+    its L1 copy. If a notification is lost, the L1 copy still expires after `local_timeout` seconds.
+
+    To avoid a stampede when the value expires, a lock (`<cache_key>:lock`) is taken in the Django cache
+    so that only one caller recomputes the value:
+    - `stale_timeout` keeps the expired value for that many more seconds, and it is served to everyone
+      else while the lock holder recomputes it (stale-while-revalidate).
+    - `single_flight` makes callers that find no value at all wait for the lock holder instead of
+      recomputing it themselves (they fall back to computing it after `lock_timeout`).
+    - `early_expiration` (beta, usually `1.0`) recomputes the value probabilistically before it expires,
+      more eagerly the closer it is to the expiry and the longer it takes to compute (XFetch).
+
+    The Django cache is accessed through a circuit breaker (see `cache_breaker`). While it is open, the
+    expired L1 copy keeps being served if there is one, otherwise the value is computed without caching it.
 
     Args:
         cache_key: Key used for Django cache backend.
         timeout: Cache expiration time in seconds.
+        local_timeout: In-process cache expiration time in seconds. L1 cache is disabled if not given.
+        stale_timeout: Time in seconds an expired value can be served while it is being recomputed.
+        single_flight: Whether callers should wait for a single caller to compute a missing value.
+        early_expiration: Beta value of probabilistic early expiration. Disabled if `0`.
+        lock_timeout: Expiration time of the recompute lock in seconds.
+        negative_timeout: Cache expiration time in seconds for negative results. Defaults to `timeout`.
+        codec: Codec used to encode the value in the Django cache.
+        warmup: Whether to load the value when a worker process boots, see `warmup.run_warmup`.
 
     Returns:
         Decorated function with caching applied.
     """
+    lock_key = f"{cache_key}:lock"
+
+    def make_entry(result: Any, delta: float) -> tuple[_CacheEntry, Optional[int]]:
+        # Result is always wrapped in an entry, so a cached `None` is not mistaken for a cache miss
+        entry_timeout = negative_timeout if (negative_timeout is not None and _is_negative(result)) else timeout
+        expires_at = time.time() + entry_timeout if entry_timeout is not None else math.inf
+        cache_timeout = (
+            entry_timeout + stale_timeout if (entry_timeout is not None and stale_timeout) else entry_timeout
+        )
+        value = codec.encode(result) if codec is not None else result
+        return _CacheEntry(value, expires_at, delta), cache_timeout
+
+    def read_entry(entry: Any) -> Optional[_CacheEntry]:
+        # Entries that can not be decoded (eg. written before a migration) are recomputed, as if they were missing
+        if not isinstance(entry, _CacheEntry):
+            return None
+        if codec is None:
+            return entry
+        found, value = _decode(codec, entry.value, cache_key)
+        return _CacheEntry(value, entry.expires_at, entry.delta) if found else None
+
+    def get_local() -> tuple[bool, Any]:
+        if local_timeout is None:
+            return False, None
+        _ensure_invalidation_listener()
+        local_entry = _local_cache.get(cache_key)
+        if local_entry is None:
+            return False, None
+        if local_entry[0] > time.monotonic():
+            record_hit(cache_key, "local")
+            return True, local_entry[1]
+        if cache_breaker.is_open:
+            # Shared cache is down, an expired local copy is better than hitting the database on every call
+            record_hit(cache_key, "degraded")
+            return True, local_entry[1]
+        return False, None
+
+    def set_local(result: Any):
+        if local_timeout is not None:
+            _local_cache[cache_key] = (time.monotonic() + local_timeout, result)
 
     def decorator(fn: Callable[[], T]) -> Callable[[], T]:
+        if inspect.iscoroutinefunction(fn):
+            async_wrapped_fn = _async_cache_global_property(fn)
+            if warmup:
+                register_warmup(async_to_sync(async_wrapped_fn), name=cache_key)
+            return async_wrapped_fn
+
+        def compute() -> T:
+            started_at = time.monotonic()
+            result = fn()
+            delta = time.monotonic() - started_at
+            record_miss(cache_key, delta, result, measure_payload=True)
+            entry, cache_timeout = make_entry(result, delta)
+            shared_cache.set(cache_key, entry, timeout=cache_timeout)
+            return result
+
+        def compute_single_flight() -> T:
+            deadline = time.monotonic() + lock_timeout
+            while not shared_cache.add(lock_key, 1, timeout=lock_timeout):
+                if time.monotonic() >= deadline:
+                    # Lock holder is taking too long, do not keep the caller waiting any longer
+                    return compute()
+                time.sleep(_LOCK_POLL_INTERVAL)
+                entry = read_entry(shared_cache.get(cache_key))
+                if entry is not None:
+                    record_hit(cache_key, "shared")
+                    return entry.value
+            try:
+                return compute()
+            finally:
+                shared_cache.delete(lock_key)
+
+        def load() -> T:
+            entry = read_entry(shared_cache.get(cache_key))
+            if entry is not None:
+                if not _is_expired(entry, early_expiration):
+                    record_hit(cache_key, "shared")
+                    return entry.value
+                # Only the lock holder recomputes, everyone else is served the current (stale) value
+                if shared_cache.add(lock_key, 1, timeout=lock_timeout):
+                    try:
+                        return compute()
+                    finally:
+                        shared_cache.delete(lock_key)
+                record_hit(cache_key, "stale")
+                return entry.value
+            if single_flight:
+                return compute_single_flight()
+            return compute()
+
         @functools.wraps(fn)
         def wrapped_fn():
-            result = cache.get(cache_key)
-            if result is not None:
+            found, result = get_local()
+            if found:
                 return result
-            result = fn()
-            cache.set(cache_key, result, timeout=timeout)
+            result = load()
+            set_local(result)
+            return result
+
+        if warmup:
+            register_warmup(wrapped_fn, name=cache_key)
+        return wrapped_fn
+
+    def _async_cache_global_property(fn):
+        # Same as above, using the async cache API so ASGI callers do not need a thread hop
+
+        async def acompute():
+            started_at = time.monotonic()
+            result = await fn()
+            delta = time.monotonic() - started_at
+            record_miss(cache_key, delta, result, measure_payload=True)
+            entry, cache_timeout = make_entry(result, delta)
+            await shared_cache.aset(cache_key, entry, timeout=cache_timeout)
+            return result
+
+        async def acompute_single_flight():
+            deadline = time.monotonic() + lock_timeout
+            while not await shared_cache.aadd(lock_key, 1, timeout=lock_timeout):
+                if time.monotonic() >= deadline:
+                    return await acompute()
+                await asyncio.sleep(_LOCK_POLL_INTERVAL)
+                entry = read_entry(await shared_cache.aget(cache_key))
+                if entry is not None:
+                    record_hit(cache_key, "shared")
+                    return entry.value
+            try:
+                return await acompute()
+            finally:
+                await shared_cache.adelete(lock_key)
+
+        async def aload():
+            entry = read_entry(await shared_cache.aget(cache_key))
+            if entry is not None:
+                if not _is_expired(entry, early_expiration):
+                    record_hit(cache_key, "shared")
+                    return entry.value
+                if await shared_cache.aadd(lock_key, 1, timeout=lock_timeout):
+                    try:
+                        return await acompute()
+                    finally:
+                        await shared_cache.adelete(lock_key)
+                record_hit(cache_key, "stale")
+                return entry.value
+            if single_flight:
+                return await acompute_single_flight()
+            return await acompute()
+
+        @functools.wraps(fn)
+        async def wrapped_fn():
+            found, result = get_local()
+            if found:
+                return result
+            result = await aload()
+            set_local(result)
+            return result
+
+        return wrapped_fn
+
+    return decorator
+
+
+def _decode(codec: Optional[CacheCodec], value: Any, cache_key: str) -> tuple[bool, Any]:
+    """Decode a cached value, `(False, None)` if it can not be, eg. a model snapshot written before a migration."""
+    if codec is None:
+        return True, value
+    try:
+        return True, codec.decode(value)
+    except Exception as e:
+        logger.warning("could not decode cached value, recomputing it", cache_key=cache_key, e=e)
+        return False, None
+
+
+def _is_negative(value: Any) -> bool:
+    """Check whether a computed value is a negative result (nothing found or not configured)."""
+    if value is None:
+        return True
+    return isinstance(value, (str, bytes, list, tuple, dict, set, frozenset)) and len(value) == 0
+
+
+def _is_expired(entry: _CacheEntry, early_expiration: float) -> bool:
+    """
+    Check whether a cached entry should be recomputed.
+    With early expiration, an entry can be considered expired a little before its expiry time.
+    https://cseweb.ucsd.edu/~avattani/papers/cache_stampede.pdf
+    """
+    now = time.time()
+    if early_expiration > 0 and entry.delta > 0:
+        now -= entry.delta * early_expiration * math.log(1.0 - random.random())
+    return now >= entry.expires_at
+
+
+def invalidate_global_property(cache_key: str):
+    """
+    Invalidate a value cached by `cache_global_property` in the Django cache and in the
+    in-process cache of every worker (gunicorn and celery) listening on the invalidation channel.
+    """
+    shared_cache.delete(cache_key)
+    _local_cache.pop(cache_key, None)
+
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.publish(INVALIDATION_CHANNEL, cache_key)
+    except redis.RedisError as e:
+        # Other workers will still pick the change up once their local copy expires
+        logger.error("could not publish cache invalidation", cache_key=cache_key, e=e)
+
+
+def clear_local_cache():
+    """Drop every value cached in this process (L1). The Django cache (L2) is left as is."""
+    _local_cache.clear()
+
+
+def clear_caches():
+    """
+    Clear the Django cache and the in-process cache of this process, so no value cached before is served.
+    Use this instead of `cache.clear()`, which would leave the in-process copies behind.
+    """
+    cache.clear()
+    clear_local_cache()
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """Redis client of this process (clients are not fork-safe), or `None` if redis is not configured."""
+    global _redis_client, _redis_client_pid
+    if not settings.REDIS_URL:
+        return None
+    if _redis_client is None or _redis_client_pid != os.getpid():
+        _redis_client = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+        _redis_client_pid = os.getpid()
+    return _redis_client
+
+
+def _ensure_invalidation_listener():
+    """
+    Start the invalidation listener thread for this process if it is not running yet.
+    Threads do not survive a fork, so this is checked against the current pid.
+    """
+    global _listener_pid
+    if _listener_pid == os.getpid() or not settings.REDIS_URL:
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+        thread = threading.Thread(target=_listen_for_invalidations, name="cache-invalidation-listener", daemon=True)
+        thread.start()
+
+
+def _listen_for_invalidations():
+    while True:
+        try:
+            # No read timeout here, the listener blocks until a message arrives
+            client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Messages may have been missed while (re)connecting
+            _local_cache.clear()
+            for message in pubsub.listen():
+                _handle_invalidation_message(message)
+        except Exception as e:
+            logger.error("cache invalidation listener disconnected", e=e)
+            _local_cache.clear()
+            time.sleep(1)
+
+
+def _handle_invalidation_message(message: dict[str, Any]):
+    data = message.get("data")
+    if isinstance(data, bytes):
+        data = data.decode()
+    if isinstance(data, str):
+        _local_cache.pop(data, None)
+
+
+@dataclasses.dataclass(slots=True)
+class _TaggedCacheEntry:
+    """Value stored in the Django cache by `cache_function_result` along with the tag versions it was built with."""
+
+    value: Any
+    tag_versions: dict[str, int]
+
+
+def cache_function_result(
+    namespace: str,
+    timeout: Optional[int] = None,
+    version: int = 1,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+    codec: Optional[CacheCodec] = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator to cache the result of a function per set of arguments using Django's cache.
+
+    Usage:
+        ```
+        @cache_function_result("user_permissions", timeout=300, tags=lambda user, locale: [f"user:{user.pk}"])
+        def get_user_permissions(user, locale):
+            return expensive_permissions_computation(user, locale)
+        ```
+
+    Results are cached under `<namespace>:v<version>:<hash of the arguments>`. Model instances are keyed by their
+    primary key, so arguments must be primitives, UUIDs, model instances or lists/tuples/dicts of them.
+    Bump `version` when the shape of the cached value changes, so entries written before a deploy are not read.
+
+    `tags` receives the same arguments as the function and returns the tags of the entry.
+    `invalidate_tag("user:<id>")` then drops every entry tagged with it, across all namespaces.
+    Coroutine functions are supported as well, in which case the async cache API is used.
+    Values are stored as they are (pickled by the cache backend) unless a `codec` is given, see `cache_codecs`.
+
+    Sync functions also get `fn.get_many(calls, load_many)`, which returns the results of several argument tuples
+    with a single cache round trip, and calls `load_many` once with the argument tuples of the cache misses.
+    `load_many` returns their results in the same order, eg. from a single query.
+
+    Args:
+        namespace: Prefix of the cache keys, unique per decorated function.
+        timeout: Cache expiration time in seconds.
+        version: Version of the cached value format.
+        tags: Callable returning the tags of the entry for the given arguments.
+        codec: Codec used to encode the value in the Django cache.
+
+    Returns:
+        Decorated function with caching applied.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        signature = inspect.signature(fn)
+
+        def make_keys(args, kwargs) -> tuple[str, list[str]]:
+            bound_args = signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            cache_key = f"{namespace}:v{version}:{_make_args_digest(bound_args.arguments)}"
+            tag_keys = [_tag_key(tag) for tag in tags(*args, **kwargs)] if tags is not None else []
+            return cache_key, tag_keys
+
+        def is_valid(entry: _TaggedCacheEntry, cached: dict[str, Any], tag_keys: list[str]) -> bool:
+            return all(tag_key in cached and entry.tag_versions.get(tag_key) == cached[tag_key] for tag_key in tag_keys)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped_fn(*args, **kwargs):
+                cache_key, tag_keys = make_keys(args, kwargs)
+                cached = await shared_cache.aget_many([cache_key, *tag_keys])
+                entry = cached.get(cache_key)
+                if isinstance(entry, _TaggedCacheEntry) and is_valid(entry, cached, tag_keys):
+                    found, value = _decode(codec, entry.value, cache_key)
+                    if found:
+                        record_hit(namespace, "shared")
+                        return value
+
+                started_at = time.monotonic()
+                result = await fn(*args, **kwargs)
+                record_miss(namespace, time.monotonic() - started_at, result, measure_payload=True)
+                tag_versions = {
+                    tag_key: cached.get(tag_key) or await _ainit_tag_version(tag_key) for tag_key in tag_keys
+                }
+                await shared_cache.aset(
+                    cache_key,
+                    _TaggedCacheEntry(codec.encode(result) if codec is not None else result, tag_versions),
+                    timeout=timeout,
+                )
+                return result
+
+            return async_wrapped_fn
+
+        @functools.wraps(fn)
+        def wrapped_fn(*args, **kwargs):
+            # Entry and its tag versions are fetched in one round trip
+            cache_key, tag_keys = make_keys(args, kwargs)
+            cached = shared_cache.get_many([cache_key, *tag_keys])
+            entry = cached.get(cache_key)
+            if isinstance(entry, _TaggedCacheEntry) and is_valid(entry, cached, tag_keys):
+                found, value = _decode(codec, entry.value, cache_key)
+                if found:
+                    record_hit(namespace, "shared")
+                    return value
+
+            started_at = time.monotonic()
+            result = fn(*args, **kwargs)
+            record_miss(namespace, time.monotonic() - started_at, result, measure_payload=True)
+            tag_versions = {tag_key: cached.get(tag_key) or _init_tag_version(tag_key) for tag_key in tag_keys}
+            shared_cache.set(
+                cache_key,
+                _TaggedCacheEntry(codec.encode(result) if codec is not None else result, tag_versions),
+                timeout=timeout,
+            )
             return result
 
+        def get_many(calls: list[tuple], load_many: Callable[[list[tuple]], list[T]]) -> list[T]:
+            # Entries and their tag versions of every call are fetched in one round trip
+            keys = [make_keys(args, {}) for args in calls]
+            cached = shared_cache.get_many(
+                list({key for cache_key, tag_keys in keys for key in (cache_key, *tag_keys)})
+            )
+            results: list[Any] = [None] * len(calls)
+            missing = []
+            for index, (cache_key, tag_keys) in enumerate(keys):
+                entry = cached.get(cache_key)
+                found, value = False, None
+                if isinstance(entry, _TaggedCacheEntry) and is_valid(entry, cached, tag_keys):
+                    found, value = _decode(codec, entry.value, cache_key)
+                if found:
+                    record_hit(namespace, "shared")
+                    results[index] = value
+                else:
+                    missing.append(index)
+            if not missing:
+                return results
+
+            started_at = time.monotonic()
+            loaded = load_many([calls[index] for index in missing])
+            duration = (time.monotonic() - started_at) / len(missing)
+            entries = {}
+            for index, result in zip(missing, loaded):
+                record_miss(namespace, duration, result, measure_payload=True)
+                cache_key, tag_keys = keys[index]
+                for tag_key in tag_keys:
+                    if not cached.get(tag_key):
+                        cached[tag_key] = _init_tag_version(tag_key)
+                tag_versions = {tag_key: cached[tag_key] for tag_key in tag_keys}
+                entries[cache_key] = _TaggedCacheEntry(
+                    codec.encode(result) if codec is not None else result, tag_versions
+                )
+                results[index] = result
+            shared_cache.set_many(entries, timeout=timeout)
+            return results
+
+        wrapped_fn.get_many = get_many  # type: ignore[attr-defined]
         return wrapped_fn
 
     return decorator
 
 
+def invalidate_tag(*tags: str):
+    """Invalidate every entry cached by `cache_function_result` that was tagged with any of the given tags."""
+    shared_cache.set_many({_tag_key(tag): time.time_ns() for tag in tags}, timeout=None)
+
+
+def _tag_key(tag: str) -> str:
+    return f"cache_tag:{tag}"
+
+
+def _init_tag_version(tag_key: str) -> int:
+    # Versions are time based so a tag evicted from the cache does not restart from an already used version
+    tag_version = time.time_ns()
+    if shared_cache.add(tag_key, tag_version, timeout=None):
+        return tag_version
+    return shared_cache.get(tag_key, tag_version)
+
+
+async def _ainit_tag_version(tag_key: str) -> int:
+    tag_version = time.time_ns()
+    if await shared_cache.aadd(tag_key, tag_version, timeout=None):
+        return tag_version
+    return await shared_cache.aget(tag_key, tag_version)
+
+
+def _make_args_digest(arguments: dict[str, Any]) -> str:
+    key_parts = repr(sorted((name, _make_key_part(value)) for name, value in arguments.items()))
+    return hashlib.sha1(key_parts.encode(), usedforsecurity=False).hexdigest()
+
+
+def _make_key_part(value: Any) -> Any:
+    """Convert an argument to a representation that stays the same across processes."""
+    if value is None or isinstance(value, (str, int, float, bool, UUID, datetime.date, datetime.time)):
+        return value
+    if isinstance(value, models.Model):
+        return (value._meta.label, value.pk)
+    if isinstance(value, (list, tuple)):
+        return tuple(_make_key_part(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(_make_key_part(v)) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _make_key_part(v)) for k, v in value.items()))
+    raise TypeError(f"Cannot build a stable cache key for argument of type {type(value).__name__}")
+
+
 def cache_current_request_property(
     cache_key: str,
 ) -> Callable[[Callable[[HttpRequest], Any]], Callable[[HttpRequest], Any]]:
@@ -68,6 +622,9 @@ def cache_current_request_property(
         self._cache_current_permissions = result
         ```
 
+    Coroutine functions are supported as well. Concurrent calls within the same request
+    then await a single computation.
+
     Args:
         key: A unique key used to cache the result on the request.
 
@@ -76,13 +633,41 @@ def cache_current_request_property(
     """
 
     def decorator(fn: Callable[[HttpRequest], Any]) -> Callable[[HttpRequest], Any]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped_fn(request: HttpRequest):
+                attr_name = f"_cache_{cache_key}"
+                pending_attr_name = f"_cache_pending_{cache_key}"
+
+                if hasattr(request, attr_name):
+                    record_hit(cache_key, "request")
+                    return getattr(request, attr_name)
+                pending = getattr(request, pending_attr_name, None)
+                if pending is None:
+                    started_at = time.monotonic()
+                    pending = asyncio.ensure_future(fn(request))
+                    setattr(request, pending_attr_name, pending)
+                    value = await pending
+                    record_miss(cache_key, time.monotonic() - started_at)
+                else:
+                    record_hit(cache_key, "request")
+                    value = await pending
+                setattr(request, attr_name, value)
+                return value
+
+            return async_wrapped_fn
+
         @functools.wraps(fn)
         def wrapped_fn(request: HttpRequest):
             attr_name = f"_cache_{cache_key}"
 
             if hasattr(request, attr_name):
+                record_hit(cache_key, "request")
                 return getattr(request, attr_name)
+            started_at = time.monotonic()
             value = fn(request)
+            record_miss(cache_key, time.monotonic() - started_at)
             setattr(request, attr_name, value)
             return value
 
@@ -91,7 +676,99 @@ def cache_current_request_property(
     return decorator
 
 
-def cache_serializer_result_per_object(cache_key: str) -> Callable[[Callable[[Any, T], Any]], Callable[[Any, T], Any]]:
+def cache_current_scope_result(namespace: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator that caches the result of a function per set of arguments for the duration of the current
+    memo scope (see `memo.memo_scope`). Scopes are opened for every request by `MemoScopeMiddleware` and
+    for every celery task, so services and serializers can use it without passing the request around.
+
+    Usage:
+        ```
+        @cache_current_scope_result("user_permissions")
+        def get_user_permissions(user):
+            return expensive_permissions_computation(user)
+        ```
+
+    Arguments are keyed the same way as `cache_function_result`. Outside a scope the function is
+    simply called. Scopes live in a context variable, so concurrent requests and async tasks never
+    see each other's values. Coroutine functions are supported as well, in which case concurrent
+    calls within the same scope await a single computation.
+
+    Args:
+        namespace: Prefix of the memo keys, unique per decorated function.
+
+    Returns:
+        Decorated function with caching applied.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        signature = inspect.signature(fn)
+
+        def make_key(args, kwargs) -> str:
+            bound_args = signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            return f"{namespace}:{_make_args_digest(bound_args.arguments)}"
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped_fn(*args, **kwargs):
+                scope = get_current_memo_scope()
+                if scope is None:
+                    return await fn(*args, **kwargs)
+                key = make_key(args, kwargs)
+                if key in scope.values:
+                    scope.hits += 1
+                    record_hit(namespace, "scope")
+                    return scope.values[key]
+                pending = scope.pending.get(key)
+                if pending is not None:
+                    scope.hits += 1
+                    record_hit(namespace, "scope")
+                    return await pending
+
+                started_at = time.monotonic()
+                scope.misses += 1
+                pending = scope.pending[key] = asyncio.ensure_future(fn(*args, **kwargs))
+                try:
+                    value = await pending
+                finally:
+                    scope.pending.pop(key, None)
+                record_miss(namespace, time.monotonic() - started_at)
+                scope.values[key] = value
+                return value
+
+            return async_wrapped_fn
+
+        @functools.wraps(fn)
+        def wrapped_fn(*args, **kwargs):
+            scope = get_current_memo_scope()
+            if scope is None:
+                return fn(*args, **kwargs)
+            key = make_key(args, kwargs)
+            if key in scope.values:
+                scope.hits += 1
+                record_hit(namespace, "scope")
+                return scope.values[key]
+
+            started_at = time.monotonic()
+            scope.misses += 1
+            value = fn(*args, **kwargs)
+            record_miss(namespace, time.monotonic() - started_at)
+            scope.values[key] = value
+            return value
+
+        return wrapped_fn
+
+    return decorator
+
+
+def cache_serializer_result_per_object(
+    cache_key: str,
+    batch_loader: Optional[Callable[[Any, list[Any]], dict[Any, Any]]] = None,
+    maxsize: int = 1024,
+    batch_default: Any = _UNRESOLVED,
+) -> Callable[[Callable[[Any, T], Any]], Callable[[Any, T], Any]]:
     """
     Decorator for DRF serializers to cache the result of a method per object
     using a serializer instance-bound dictionary keyed by the object's ID.
@@ -108,28 +785,111 @@ def cache_serializer_result_per_object(cache_key: str) -> Callable[[Callable[[An
         self._cache_current_membership[obj.id] = result
         ```
 
+    With `many=True`, each object would still run the expensive lookup once. Give a `batch_loader` to
+    resolve the whole page at once instead: on the first miss it is called with the objects of the parent
+    `ListSerializer` (up to `maxsize`, starting from the current object) and must return a dictionary of
+    `obj.id` to result. Objects missing from the returned dictionary resolve to `batch_default`, or fall back
+    to the decorated method if there is none. Either way, the loader is never called again for them.
+        ```
+        def _load_memberships(self, objs):
+            return {m.user_id: m for m in Membership.objects.filter(user__in=objs)}
+
+        @cache_serializer_result_per_object(
+            "current_membership", batch_loader=_load_memberships, batch_default=None
+        )
+        def _get_current_membership(self, obj):
+            return expensive_lookup(obj)
+        ```
+
+    The per-serializer cache holds at most `maxsize` objects, the oldest ones are dropped first.
+    Coroutine methods are supported as well, in which case `batch_loader` must be a coroutine function too.
+
     Args:
         cache_key: Name of the per-object cache (e.g. "current_membership")
+        batch_loader: Function resolving the results for many objects with a single query.
+        maxsize: Maximum number of objects kept in the per-serializer cache.
+        batch_default: Result of the objects the batch loader leaves out (eg. `None` for no membership).
 
     Returns:
         Wrapped function that caches its result per object.
     """
+    attr_name = f"_cache_{cache_key}"
+
+    def get_cache(serializer: Any) -> dict[UUID, Any]:
+        if not hasattr(serializer, attr_name):
+            setattr(serializer, attr_name, {})
+        return getattr(serializer, attr_name)
+
+    def store(cache: dict[UUID, Any], obj_id: Any, value: Any):
+        cache[obj_id] = value
+        while len(cache) > maxsize:
+            del cache[next(iter(cache))]
+
+    def get_batch(serializer: Any, obj: T, cache: dict[UUID, Any]) -> list[T]:
+        """Objects of the page being serialized that still need to be resolved, starting from `obj`."""
+        parent = getattr(serializer, "parent", None)
+        instances = parent.instance if isinstance(parent, serializers.ListSerializer) else None
+        # Managers would need another query to list the objects, so only already fetched pages are batched
+        if instances is None or isinstance(instances, models.Manager):
+            return [obj]
+        objs = list(instances)
+        obj_id = getattr(obj, "id")
+        start = next((i for i, o in enumerate(objs) if getattr(o, "id", None) == obj_id), None)
+        if start is None:
+            return [obj]
+        return [o for o in objs[start:] if getattr(o, "id") not in cache][:maxsize]
+
+    def store_batch(cache: dict[UUID, Any], batch: list[T], results: dict[Any, Any]):
+        # Every object of the batch is resolved, the ones left out by the loader are not loaded again
+        for batch_obj in batch:
+            batch_obj_id = getattr(batch_obj, "id")
+            store(cache, batch_obj_id, results.get(batch_obj_id, batch_default))
 
     def decorator(fn: Callable[[Any, T], Any]) -> Callable[[Any, T], Any]:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped(self, obj: T) -> Any:
+                cache = get_cache(self)
+                obj_id = getattr(obj, "id")
+                if cache.get(obj_id, _UNRESOLVED) is not _UNRESOLVED:
+                    record_hit(cache_key, "serializer")
+                    return cache[obj_id]
+
+                started_at = time.monotonic()
+                if batch_loader is not None and obj_id not in cache:
+                    batch = get_batch(self, obj, cache)
+                    store_batch(cache, batch, await batch_loader(self, batch))  # type: ignore[misc]
+                    if cache.get(obj_id, _UNRESOLVED) is not _UNRESOLVED:
+                        record_miss(cache_key, time.monotonic() - started_at)
+                        return cache[obj_id]
+
+                value = await fn(self, obj)
+                record_miss(cache_key, time.monotonic() - started_at)
+                store(cache, obj_id, value)
+                return value
+
+            return async_wrapped
+
         @functools.wraps(fn)
         def wrapped(self, obj: T) -> Any:
-            attr_name = f"_cache_{cache_key}"
-
-            if not hasattr(self, attr_name):
-                setattr(self, attr_name, {})
-
-            cache: dict[UUID, Any] = getattr(self, attr_name)
+            cache = get_cache(self)
             obj_id = getattr(obj, "id")
-            if obj_id in cache:
+            if cache.get(obj_id, _UNRESOLVED) is not _UNRESOLVED:
+                record_hit(cache_key, "serializer")
                 return cache[obj_id]
 
+            started_at = time.monotonic()
+            if batch_loader is not None and obj_id not in cache:
+                batch = get_batch(self, obj, cache)
+                store_batch(cache, batch, batch_loader(self, batch))
+                if cache.get(obj_id, _UNRESOLVED) is not _UNRESOLVED:
+                    record_miss(cache_key, time.monotonic() - started_at)
+                    return cache[obj_id]
+
             value = fn(self, obj)
-            cache[obj_id] = value
+            record_miss(cache_key, time.monotonic() - started_at)
+            store(cache, obj_id, value)
             return value
 
         return wrapped
@@ -0,0 +1,157 @@
+import threading
+import time
+from typing import Any
+
+import redis
+import structlog
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import models
+
+logger = structlog.get_logger(__name__)
+
+# Errors raised by the cache backend when the shared cache is unreachable or too slow to answer.
+CACHE_BACKEND_ERRORS = (redis.RedisError, OSError)
+
+
+class CircuitBreakerState(models.TextChoices):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for a while, so callers fail fast instead of each waiting for a timeout.
+
+    - Closed: calls go through. After `failure_threshold` consecutive failures the breaker opens.
+    - Open: calls are rejected without trying. After `recovery_timeout` seconds the breaker is half-open.
+    - Half-open: a single probe call goes through. If it succeeds the breaker closes, otherwise it opens again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 10):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CircuitBreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitBreakerState:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state != CircuitBreakerState.CLOSED
+
+    def allow_request(self) -> bool:
+        if self._state == CircuitBreakerState.CLOSED:
+            return True
+        with self._lock:
+            # Let one probe through per recovery period (also covers a probe that never reported back)
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                return False
+            self._state = CircuitBreakerState.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        if self._state == CircuitBreakerState.CLOSED and self._failures == 0:
+            return
+        with self._lock:
+            if self._state != CircuitBreakerState.CLOSED:
+                logger.info("circuit breaker closed", breaker=self.name)
+            self._state = CircuitBreakerState.CLOSED
+            self._failures = 0
+
+    def record_failure(self, e: Exception):
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitBreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != CircuitBreakerState.OPEN:
+                    logger.warning("circuit breaker opened", breaker=self.name, failures=self._failures, e=e)
+                self._state = CircuitBreakerState.OPEN
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._state = CircuitBreakerState.CLOSED
+            self._failures = 0
+
+
+class ResilientCache:
+    """
+    Django cache guarded by a circuit breaker. Backend errors are not raised, the operation falls back to
+    what a cache miss would do (reads return the default, writes are dropped, `add` lets the caller go ahead),
+    so callers keep working from their in-process copy or the database while the shared cache is down.
+
+    Writes (including invalidations) dropped while the breaker is open are lost, so cached values may stay
+    stale until they expire once the shared cache is back.
+    """
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def _call(self, fallback: Any, method: str, *args, **kwargs) -> Any:
+        if not self.breaker.allow_request():
+            return fallback
+        try:
+            result = getattr(cache, method)(*args, **kwargs)
+        except CACHE_BACKEND_ERRORS as e:
+            self.breaker.record_failure(e)
+            return fallback
+        self.breaker.record_success()
+        return result
+
+    async def _acall(self, fallback: Any, method: str, *args, **kwargs) -> Any:
+        if not self.breaker.allow_request():
+            return fallback
+        try:
+            result = await getattr(cache, method)(*args, **kwargs)
+        except CACHE_BACKEND_ERRORS as e:
+            self.breaker.record_failure(e)
+            return fallback
+        self.breaker.record_success()
+        return result
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._call(default, "get", key, default)
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        return self._call({}, "get_many", keys)
+
+    def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT):
+        self._call(None, "set", key, value, timeout=timeout)
+
+    def set_many(self, data: dict[str, Any], timeout: Any = DEFAULT_TIMEOUT):
+        self._call(None, "set_many", data, timeout=timeout)
+
+    def add(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> bool:
+        return self._call(True, "add", key, value, timeout=timeout)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        return self._call(delta, "incr", key, delta)
+
+    def delete(self, key: str):
+        self._call(None, "delete", key)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        return await self._acall(default, "aget", key, default)
+
+    async def aget_many(self, keys: list[str]) -> dict[str, Any]:
+        return await self._acall({}, "aget_many", keys)
+
+    async def aset(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT):
+        await self._acall(None, "aset", key, value, timeout=timeout)
+
+    async def aadd(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> bool:
+        return await self._acall(True, "aadd", key, value, timeout=timeout)
+
+    async def adelete(self, key: str):
+        await self._acall(None, "adelete", key)
+
+
+cache_breaker = CircuitBreaker("shared_cache")
+shared_cache = ResilientCache(cache_breaker)
@@ -0,0 +1,140 @@
+import pickle
+import zlib
+from typing import Any, Iterable, Optional
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+
+# Optional dependencies, only needed if the matching codec/compression is used.
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+# First byte of every encoded payload, telling how the rest of it is compressed.
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+_ZSTD = b"\x02"
+_LZ4 = b"\x03"
+
+
+class CacheCodec:
+    """
+    Encodes values to bytes before they are stored in the shared cache, and decodes them back.
+    Payloads larger than `compress_threshold` bytes are compressed with `compress` (`zlib`, `zstd` or `lz4`).
+    """
+
+    def __init__(self, compress: Optional[str] = None, compress_threshold: int = 1024):
+        if compress not in (None, "zlib", "zstd", "lz4"):
+            raise ImproperlyConfigured(f"Unknown cache compression: {compress}")
+        if compress == "zstd" and zstandard is None:
+            raise ImproperlyConfigured("zstd cache compression requires the zstandard package")
+        if compress == "lz4" and lz4 is None:
+            raise ImproperlyConfigured("lz4 cache compression requires the lz4 package")
+        self.compress = compress
+        self.compress_threshold = compress_threshold
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError()
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError()
+
+    def encode(self, value: Any) -> bytes:
+        data = self.dumps(value)
+        if self.compress is None or len(data) < self.compress_threshold:
+            return _RAW + data
+        if self.compress == "zstd":
+            return _ZSTD + zstandard.ZstdCompressor().compress(data)
+        if self.compress == "lz4":
+            return _LZ4 + lz4.frame.compress(data)
+        return _ZLIB + zlib.compress(data)
+
+    def decode(self, payload: bytes) -> Any:
+        header, data = payload[:1], payload[1:]
+        if header == _ZLIB:
+            data = zlib.decompress(data)
+        elif header == _ZSTD:
+            data = zstandard.ZstdDecompressor().decompress(data)
+        elif header == _LZ4:
+            data = lz4.frame.decompress(data)
+        return self.loads(data)
+
+
+class PickleCodec(CacheCodec):
+    """Pickle using protocol 5, which handles large buffers without extra copies."""
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=5)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class MsgpackCodec(CacheCodec):
+    """MessagePack, for JSON-like values (dicts, lists, strings, numbers). Requires the msgpack package."""
+
+    def __init__(self, compress: Optional[str] = None, compress_threshold: int = 1024):
+        if msgpack is None:
+            raise ImproperlyConfigured("MsgpackCodec requires the msgpack package")
+        super().__init__(compress, compress_threshold)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class CacheDecodeError(ValueError):
+    """A cached payload written in a format this code can not read, eg. by a worker still running the previous code."""
+
+
+class ModelCodec(PickleCodec):
+    """
+    Stores a model instance as a snapshot of its concrete field values instead of pickling the whole instance
+    (model state, cached relations, deferred field info...). Decoding builds the instance back with `from_db`,
+    so it behaves like an instance loaded with a plain query.
+
+    Values are stored with their field names, and a snapshot of other fields than the current model's (written
+    before a migration, or by a worker not yet deployed) raises `CacheDecodeError`, so it is read as a cache miss.
+    Fields in `exclude` (eg. secrets) are not stored, they are deferred in the decoded instance.
+    """
+
+    def __init__(self, compress: Optional[str] = None, compress_threshold: int = 1024, exclude: Iterable[str] = ()):
+        super().__init__(compress, compress_threshold)
+        self.exclude = frozenset(exclude)
+
+    def dumps(self, value: Any) -> bytes:
+        if not isinstance(value, models.Model):
+            return super().dumps((None, value))
+        field_names = self._get_field_names(value)
+        field_values = tuple(getattr(value, field_name) for field_name in field_names)
+        return super().dumps((value._meta.label, value._state.db, field_names, field_values))
+
+    def loads(self, data: bytes) -> Any:
+        snapshot = super().loads(data)
+        if snapshot[0] is None:
+            return snapshot[1]
+        label, db, field_names, field_values = snapshot
+        model = apps.get_model(label)
+        if field_names != self._get_field_names(model):
+            raise CacheDecodeError(f"Snapshot of {label} has other fields than the model")
+        return model.from_db(db, field_names, field_values)
+
+    def _get_field_names(self, model) -> tuple[str, ...]:
+        # Primary key is always stored, instances can not be built back without it
+        return tuple(
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.primary_key or field.name not in self.exclude
+        )
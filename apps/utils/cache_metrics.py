@@ -0,0 +1,262 @@
+import dataclasses
+import os
+import pickle
+import threading
+import time
+from typing import Any, Optional
+
+import structlog
+from opentelemetry import metrics, trace
+
+from apps.utils.cache_breaker import CACHE_BACKEND_ERRORS, cache_breaker, shared_cache
+
+logger = structlog.get_logger(__name__)
+
+# How often (in seconds) each process pushes its hit/miss counts to the shared cache for the admin dashboard.
+STATS_FLUSH_INTERVAL = 30
+STATS_KEYS_KEY = "cache_stats:keys"
+STATS_TIMEOUT = 60 * 60 * 24
+
+# Instruments are proxies, they start exporting once `setup_open_telemetry` installs the meter provider.
+_meter = metrics.get_meter(__name__)
+_hits_counter = _meter.create_counter("cache.hits", unit="1", description="Number of cache hits")
+_misses_counter = _meter.create_counter("cache.misses", unit="1", description="Number of cache misses")
+_recompute_histogram = _meter.create_histogram(
+    "cache.recompute.duration", unit="s", description="Time taken to recompute a cached value"
+)
+_payload_histogram = _meter.create_histogram(
+    "cache.payload.size", unit="By", description="Size of the pickled cached value"
+)
+
+_enabled = False
+
+
+class _ThreadStats:
+    """Hit/miss counts of one thread that are not yet flushed: key -> [hits, misses]."""
+
+    def __init__(self):
+        self.thread = threading.current_thread()
+        self.pid = os.getpid()
+        # Only ever contended by the flusher, once per flush
+        self.lock = threading.Lock()
+        self.counts: dict[str, list[int]] = {}
+
+
+# Counts are kept per thread, so recording a hit does not wait on the other threads of the process
+_local_stats = threading.local()
+_all_stats: list[_ThreadStats] = []
+_all_stats_lock = threading.Lock()
+_flusher_pid: Optional[int] = None
+
+
+@dataclasses.dataclass
+class CacheKeyStats:
+    key: str
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+
+def enable_cache_metrics():
+    """Start recording OpenTelemetry metrics and span events. Called once the meter provider is installed."""
+    global _enabled
+    _enabled = True
+
+
+def record_hit(cache_key: str, layer: str):
+    """Record a cache hit. `layer` is where the value was found (eg. `local`, `shared`, `stale`, `request`)."""
+    if not _enabled:
+        return
+    _count(cache_key, 0)
+    attributes = {"cache.key": cache_key, "cache.layer": layer}
+    _hits_counter.add(1, attributes)
+    _add_span_event("cache.hit", attributes)
+
+
+def record_miss(cache_key: str, duration: float, value: Any = None, measure_payload: bool = False):
+    """Record a cache miss and the time it took to recompute the value."""
+    if not _enabled:
+        return
+    _count(cache_key, 1)
+    attributes = {"cache.key": cache_key}
+    _misses_counter.add(1, attributes)
+    _recompute_histogram.record(duration, attributes)
+    if measure_payload:
+        try:
+            _payload_histogram.record(len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)), attributes)
+        except Exception:
+            pass  # Value is not picklable, so it is not stored in a shared cache anyway
+    _add_span_event("cache.miss", {**attributes, "cache.recompute.duration": duration})
+
+
+def get_hot_keys(limit: int = 10) -> list[CacheKeyStats]:
+    """
+    Most accessed cache keys across all processes, since the stats were last expired.
+    Empty while redis is unavailable, so the admin dashboard still renders.
+    """
+    flush_stats()
+    redis_client = _get_redis_client()
+    if redis_client is not None:
+        if not cache_breaker.allow_request():
+            return []
+        try:
+            stats = _read_redis_stats(redis_client)
+        except CACHE_BACKEND_ERRORS as e:
+            cache_breaker.record_failure(e)
+            logger.warning("could not read cache stats", e=e)
+            return []
+        cache_breaker.record_success()
+    else:
+        keys = shared_cache.get(STATS_KEYS_KEY) or []
+        counts = shared_cache.get_many([_stats_key(key, kind) for key in keys for kind in ("hits", "misses")])
+        stats = [
+            CacheKeyStats(key, counts.get(_stats_key(key, "hits"), 0), counts.get(_stats_key(key, "misses"), 0))
+            for key in keys
+        ]
+    # Keys stay registered a little longer than their counts
+    stats = [s for s in stats if s.hits + s.misses]
+    stats.sort(key=lambda s: s.hits + s.misses, reverse=True)
+    return stats[:limit]
+
+
+def flush_stats():
+    """Push hit/miss counts of this process to the shared cache. Runs in the background every `STATS_FLUSH_INTERVAL`."""
+    redis_client = _get_redis_client()
+    if redis_client is not None and not cache_breaker.allow_request():
+        # Counts are kept until redis is back
+        return
+    pending = _take_pending_stats()
+    if not pending:
+        return
+
+    if redis_client is None:
+        _flush_to_cache(pending)
+        return
+    try:
+        _flush_to_redis(redis_client, pending)
+    except CACHE_BACKEND_ERRORS as e:
+        cache_breaker.record_failure(e)
+        logger.warning("could not flush cache stats", e=e)
+    else:
+        cache_breaker.record_success()
+
+
+def _count(cache_key: str, index: int):
+    stats = getattr(_local_stats, "stats", None)
+    if stats is None or stats.pid != os.getpid():
+        stats = _local_stats.stats = _register_thread_stats()
+    with stats.lock:
+        counts = stats.counts.get(cache_key)
+        if counts is None:
+            counts = stats.counts[cache_key] = [0, 0]
+        counts[index] += 1
+
+
+def _register_thread_stats() -> _ThreadStats:
+    """
+    Counts of the current thread, and the flusher thread of this process if it is not running yet.
+    Threads do not survive a fork, so this is checked against the current pid.
+    """
+    global _flusher_pid
+    stats = _ThreadStats()
+    with _all_stats_lock:
+        if _flusher_pid != stats.pid:
+            # Counts of the parent process are flushed by the parent
+            _all_stats.clear()
+            _flusher_pid = stats.pid
+            thread = threading.Thread(target=_flush_periodically, name="cache-stats-flusher", daemon=True)
+            thread.start()
+        _all_stats.append(stats)
+    return stats
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(STATS_FLUSH_INTERVAL)
+        flush_stats()
+
+
+def _take_pending_stats() -> dict[str, list[int]]:
+    """Counts of every thread of this process since the last flush, which start again from zero."""
+    pending: dict[str, list[int]] = {}
+    with _all_stats_lock:
+        all_stats = list(_all_stats)
+        # Threads that have exited are flushed one last time
+        _all_stats[:] = [stats for stats in _all_stats if stats.thread.is_alive()]
+    for stats in all_stats:
+        with stats.lock:
+            counts, stats.counts = stats.counts, {}
+        for key, (hits, misses) in counts.items():
+            total = pending.setdefault(key, [0, 0])
+            total[0] += hits
+            total[1] += misses
+    return pending
+
+
+def _read_redis_stats(redis_client) -> list[CacheKeyStats]:
+    keys = sorted(key.decode() for key in redis_client.smembers(STATS_KEYS_KEY))
+    pipeline = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipeline.hmget(_stats_key(key), "hits", "misses")
+    return [
+        CacheKeyStats(key, int(hits or 0), int(misses or 0)) for key, (hits, misses) in zip(keys, pipeline.execute())
+    ]
+
+
+def _flush_to_redis(redis_client, pending: dict[str, list[int]]):
+    # A set of keys and a hash of counts per key, updated atomically by redis, in a single round trip
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.sadd(STATS_KEYS_KEY, *pending)
+    pipeline.expire(STATS_KEYS_KEY, STATS_TIMEOUT)
+    for key, (hits, misses) in pending.items():
+        if hits:
+            pipeline.hincrby(_stats_key(key), "hits", hits)
+        if misses:
+            pipeline.hincrby(_stats_key(key), "misses", misses)
+        pipeline.expire(_stats_key(key), STATS_TIMEOUT)
+    pipeline.execute()
+
+
+def _flush_to_cache(pending: dict[str, list[int]]):
+    # Without redis the cache is local to the process (`LocMemCache`), so nothing else updates the keys
+    keys = shared_cache.get(STATS_KEYS_KEY) or []
+    new_keys = [key for key in pending if key not in keys]
+    if new_keys:
+        shared_cache.set(STATS_KEYS_KEY, keys + new_keys, timeout=STATS_TIMEOUT)
+    for key, (hits, misses) in pending.items():
+        _incr(_stats_key(key, "hits"), hits)
+        _incr(_stats_key(key, "misses"), misses)
+
+
+def _incr(stats_key: str, delta: int):
+    if delta == 0:
+        return
+    if shared_cache.add(stats_key, delta, timeout=STATS_TIMEOUT):
+        return
+    try:
+        shared_cache.incr(stats_key, delta)
+    except ValueError:
+        # Expired between add and incr
+        shared_cache.set(stats_key, delta, timeout=STATS_TIMEOUT)
+
+
+def _get_redis_client():
+    # Imported here, `apps.utils.cache` records its hits and misses with this module
+    from apps.utils.cache import get_redis_client
+
+    return get_redis_client()
+
+
+def _stats_key(cache_key: str, kind: Optional[str] = None) -> str:
+    # Hash of both counts in redis, a key per count in the Django cache
+    return f"cache_stats:{cache_key}:{kind}" if kind else f"cache_stats:{cache_key}"
+
+
+def _add_span_event(name: str, attributes: dict[str, Any]):
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.add_event(name, attributes)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Middleware that Django's own checks (security.W002, security.W003, admin.E408, admin.E409, admin.E410) look for
+# in MIDDLEWARE. They run in BROWSER_MIDDLEWARE instead, where these checks look for them.
+REQUIRED_BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+
+@register(Tags.security, Tags.admin)
+def check_browser_middleware(app_configs, **kwargs) -> list[Error]:
+    """Browser facing pages (the admin, the API docs) still get sessions, CSRF and clickjacking protection."""
+    errors = []
+    if "apps.utils.middlewares.BrowserMiddleware" not in settings.MIDDLEWARE:
+        errors.append(
+            Error(
+                "'apps.utils.middlewares.BrowserMiddleware' must be in MIDDLEWARE.",
+                hint="It runs BROWSER_MIDDLEWARE, which the admin needs.",
+                id="utils.E001",
+            )
+        )
+    for middleware in REQUIRED_BROWSER_MIDDLEWARE:
+        if middleware not in settings.BROWSER_MIDDLEWARE:
+            errors.append(Error(f"'{middleware}' must be in BROWSER_MIDDLEWARE.", id="utils.E002"))
+    return errors
@@ -0,0 +1,59 @@
+import contextlib
+import contextvars
+import dataclasses
+from typing import Any, Iterator, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclasses.dataclass
+class MemoScope:
+    """Values memoized for a single unit of work (a request or a celery task), see `cache_current_scope_result`."""
+
+    name: str
+    values: dict[str, Any] = dataclasses.field(default_factory=dict)
+    # Computations in progress in async code, so concurrent callers await the same one
+    pending: dict[str, Any] = dataclasses.field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+
+_current_scope: contextvars.ContextVar[Optional[MemoScope]] = contextvars.ContextVar("memo_scope", default=None)
+
+
+def get_current_memo_scope() -> Optional[MemoScope]:
+    return _current_scope.get()
+
+
+def open_memo_scope(name: str) -> contextvars.Token:
+    """Start a new memo scope in the current context. Must be closed with `close_memo_scope`."""
+    return _current_scope.set(MemoScope(name))
+
+
+def close_memo_scope(token: contextvars.Token):
+    scope = _current_scope.get()
+    _current_scope.reset(token)
+    if scope is not None:
+        logger.debug("memo scope closed", scope=scope.name, hits=scope.hits, misses=scope.misses)
+
+
+@contextlib.contextmanager
+def memo_scope(name: str) -> Iterator[MemoScope]:
+    """
+    Memoize `cache_current_scope_result` functions for the duration of the block.
+
+    Usage:
+        ```
+        with memo_scope("import_users") as scope:
+            import_users()
+        print(scope.hits, scope.misses)
+        ```
+    """
+    scope = MemoScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        close_memo_scope(token)
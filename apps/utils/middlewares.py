@@ -0,0 +1,180 @@
+import re
+from typing import Any, Callable, Optional
+
+from asgiref.sync import (
+    async_to_sync,
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+
+from apps.utils.memo import memo_scope
+
+
+class MemoScopeMiddleware:
+    """Opens a memo scope for every request, see `cache_current_scope_result`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with memo_scope(f"{request.method} {request.path}"):
+            return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        with memo_scope(f"{request.method} {request.path}"):
+            return await self.get_response(request)
+
+
+class PathScopedMiddleware:
+    """
+    Runs a nested middleware stack (`get_middleware`) for every request except the ones whose path starts
+    with one of `get_excluded_path_prefixes`, which skip it and go straight to the rest of the chain.
+
+    The nested middleware are loaded the same way Django loads `MIDDLEWARE`, and their `process_view`,
+    `process_template_response` and `process_exception` hooks are forwarded for the requests that run them.
+    They must be sync and async capable, as they run in the mode of this middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        prefixes = self.get_excluded_path_prefixes()
+        self.excluded_path_pattern = re.compile("|".join(re.escape(p) for p in prefixes)) if prefixes else None
+
+        view_middleware: list[Callable] = []
+        template_response_middleware: list[Callable] = []
+        exception_middleware: list[Callable] = []
+        handler = get_response
+        for middleware_path in reversed(self.get_middleware()):
+            middleware = import_string(middleware_path)
+            if not (getattr(middleware, "sync_capable", True) and getattr(middleware, "async_capable", False)):
+                raise ImproperlyConfigured(f"Path scoped middleware {middleware_path} must be sync and async capable")
+            try:
+                instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(instance, "process_view"):
+                view_middleware.insert(0, self.adapt_method_mode(self.is_async, instance.process_view))
+            if hasattr(instance, "process_template_response"):
+                template_response_middleware.append(
+                    self.adapt_method_mode(self.is_async, instance.process_template_response)
+                )
+            if hasattr(instance, "process_exception"):
+                # Django always runs exception hooks synchronously
+                exception_middleware.append(self.adapt_method_mode(False, instance.process_exception))
+            handler = convert_exception_to_response(instance)
+        self.scoped_handler = handler
+        self.view_middleware = view_middleware
+        self.template_response_middleware = template_response_middleware
+        self.exception_middleware = exception_middleware
+
+        # Hooks are only exposed when the nested stack has some, so excluded requests do not pay for them
+        if view_middleware:
+            self.process_view = self._aprocess_view if self.is_async else self._process_view
+        if template_response_middleware:
+            self.process_template_response = (
+                self._aprocess_template_response if self.is_async else self._process_template_response
+            )
+        if exception_middleware:
+            self.process_exception = self._process_exception
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def get_middleware(self) -> list[str]:
+        raise NotImplementedError()
+
+    def get_excluded_path_prefixes(self) -> list[str]:
+        raise NotImplementedError()
+
+    @staticmethod
+    def adapt_method_mode(is_async: bool, method: Callable) -> Callable:
+        if is_async and not iscoroutinefunction(method):
+            return sync_to_async(method, thread_sensitive=True)
+        if not is_async and iscoroutinefunction(method):
+            return async_to_sync(method)
+        return method
+
+    def is_excluded(self, request: HttpRequest) -> bool:
+        return self.excluded_path_pattern is not None and self.excluded_path_pattern.match(request.path) is not None
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        if self.is_excluded(request):
+            return self.get_response(request)
+        return self.scoped_handler(request)
+
+    async def __acall__(self, request: HttpRequest):
+        if self.is_excluded(request):
+            return await self.get_response(request)
+        return await self.scoped_handler(request)
+
+    def _process_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> Optional[Any]:
+        if self.is_excluded(request):
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    async def _aprocess_view(self, request: HttpRequest, view_func, view_args, view_kwargs) -> Optional[Any]:
+        if self.is_excluded(request):
+            return None
+        for process_view in self.view_middleware:
+            response = await process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def _process_template_response(self, request: HttpRequest, response):
+        if self.is_excluded(request):
+            return response
+        for process_template_response in self.template_response_middleware:
+            response = process_template_response(request, response)
+        return response
+
+    async def _aprocess_template_response(self, request: HttpRequest, response):
+        if self.is_excluded(request):
+            return response
+        for process_template_response in self.template_response_middleware:
+            response = await process_template_response(request, response)
+        return response
+
+    def _process_exception(self, request: HttpRequest, exception: Exception) -> Optional[Any]:
+        if self.is_excluded(request):
+            return None
+        for process_exception in self.exception_middleware:
+            response = process_exception(request, exception)
+            if response is not None:
+                return response
+        return None
+
+
+class BrowserMiddleware(PathScopedMiddleware):
+    """
+    Middleware only needed by browser facing pages like the admin and the API docs (sessions, CSRF, messages...).
+    API requests are authenticated with JWT and skip them, see `BROWSER_MIDDLEWARE` in settings.
+    """
+
+    def get_middleware(self) -> list[str]:
+        return settings.BROWSER_MIDDLEWARE
+
+    def get_excluded_path_prefixes(self) -> list[str]:
+        return settings.BROWSER_MIDDLEWARE_EXCLUDED_PATH_PREFIXES
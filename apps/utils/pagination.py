@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+# Cursors are signed, so clients can only follow them, not craft their own positions
+CURSOR_SALT = "apps.utils.pagination.cursor"
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination: the next page is the rows after the last row of this page in the ordering, read through
+    the index of the ordering (eg. `users_user_date_joined_idx`). Unlike page numbers, a page costs the same
+    however deep it is, and there is no `COUNT(*)` unless the client asks for it with `?count=true`.
+
+    Orders by the `ordering` of the view, else of the model. The primary key is added as a tie-breaker, so the
+    ordering is stable, which means the index must end with it as well to avoid a sort.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = settings.REST_FRAMEWORK["MAX_PAGE_SIZE"]
+    count_query_param = "count"
+    count_query_description = _("Whether to include the total number of results, which costs an extra query.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, "").lower() in ("1", "true"):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        self.ordering = getattr(view, "ordering", None) or queryset.model._meta.ordering or "-pk"
+        ordering = super().get_ordering(request, queryset, view)
+        if not {"pk", queryset.model._meta.pk.name} & {field.lstrip("-") for field in ordering}:
+            ordering += ("-pk" if ordering[0].startswith("-") else "pk",)
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            offset, reverse, position = signing.loads(encoded, salt=CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=min(offset, self.offset_cutoff), reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        encoded = signing.dumps([cursor.offset, cursor.reverse, cursor.position], salt=CURSOR_SALT, compress=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)  # type: ignore[arg-type]
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data = {"count": self.count, **response.data}
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {"count": {"type": "integer", "example": 123}, **response_schema["properties"]}
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append(
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.count_query_description,
+                "schema": {"type": "boolean"},
+            }
+        )
+        return parameters
@@ -1,7 +1,9 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 from apps.users.choices import UserTypes
-from apps.users.models import User
 
 
 class IsSameUser(permissions.BasePermission):
@@ -13,9 +15,21 @@ class IsCustomer(permissions.DjangoModelPermissions):
     """A customer that is enrolled to a branch."""
 
     def has_permission(self, request, view):
+        # Works with users built from token claims (`TokenUser`) as well
         return (
             request.user
             and request.user.is_authenticated
-            and isinstance(request.user, User)
-            and request.user.user_type == UserTypes.CUSTOMER
+            and getattr(request.user, "user_type", None) == UserTypes.CUSTOMER
         )
+
+
+class IsTokenIntrospectionService(permissions.BasePermission):
+    """A service sending one of the keys of `TOKEN_INTROSPECTION_SERVICE_KEYS` in the `X-Service-Key` header."""
+
+    def has_permission(self, request, view):
+        key = request.headers.get("X-Service-Key", "").encode()
+        # Every key is compared in constant time, so response times do not tell which key or how much of it matched
+        matches = [
+            hmac.compare_digest(key, service_key.encode()) for service_key in settings.TOKEN_INTROSPECTION_SERVICE_KEYS
+        ]
+        return bool(key) and any(matches)
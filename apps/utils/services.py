@@ -5,6 +5,7 @@ import structlog
 from django.db import models
 from kombu import Connection, exceptions
 
+from apps.utils.cache_breaker import cache_breaker
 from config import settings
 
 logger = structlog.get_logger(__name__)
@@ -41,10 +42,17 @@ def get_celery_info():
 def get_cache_info():
     if not settings.REDIS_URL:
         return ServiceInfo("Debug", ServiceStatus.WARNING, "In-memory cache")
+    if cache_breaker.is_open:
+        message = f"Circuit breaker {cache_breaker.state.label.lower()}, serving from process memory and database"
+        return ServiceInfo("Redis", ServiceStatus.WARNING, message)
     try:
-        client = redis.from_url(settings.REDIS_URL)
+        client = redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
         if client.ping():
-            return ServiceInfo("Redis", ServiceStatus.HEALTHLY, "Running")
+            return ServiceInfo("Redis", ServiceStatus.HEALTHLY, "Running, circuit breaker closed")
         return ServiceInfo("Redis", ServiceStatus.UNHEALTHY, "Ping Failed")
     except redis.ConnectionError as e:
         logger.error("could not connect to redis", e=e)
@@ -0,0 +1,57 @@
+import re
+
+from django.db import connection
+from django.test import TestCase as DjangoTestCase
+
+from apps.utils.cache import clear_caches
+
+# Plan lines of a sequential scan of a table, and of a sort that an index could have avoided
+SEQUENTIAL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (?!.*\bUSING\b)"),
+    "postgresql": re.compile(r"\bSeq Scan\b"),
+}
+SORT_PATTERNS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE FOR ORDER BY\b"),
+    "postgresql": re.compile(r"^\s*(->\s*)?Sort\b", re.MULTILINE),
+}
+
+
+class TestCase(DjangoTestCase):
+    """
+    Test case of the project. Caches are cleared around every test, as the database changes of a test are rolled
+    back but the values cached from them would otherwise be served to the next tests.
+    """
+
+    @classmethod
+    def _pre_setup(cls):
+        super()._pre_setup()  # type: ignore[misc]
+        clear_caches()
+
+    def _post_teardown(self):
+        super()._post_teardown()  # type: ignore[misc]
+        clear_caches()
+
+
+class QueryPlanTestCase(TestCase):
+    """
+    Asserts on the query plans (EXPLAIN) of querysets, on SQLite and PostgreSQL.
+    On PostgreSQL sequential scans are disabled for the test: test tables are tiny, so scanning them
+    would always win, and a sequential scan in the plan then means no index can serve the query.
+    """
+
+    def get_query_plan(self, queryset) -> str:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name: str, ordered: bool = False):
+        """Assert the query reads through `index_name` without any sequential scan (and without sorting)."""
+        plan = self.get_query_plan(queryset)
+        self.assertIn(index_name, plan, f"Index {index_name} is not used:\n{plan}")
+        pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is not None:
+            self.assertIsNone(pattern.search(plan), f"Query plan has a sequential scan:\n{plan}")
+        pattern = SORT_PATTERNS.get(connection.vendor)
+        if ordered and pattern is not None:
+            self.assertIsNone(pattern.search(plan), f"Query plan sorts the rows:\n{plan}")
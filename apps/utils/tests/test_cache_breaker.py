@@ -0,0 +1,116 @@
+import logging
+from unittest import mock
+
+import redis
+from django.core.cache import cache
+
+from apps.utils import services
+from apps.utils.cache import cache_global_property, clear_caches
+from apps.utils.cache_breaker import (
+    CircuitBreaker,
+    CircuitBreakerState,
+    ResilientCache,
+    cache_breaker,
+)
+from apps.utils.services import ServiceStatus, get_cache_info
+from apps.utils.testing import TestCase
+
+
+class CacheBreakerTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        cache_breaker.reset()
+        clear_caches()
+
+    def tearDown(self):
+        cache_breaker.reset()
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_breaker_opens_after_threshold_and_recovers_after_probe(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=0)
+        error = redis.ConnectionError("down")
+
+        breaker.record_failure(error)
+        self.assertEqual(breaker.state, CircuitBreakerState.CLOSED)
+        breaker.record_failure(error)
+        self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+
+        # Probe fails, breaker opens again
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreakerState.HALF_OPEN)
+        breaker.record_failure(error)
+        self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+
+        # Probe succeeds, breaker closes
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreakerState.CLOSED)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_open_breaker_rejects_calls_until_recovery_timeout(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=60)
+        breaker.record_failure(redis.ConnectionError("down"))
+
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_resilient_cache_falls_back_on_backend_errors(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+        resilient_cache = ResilientCache(breaker)
+
+        with mock.patch("apps.utils.cache_breaker.cache") as backend:
+            backend.get.side_effect = redis.TimeoutError("slow")
+            backend.add.side_effect = redis.TimeoutError("slow")
+            self.assertEqual(resilient_cache.get("key", "default"), "default")
+            self.assertTrue(resilient_cache.add("key", 1))
+            self.assertEqual(breaker.state, CircuitBreakerState.OPEN)
+
+            # Backend is not called at all while the breaker is open
+            backend.get.reset_mock()
+            self.assertIsNone(resilient_cache.get("key"))
+            backend.get.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_global_property_serves_expired_local_copy_while_breaker_is_open(self):
+        calls = {"count": 0}
+
+        @cache_global_property("breaker_local_key", timeout=60, local_timeout=0)
+        def get_value():
+            calls["count"] += 1
+            return "value"
+
+        self.assertEqual(get_value(), "value")
+        self.assertEqual(calls["count"], 1)
+
+        for _ in range(cache_breaker.failure_threshold):
+            cache_breaker.record_failure(redis.ConnectionError("down"))
+        self.assertEqual(get_value(), "value")
+        self.assertEqual(calls["count"], 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_global_property_computes_without_cache_while_breaker_is_open(self):
+        calls = {"count": 0}
+
+        @cache_global_property("breaker_no_local_key", timeout=60, single_flight=True)
+        def get_value():
+            calls["count"] += 1
+            return "value"
+
+        for _ in range(cache_breaker.failure_threshold):
+            cache_breaker.record_failure(redis.ConnectionError("down"))
+        self.assertEqual(get_value(), "value")
+        self.assertEqual(get_value(), "value")
+        self.assertEqual(calls["count"], 2)
+        self.assertIsNone(cache.get("breaker_no_local_key"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_info_shows_open_breaker(self):
+        for _ in range(cache_breaker.failure_threshold):
+            cache_breaker.record_failure(redis.ConnectionError("down"))
+
+        with mock.patch.object(services.settings, "REDIS_URL", "redis://localhost:6379/0"):
+            info = get_cache_info()
+        self.assertEqual(info.status, ServiceStatus.WARNING)
+        self.assertIn("Circuit breaker open", info.message)
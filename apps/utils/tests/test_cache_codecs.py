@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.dashboard.models import GlobalSetting
+from apps.utils.cache import cache_function_result, cache_global_property, clear_caches
+from apps.utils.cache_codecs import CacheDecodeError, ModelCodec, PickleCodec
+from apps.utils.testing import TestCase
+
+
+class CacheCodecsTestCase(TestCase):
+    def tearDown(self):
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_pickle_codec_round_trip(self):
+        codec = PickleCodec()
+        value = {"mode": "prod", "items": [1, 2, 3]}
+        self.assertEqual(codec.decode(codec.encode(value)), value)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_compression_only_above_threshold(self):
+        codec = PickleCodec(compress="zlib", compress_threshold=100)
+        small_value = "a" * 10
+        large_value = "a" * 10_000
+
+        small_payload = codec.encode(small_value)
+        large_payload = codec.encode(large_value)
+        self.assertEqual(small_payload[:1], b"\x00")
+        self.assertEqual(large_payload[:1], b"\x01")
+        self.assertLess(len(large_payload), 1_000)
+        self.assertEqual(codec.decode(small_payload), small_value)
+        self.assertEqual(codec.decode(large_payload), large_value)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_unknown_compression_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            PickleCodec(compress="brotli")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_model_codec_round_trip(self):
+        setting = GlobalSetting.objects.create(name="Codec", is_maintenance_mode=True, maintenance_mode_message="Down")
+        codec = ModelCodec()
+
+        payload = codec.encode(setting)
+        decoded = codec.decode(payload)
+        self.assertIsInstance(decoded, GlobalSetting)
+        self.assertEqual(decoded.pk, setting.pk)
+        self.assertEqual(decoded.name, "Codec")
+        self.assertTrue(decoded.is_maintenance_mode)
+        self.assertEqual(decoded.maintenance_mode_message, "Down")
+        self.assertEqual(decoded.created, setting.created)
+        self.assertFalse(decoded._state.adding)
+
+        # Snapshot is smaller than the pickled instance
+        self.assertLess(len(payload), len(PickleCodec().encode(setting)))
+
+        # Other values are passed through
+        self.assertEqual(codec.decode(codec.encode([1, 2])), [1, 2])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_with_codec(self):
+        setting = GlobalSetting.objects.create(name="Cached")
+
+        @cache_global_property("codec_global_key", timeout=60, codec=ModelCodec())
+        def get_setting():
+            return GlobalSetting.objects.get(pk=setting.pk)
+
+        get_setting()
+        with self.assertNumQueries(0):
+            cached = get_setting()
+        self.assertIsInstance(cached, GlobalSetting)
+        self.assertEqual(cached.pk, setting.pk)
+        self.assertIsInstance(cache.get("codec_global_key").value, bytes)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_model_codec_rejects_snapshot_of_other_fields(self):
+        setting = GlobalSetting.objects.create(name="Codec")
+        codec = ModelCodec()
+        label, db, field_names, field_values = PickleCodec().decode(codec.encode(setting))
+
+        # Written by a worker running the code before a field was added, or after one was renamed
+        for names, values in [
+            (field_names[:-1], field_values[:-1]),
+            ((*field_names[:-1], "other_field"), field_values),
+        ]:
+            payload = PickleCodec().encode((label, db, names, values))
+            with self.assertRaises(CacheDecodeError):
+                codec.decode(payload)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_undecodable_entries_are_cache_misses(self):
+        setting = GlobalSetting.objects.create(name="Cached")
+        codec = ModelCodec()
+        calls = {"count": 0}
+
+        @cache_global_property("codec_stale_key", timeout=60, codec=codec)
+        def get_setting():
+            calls["count"] += 1
+            return GlobalSetting.objects.get(pk=setting.pk)
+
+        @cache_function_result("codec_stale_fn", timeout=60, codec=codec)
+        def get_setting_by_pk(pk):
+            calls["count"] += 1
+            return GlobalSetting.objects.get(pk=pk)
+
+        get_setting()
+        get_setting_by_pk(setting.pk)
+        with mock.patch.object(ModelCodec, "_get_field_names", return_value=("id", "name")):
+            self.assertEqual(get_setting().pk, setting.pk)
+            self.assertEqual(get_setting_by_pk(setting.pk).pk, setting.pk)
+        self.assertEqual(calls["count"], 4)
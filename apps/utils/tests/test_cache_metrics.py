@@ -0,0 +1,123 @@
+import threading
+from unittest import mock
+
+import redis
+
+from apps.utils import cache_metrics
+from apps.utils.cache import cache_global_property, clear_caches
+from apps.utils.cache_breaker import cache_breaker
+from apps.utils.testing import TestCase
+
+
+class CacheMetricsTestCase(TestCase):
+    def setUp(self):
+        # Drop the counts recorded by other tests
+        cache_breaker.reset()
+        cache_metrics.flush_stats()
+        clear_caches()
+
+    def tearDown(self):
+        cache_breaker.reset()
+        cache_metrics.flush_stats()
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @mock.patch.object(cache_metrics, "_enabled", True)
+    def test_hot_keys_count_hits_and_misses(self):
+        @cache_global_property("metrics_hot_key", timeout=60)
+        def get_hot():
+            return "hot"
+
+        @cache_global_property("metrics_cold_key", timeout=60)
+        def get_cold():
+            return "cold"
+
+        for _ in range(4):
+            get_hot()
+        get_cold()
+
+        hot_keys = {stats.key: stats for stats in cache_metrics.get_hot_keys()}
+        self.assertEqual(hot_keys["metrics_hot_key"].hits, 3)
+        self.assertEqual(hot_keys["metrics_hot_key"].misses, 1)
+        self.assertEqual(hot_keys["metrics_hot_key"].hit_ratio, 0.75)
+        self.assertEqual(hot_keys["metrics_cold_key"].misses, 1)
+
+        # Counts flushed by other processes are added up
+        get_hot()
+        hot_keys = {stats.key: stats for stats in cache_metrics.get_hot_keys()}
+        self.assertEqual(hot_keys["metrics_hot_key"].hits, 4)
+        self.assertEqual(cache_metrics.get_hot_keys(limit=1)[0].key, "metrics_hot_key")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @mock.patch.object(cache_metrics, "_enabled", True)
+    def test_hot_keys_count_hits_of_every_thread(self):
+        def hit():
+            for _ in range(100):
+                cache_metrics.record_hit("metrics_threads_key", "local")
+
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cache_metrics.record_hit("metrics_threads_key", "local")
+
+        hot_keys = {stats.key: stats for stats in cache_metrics.get_hot_keys()}
+        self.assertEqual(hot_keys["metrics_threads_key"].hits, 401)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @mock.patch.object(cache_metrics, "_enabled", True)
+    def test_flush_updates_redis_in_one_round_trip(self):
+        redis_client = mock.Mock()
+        cache_metrics.record_hit("metrics_redis_key", "shared")
+        cache_metrics.record_hit("metrics_redis_key", "shared")
+        cache_metrics.record_miss("metrics_redis_key", 0.1)
+
+        with mock.patch.object(cache_metrics, "_get_redis_client", return_value=redis_client):
+            cache_metrics.flush_stats()
+        pipeline = redis_client.pipeline.return_value
+        pipeline.sadd.assert_called_once_with(cache_metrics.STATS_KEYS_KEY, "metrics_redis_key")
+        pipeline.hincrby.assert_has_calls(
+            [
+                mock.call("cache_stats:metrics_redis_key", "hits", 2),
+                mock.call("cache_stats:metrics_redis_key", "misses", 1),
+            ]
+        )
+        pipeline.execute.assert_called_once_with()
+        redis_client.get.assert_not_called()
+        redis_client.set.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_hot_keys_empty_when_redis_is_down(self):
+        redis_client = mock.Mock()
+        redis_client.smembers.side_effect = redis.ConnectionError("down")
+
+        with mock.patch.object(cache_metrics, "_get_redis_client", return_value=redis_client):
+            self.assertEqual(cache_metrics.get_hot_keys(), [])
+            self.assertEqual(cache_breaker._failures, 1)
+
+            # Redis is not called while the breaker is open
+            for _ in range(cache_breaker.failure_threshold):
+                cache_breaker.record_failure(redis.ConnectionError("down"))
+            redis_client.reset_mock()
+            self.assertEqual(cache_metrics.get_hot_keys(), [])
+        redis_client.smembers.assert_not_called()
+        redis_client.pipeline.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_nothing_counted_when_disabled(self):
+        with mock.patch.object(cache_metrics, "_hits_counter") as hits_counter:
+            cache_metrics.record_hit("metrics_disabled_key", "local")
+        hits_counter.add.assert_not_called()
+        self.assertNotIn("metrics_disabled_key", {stats.key for stats in cache_metrics.get_hot_keys()})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_otel_instruments_used_when_enabled(self):
+        with (
+            mock.patch.object(cache_metrics, "_enabled", True),
+            mock.patch.object(cache_metrics, "_misses_counter") as misses_counter,
+            mock.patch.object(cache_metrics, "_payload_histogram") as payload_histogram,
+        ):
+            cache_metrics.record_miss("metrics_enabled_key", 0.1, {"a": 1}, measure_payload=True)
+        misses_counter.add.assert_called_once_with(1, {"cache.key": "metrics_enabled_key"})
+        payload_histogram.record.assert_called_once()
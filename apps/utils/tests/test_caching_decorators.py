@@ -1,14 +1,26 @@
+import asyncio
+import threading
+import time
 import uuid
 from typing import Any
+from unittest import mock
 
 from django.core.cache import cache
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory
+from rest_framework import serializers
 
+from apps.users.models import User
 from apps.utils.cache import (
+    _CacheEntry,
+    _handle_invalidation_message,
     cache_current_request_property,
+    cache_function_result,
     cache_global_property,
     cache_serializer_result_per_object,
+    invalidate_global_property,
+    invalidate_tag,
 )
+from apps.utils.testing import TestCase
 
 
 class CachingDecoratorsTestCase(TestCase):
@@ -37,6 +49,324 @@ class CachingDecoratorsTestCase(TestCase):
         assert v3 == {"mode": "prod"}
         assert calls["count"] == 2
 
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_serves_from_local_cache(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_local_key", timeout=60, local_timeout=60)
+        def get_settings():
+            calls["count"] += 1
+            return {"mode": "prod"}
+
+        self.assertEqual(get_settings(), {"mode": "prod"})
+        self.assertEqual(calls["count"], 1)
+
+        # Django cache is bypassed while the local copy is fresh
+        cache.delete("global_local_key")
+        self.assertEqual(get_settings(), {"mode": "prod"})
+        self.assertEqual(calls["count"], 1)
+
+        # Invalidation drops both layers
+        invalidate_global_property("global_local_key")
+        self.assertIsNone(cache.get("global_local_key"))
+        self.assertEqual(get_settings(), {"mode": "prod"})
+        self.assertEqual(calls["count"], 2)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_local_cache_expires(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_local_expiry_key", timeout=60, local_timeout=0)
+        def get_settings():
+            calls["count"] += 1
+            return {"mode": "prod"}
+
+        get_settings()
+        cache.delete("global_local_expiry_key")
+        get_settings()
+        self.assertEqual(calls["count"], 2)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_invalidation_message_drops_local_copy(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_broadcast_key", timeout=60, local_timeout=60)
+        def get_settings():
+            calls["count"] += 1
+            return {"mode": "prod"}
+
+        get_settings()
+        # Simulate another worker invalidating the key
+        cache.delete("global_broadcast_key")
+        _handle_invalidation_message({"type": "message", "data": b"global_broadcast_key"})
+        get_settings()
+        self.assertEqual(calls["count"], 2)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_serves_stale_value_while_locked(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_stale_key", timeout=60, stale_timeout=30)
+        def get_settings():
+            calls["count"] += 1
+            return "new"
+
+        # Expired value, while another caller holds the recompute lock
+        cache.set("global_stale_key", _CacheEntry("old", time.time() - 1, 0))
+        cache.add("global_stale_key:lock", 1)
+        self.assertEqual(get_settings(), "old")
+        self.assertEqual(calls["count"], 0)
+
+        # Once the lock is released, the next caller recomputes
+        cache.delete("global_stale_key:lock")
+        self.assertEqual(get_settings(), "new")
+        self.assertEqual(calls["count"], 1)
+        self.assertIsNone(cache.get("global_stale_key:lock"))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_single_flight_waits_for_lock_holder(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_single_flight_key", timeout=60, single_flight=True)
+        def get_settings():
+            calls["count"] += 1
+            return "computed"
+
+        def fill_cache():
+            time.sleep(0.1)
+            cache.set("global_single_flight_key", _CacheEntry("from_other_worker", time.time() + 60, 0))
+
+        cache.add("global_single_flight_key:lock", 1)
+        thread = threading.Thread(target=fill_cache)
+        thread.start()
+        self.assertEqual(get_settings(), "from_other_worker")
+        thread.join()
+        self.assertEqual(calls["count"], 0)
+        cache.delete("global_single_flight_key:lock")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_single_flight_gives_up_after_lock_timeout(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_stuck_lock_key", timeout=60, single_flight=True, lock_timeout=0.1)
+        def get_settings():
+            calls["count"] += 1
+            return "computed"
+
+        cache.add("global_stuck_lock_key:lock", 1, timeout=60)
+        self.assertEqual(get_settings(), "computed")
+        self.assertEqual(calls["count"], 1)
+        cache.delete("global_stuck_lock_key:lock")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_early_expiration(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_early_key", timeout=60, early_expiration=1)
+        def get_settings():
+            calls["count"] += 1
+            return "new"
+
+        # Not yet expired, but it took very long to compute, so it is refreshed ahead of time
+        cache.set("global_early_key", _CacheEntry("old", time.time() + 0.5, 1000))
+        self.assertEqual(get_settings(), "new")
+        self.assertEqual(calls["count"], 1)
+
+        # Freshly computed value is not refreshed early
+        self.assertEqual(get_settings(), "new")
+        self.assertEqual(calls["count"], 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_caches_none(self):
+        calls = {"count": 0}
+
+        @cache_global_property("global_none_key", timeout=60)
+        def get_settings():
+            calls["count"] += 1
+            return None
+
+        self.assertIsNone(get_settings())
+        self.assertIsNone(get_settings())
+        self.assertEqual(calls["count"], 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_global_property_negative_timeout(self):
+        results: dict[str, list[str]] = {"value": []}
+
+        @cache_global_property("global_negative_key", timeout=600, negative_timeout=5)
+        def get_settings():
+            return results["value"]
+
+        # Empty result uses the negative timeout
+        self.assertEqual(get_settings(), [])
+        entry = cache.get("global_negative_key")
+        self.assertAlmostEqual(entry.expires_at, time.time() + 5, delta=1)
+
+        # Positive result uses the regular timeout
+        cache.delete("global_negative_key")
+        results["value"] = ["configured"]
+        self.assertEqual(get_settings(), ["configured"])
+        entry = cache.get("global_negative_key")
+        self.assertAlmostEqual(entry.expires_at, time.time() + 600, delta=1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_function_result_caches_per_arguments(self):
+        calls = {"count": 0}
+
+        @cache_function_result("greeting", timeout=60)
+        def get_greeting(name, locale="en"):
+            calls["count"] += 1
+            return f"{locale}:{name}"
+
+        self.assertEqual(get_greeting("a"), "en:a")
+        self.assertEqual(get_greeting("a", locale="en"), "en:a")
+        self.assertEqual(get_greeting(name="a"), "en:a")
+        self.assertEqual(calls["count"], 1)
+
+        self.assertEqual(get_greeting("a", "si"), "si:a")
+        self.assertEqual(get_greeting("b"), "en:b")
+        self.assertEqual(calls["count"], 3)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_function_result_version_separates_entries(self):
+        @cache_function_result("versioned", timeout=60, version=1)
+        def get_v1(value):
+            return {"value": value}
+
+        @cache_function_result("versioned", timeout=60, version=2)
+        def get_v2(value):
+            return [value]
+
+        self.assertEqual(get_v1(1), {"value": 1})
+        self.assertEqual(get_v2(1), [1])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_function_result_invalidated_by_tag(self):
+        user = User.objects.create_user(username="tagged")
+        other_user = User.objects.create_user(username="untagged")
+        calls = {"count": 0}
+
+        @cache_function_result("user_label", timeout=60, tags=lambda user, locale: [f"user:{user.pk}"])
+        def get_label(user, locale):
+            calls["count"] += 1
+            return f"{locale}:{user.username}"
+
+        get_label(user, "en")
+        get_label(user, "si")
+        get_label(other_user, "en")
+        self.assertEqual(calls["count"], 3)
+
+        invalidate_tag(f"user:{user.pk}")
+        get_label(user, "en")
+        get_label(user, "si")
+        get_label(other_user, "en")
+        self.assertEqual(calls["count"], 5)
+
+        # Saving the user invalidates the user tag
+        user.first_name = "Changed"
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+        get_label(user, "en")
+        self.assertEqual(calls["count"], 6)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_function_result_get_many_loads_misses_at_once(self):
+        loads = []
+
+        @cache_function_result("label", timeout=60, tags=lambda name, locale: [f"label:{name}"])
+        def get_label(name, locale):
+            return f"{locale}:{name}"
+
+        def load_labels(calls):
+            loads.append(calls)
+            return [f"{locale}:{name}" for name, locale in calls]
+
+        get_label("a", "en")
+        labels = get_label.get_many([("a", "en"), ("b", "en"), ("c", "si")], load_labels)  # type: ignore[attr-defined]
+        self.assertEqual(labels, ["en:a", "en:b", "si:c"])
+        self.assertEqual(loads, [[("b", "en"), ("c", "si")]])
+
+        # Entries are shared with the function, and invalidated by tag
+        invalidate_tag("label:b")
+        labels = get_label.get_many([("a", "en"), ("b", "en"), ("c", "si")], load_labels)  # type: ignore[attr-defined]
+        self.assertEqual(labels, ["en:a", "en:b", "si:c"])
+        self.assertEqual(loads[1:], [[("b", "en")]])
+        with mock.patch.object(cache, "set") as cache_set:
+            self.assertEqual(get_label("c", "si"), "si:c")
+        cache_set.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_function_result_rejects_unstable_arguments(self):
+        @cache_function_result("unstable", timeout=60)
+        def get_value(obj):
+            return obj
+
+        with self.assertRaises(TypeError):
+            get_value(object())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_cache_global_property_caches_and_reuses_result(self):
+        calls = {"count": 0}
+
+        @cache_global_property("async_global_key", timeout=60, local_timeout=60, single_flight=True)
+        async def get_settings():
+            calls["count"] += 1
+            return {"mode": "prod"}
+
+        self.assertEqual(await get_settings(), {"mode": "prod"})
+        self.assertEqual(await get_settings(), {"mode": "prod"})
+        self.assertEqual(calls["count"], 1)
+
+        invalidate_global_property("async_global_key")
+        self.assertEqual(await get_settings(), {"mode": "prod"})
+        self.assertEqual(calls["count"], 2)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_cache_global_property_serves_stale_value_while_locked(self):
+        @cache_global_property("async_global_stale_key", timeout=60, stale_timeout=30)
+        async def get_settings():
+            return "new"
+
+        await cache.aset("async_global_stale_key", _CacheEntry("old", time.time() - 1, 0))
+        await cache.aadd("async_global_stale_key:lock", 1)
+        self.assertEqual(await get_settings(), "old")
+        await cache.adelete("async_global_stale_key:lock")
+        self.assertEqual(await get_settings(), "new")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_cache_function_result(self):
+        calls = {"count": 0}
+
+        @cache_function_result("async_greeting", timeout=60, tags=lambda name: [f"name:{name}"])
+        async def get_greeting(name):
+            calls["count"] += 1
+            return f"hello {name}"
+
+        self.assertEqual(await get_greeting("a"), "hello a")
+        self.assertEqual(await get_greeting("a"), "hello a")
+        self.assertEqual(calls["count"], 1)
+
+        invalidate_tag("name:a")
+        self.assertEqual(await get_greeting("a"), "hello a")
+        self.assertEqual(calls["count"], 2)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_cache_current_request_property_computes_once(self):
+        rf = RequestFactory()
+        calls = {"count": 0}
+
+        @cache_current_request_property("async_permissions")
+        async def get_perms(request):
+            calls["count"] += 1
+            await asyncio.sleep(0.01)
+            return ["read"]
+
+        request = rf.get("/sample")
+        results = await asyncio.gather(get_perms(request), get_perms(request))
+        self.assertEqual(results, [["read"], ["read"]])
+        self.assertEqual(await get_perms(request), ["read"])
+        self.assertEqual(calls["count"], 1)
+
     # ------------------------------------------------------------------------------------------------------------------
     def test_cache_current_request_property_per_request(self):
         rf = RequestFactory()
@@ -87,3 +417,100 @@ class CachingDecoratorsTestCase(TestCase):
 
         _ = ser2.get_dummy(obj)  # compute again in ser2 (separate cache)
         assert ser2.calls == 1
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_serializer_batch_loader_resolves_page_at_once(self):
+        class DummyObj:
+            def __init__(self, id_):
+                self.id = id_
+
+        calls = {"batch": 0, "single": 0}
+
+        class DummySerializer(serializers.Serializer):
+            plan = serializers.SerializerMethodField()
+
+            def _load_plans(self, objs):
+                calls["batch"] += 1
+                # Last object is not resolved by the batch loader
+                return {obj.id: f"plan-{obj.id}" for obj in objs[:-1]}
+
+            @cache_serializer_result_per_object("plan", batch_loader=_load_plans)
+            def get_plan(self, obj: DummyObj) -> Any:
+                calls["single"] += 1
+                return f"single-{obj.id}"
+
+        objs = [DummyObj(i) for i in range(5)]
+        data = DummySerializer(objs, many=True).data
+        self.assertEqual([row["plan"] for row in data], ["plan-0", "plan-1", "plan-2", "plan-3", "single-4"])
+        self.assertEqual(calls["batch"], 1)
+        self.assertEqual(calls["single"], 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_serializer_batch_loader_runs_once_for_sparse_results(self):
+        class DummyObj:
+            def __init__(self, id_):
+                self.id = id_
+
+        batches = []
+        calls = {"single": 0}
+
+        def _load_plans(serializer, objs):
+            batches.append([obj.id for obj in objs])
+            # Only even ids have a plan
+            return {obj.id: f"plan-{obj.id}" for obj in objs if obj.id % 2 == 0}
+
+        class DefaultSerializer(serializers.Serializer):
+            plan = serializers.SerializerMethodField()
+
+            @cache_serializer_result_per_object("plan", batch_loader=_load_plans, batch_default=None)
+            def get_plan(self, obj: DummyObj) -> Any:
+                calls["single"] += 1
+                return f"single-{obj.id}"
+
+        class FallbackSerializer(DefaultSerializer):
+            @cache_serializer_result_per_object("plan", batch_loader=_load_plans)
+            def get_plan(self, obj: DummyObj) -> Any:
+                calls["single"] += 1
+                return f"single-{obj.id}"
+
+        objs = [DummyObj(i) for i in range(10)]
+        data = DefaultSerializer(objs, many=True).data
+        self.assertEqual([row["plan"] for row in data], [f"plan-{i}" if i % 2 == 0 else None for i in range(10)])
+        self.assertEqual(batches, [list(range(10))])
+        self.assertEqual(calls["single"], 0)
+
+        # Without a default, the objects left out fall back to the method, without running the loader again
+        batches.clear()
+        data = FallbackSerializer(objs, many=True).data
+        self.assertEqual(
+            [row["plan"] for row in data], [f"plan-{i}" if i % 2 == 0 else f"single-{i}" for i in range(10)]
+        )
+        self.assertEqual(batches, [list(range(10))])
+        self.assertEqual(calls["single"], 5)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_cache_serializer_cache_is_bounded(self):
+        class DummyObj:
+            def __init__(self, id_):
+                self.id = id_
+
+        class DummySerializer:
+            def __init__(self):
+                self.calls = 0
+
+            @cache_serializer_result_per_object("bounded", maxsize=2)
+            def get_dummy(self, obj: DummyObj) -> Any:
+                self.calls += 1
+                return obj.id
+
+        ser = DummySerializer()
+        objs = [DummyObj(i) for i in range(3)]
+        for obj in objs:
+            ser.get_dummy(obj)
+        self.assertEqual(len(getattr(ser, "_cache_bounded")), 2)
+
+        # Oldest entry was dropped, newest ones are still cached
+        ser.get_dummy(objs[2])
+        self.assertEqual(ser.calls, 3)
+        ser.get_dummy(objs[0])
+        self.assertEqual(ser.calls, 4)
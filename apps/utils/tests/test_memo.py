@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+from django.test import RequestFactory
+
+from apps.users.models import User
+from apps.utils.cache import cache_current_scope_result
+from apps.utils.memo import get_current_memo_scope, memo_scope
+from apps.utils.middlewares import MemoScopeMiddleware
+from apps.utils.testing import TestCase
+from config.celery import app
+
+
+@cache_current_scope_result("memo_user_by_username")
+def get_user_by_username(username: str):
+    return User.objects.filter(username=username).first()
+
+
+class MemoScopeTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.user = User.objects.create_user(username="memo_user", password="password")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_results_are_memoized_within_scope(self):
+        with memo_scope("test") as scope:
+            with self.assertNumQueries(1):
+                self.assertEqual(get_user_by_username("memo_user"), self.user)
+                self.assertEqual(get_user_by_username("memo_user"), self.user)
+                self.assertEqual(get_user_by_username(username="memo_user"), self.user)
+            self.assertIsNone(get_user_by_username("missing_user"))
+
+        self.assertEqual(scope.hits, 2)
+        self.assertEqual(scope.misses, 2)
+        self.assertIsNone(get_current_memo_scope())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_results_are_not_memoized_outside_scope(self):
+        with self.assertNumQueries(2):
+            get_user_by_username("memo_user")
+            get_user_by_username("memo_user")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_nested_scopes_do_not_share_values(self):
+        with memo_scope("outer") as outer:
+            get_user_by_username("memo_user")
+            with memo_scope("inner") as inner:
+                get_user_by_username("memo_user")
+            get_user_by_username("memo_user")
+
+        self.assertEqual((outer.hits, outer.misses), (1, 1))
+        self.assertEqual((inner.hits, inner.misses), (0, 1))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_middleware_opens_scope_per_request(self):
+        scopes = []
+
+        def get_response(request):
+            scope = get_current_memo_scope()
+            assert scope is not None
+            scopes.append(scope)
+            get_user_by_username("memo_user")
+            get_user_by_username("memo_user")
+            return None
+
+        middleware = MemoScopeMiddleware(get_response)
+        middleware(RequestFactory().get("/api/v1/users/"))
+        middleware(RequestFactory().get("/api/v1/users/"))
+
+        self.assertEqual(len(scopes), 2)
+        self.assertIsNot(scopes[0], scopes[1])
+        self.assertEqual(scopes[0].name, "GET /api/v1/users/")
+        self.assertEqual((scopes[0].hits, scopes[0].misses), (1, 1))
+        self.assertIsNone(get_current_memo_scope())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_celery_task_runs_in_its_own_scope(self):
+        @app.task
+        def memo_task():
+            get_user_by_username("memo_user")
+            get_user_by_username("memo_user")
+            scope = get_current_memo_scope()
+            assert scope is not None
+            return scope.hits, scope.misses
+
+        self.assertEqual(memo_task.apply().get(), (1, 1))
+        self.assertIsNone(get_current_memo_scope())
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_calls_share_a_single_computation(self):
+        calls = {"count": 0}
+
+        @cache_current_scope_result("memo_async")
+        async def compute(value: int):
+            calls["count"] += 1
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        async def run_request():
+            with memo_scope("request") as scope:
+                results = await asyncio.gather(compute(2), compute(2), compute(3))
+            return results, scope
+
+        (results_a, scope_a), (results_b, scope_b) = await asyncio.gather(run_request(), run_request())
+        self.assertEqual(results_a, [4, 4, 6])
+        self.assertEqual(results_b, [4, 4, 6])
+        self.assertEqual(calls["count"], 4)
+        self.assertEqual((scope_a.hits, scope_a.misses), (1, 2))
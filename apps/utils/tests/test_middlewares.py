@@ -0,0 +1,80 @@
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory
+from django.urls import reverse
+
+from apps.utils.checks import check_browser_middleware
+from apps.utils.middlewares import BrowserMiddleware
+from apps.utils.testing import TestCase
+
+
+class BrowserMiddlewareTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_api_requests_skip_browser_middleware(self):
+        requests = []
+
+        def get_response(request):
+            requests.append(request)
+            return HttpResponse()
+
+        middleware = BrowserMiddleware(get_response)
+        response = middleware(RequestFactory().get("/api/v1/settings/current/"))
+        self.assertFalse(hasattr(requests[0], "session"))
+        self.assertFalse(hasattr(requests[0], "user"))
+        self.assertNotIn("X-Frame-Options", response)
+
+        response = middleware(RequestFactory().get("/admin/"))
+        self.assertTrue(hasattr(requests[1], "session"))
+        self.assertTrue(hasattr(requests[1], "user"))
+        self.assertEqual(response["X-Frame-Options"], "SAMEORIGIN")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_api_responses_do_not_set_cookies(self):
+        client = Client()
+        response = client.get(reverse("common-settings-current"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.cookies), 0)
+        self.assertNotIn("X-Frame-Options", response)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_browser_pages_run_view_hooks(self):
+        # CSRF protection is a view hook of the nested middleware
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(reverse("admin:login"), {"username": "admin", "password": "password"})
+        self.assertEqual(response.status_code, 403)
+
+        response = client.get(reverse("admin:login"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("csrftoken", response.cookies)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def test_async_requests(self):
+        client = AsyncClient()
+        response = await client.get(reverse("common-settings-current"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Frame-Options", response)
+
+        response = await client.get(reverse("admin:login"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Frame-Options"], "SAMEORIGIN")
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_check_requires_security_middleware_in_browser_middleware(self):
+        self.assertEqual(check_browser_middleware(None), [])
+
+        browser_middleware = [
+            m for m in settings.BROWSER_MIDDLEWARE if m != "django.middleware.csrf.CsrfViewMiddleware"
+        ]
+        with self.settings(BROWSER_MIDDLEWARE=browser_middleware):
+            errors = check_browser_middleware(None)
+        self.assertEqual([error.id for error in errors], ["utils.E002"])
+        self.assertIn("CsrfViewMiddleware", errors[0].msg)
+
+        middleware = [m for m in settings.MIDDLEWARE if m != "apps.utils.middlewares.BrowserMiddleware"]
+        with self.settings(MIDDLEWARE=middleware):
+            self.assertEqual([error.id for error in check_browser_middleware(None)], ["utils.E001"])
@@ -0,0 +1,41 @@
+import logging
+import time
+import uuid
+from unittest import mock
+
+from apps.dashboard.models import GlobalSetting
+from apps.users.models import User
+from apps.utils.models import uuid7
+from apps.utils.testing import TestCase
+
+
+class UUIDv7ModelTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_uuid7_is_version_7_with_timestamp(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertTrue(before <= value.int >> 80 <= after)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_uuid7_is_increasing_within_millisecond(self):
+        with mock.patch("time.time_ns", return_value=1_700_000_000_000_000_000):
+            values = [uuid7() for _ in range(1000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_models_have_uuid7_primary_keys(self):
+        users = [User.objects.create_user(username=f"user{i}", password="password") for i in range(3)]
+        setting = GlobalSetting.objects.create(name="Test")
+
+        self.assertEqual([user.id.version for user in users], [7, 7, 7])
+        self.assertEqual(users, sorted(users, key=lambda user: user.id))
+        self.assertEqual(setting.id.version, 7)
@@ -0,0 +1,65 @@
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+
+from apps.users.apis.customer.serializers import UserCustomerSerializer
+from apps.users.models import User
+from apps.utils.pagination import KeysetPagination
+from apps.utils.testing import TestCase
+
+
+class UserListView(generics.ListAPIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    queryset = User.objects.all()
+    serializer_class = UserCustomerSerializer
+    pagination_class = KeysetPagination
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        now = timezone.now()
+        # Pairs of users joined at the same time, ordered by their ids
+        self.users = User.objects.bulk_create_validated(
+            [
+                User(username=f"user{i}", password="password", date_joined=now - timedelta(minutes=i // 2))
+                for i in range(30)
+            ]
+        )
+        self.factory = APIRequestFactory()
+
+    def get(self, url: str = "/users/", **params):
+        return UserListView.as_view()(self.factory.get(url, params or None))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_pages_follow_ordering_without_count(self):
+        expected = [str(user.id) for user in sorted(self.users, key=lambda u: (u.date_joined, u.id), reverse=True)]
+        ids: list[str] = []
+        url, pages = "/users/?page_size=4", 0
+        while url and pages < 10:
+            with self.assertNumQueries(1):
+                response = self.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(user["id"] for user in response.data["results"])
+            url, pages = response.data["next"], pages + 1
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 8)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_page_size_is_limited_and_count_is_optional(self):
+        with self.assertNumQueries(2):
+            response = self.get(page_size=100, count="true")
+        self.assertEqual(response.data["count"], 30)
+        self.assertEqual(len(response.data["results"]), 25)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_tampered_cursor_is_rejected(self):
+        next_url = self.get().data["next"]
+        self.assertEqual(self.get(next_url + "x").status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.get(cursor="cD0yMDI1").status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,128 @@
+import logging
+from unittest import mock
+
+import redis
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api_auth.throttling import LoginIPThrottle, LoginUsernameThrottle
+from apps.utils import throttling
+from apps.utils.cache_breaker import cache_breaker
+from apps.utils.testing import TestCase
+from apps.utils.throttling import LocalTokenBuckets, consume_token, local_token_buckets
+
+
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        cache_breaker.reset()
+        local_token_buckets.clear()
+
+    def tearDown(self):
+        cache_breaker.reset()
+        local_token_buckets.clear()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_local_bucket_allows_burst_then_refills(self):
+        buckets = LocalTokenBuckets()
+        with mock.patch.object(throttling.time, "monotonic", return_value=100.0):
+            self.assertEqual(buckets.consume("key", capacity=2, rate=0.5), (True, 0.0))
+            self.assertEqual(buckets.consume("key", capacity=2, rate=0.5), (True, 0.0))
+            self.assertEqual(buckets.consume("key", capacity=2, rate=0.5), (False, 2.0))
+            self.assertTrue(buckets.consume("other", capacity=2, rate=0.5)[0])
+        with mock.patch.object(throttling.time, "monotonic", return_value=102.0):
+            self.assertEqual(buckets.consume("key", capacity=2, rate=0.5), (True, 0.0))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_local_buckets_prune_full_buckets(self):
+        buckets = LocalTokenBuckets(max_size=2)
+        with mock.patch.object(throttling.time, "monotonic", return_value=100.0):
+            buckets.consume("a", capacity=1, rate=1)
+            buckets.consume("b", capacity=1, rate=1)
+        with mock.patch.object(throttling.time, "monotonic", return_value=200.0):
+            buckets.consume("c", capacity=1, rate=1)
+        self.assertEqual(set(buckets._buckets), {"c"})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_consume_token_runs_script_in_redis(self):
+        client = mock.Mock()
+        client.register_script.return_value.return_value = [0, "1.5"]
+        with mock.patch.object(throttling, "get_redis_client", return_value=client):
+            self.assertEqual(consume_token("key", capacity=5, rate=1), (False, 1.5))
+        client.register_script.assert_called_once_with(throttling.TOKEN_BUCKET_SCRIPT)
+        client.register_script.return_value.assert_called_once_with(keys=["key"], args=[5, 1, 1])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_consume_token_falls_back_to_local_buckets_when_redis_fails(self):
+        client = mock.Mock()
+        client.register_script.return_value.side_effect = redis.ConnectionError("down")
+        with mock.patch.object(throttling, "get_redis_client", return_value=client):
+            for _ in range(cache_breaker.failure_threshold):
+                self.assertTrue(consume_token("key", capacity=10, rate=1)[0])
+            self.assertTrue(cache_breaker.is_open)
+            # Redis is not tried again while the breaker is open
+            client.register_script.return_value.reset_mock()
+            self.assertTrue(consume_token("key", capacity=10, rate=1)[0])
+            client.register_script.return_value.assert_not_called()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_is_throttled_by_username_before_hashing(self):
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        with (
+            mock.patch.object(LoginUsernameThrottle, "get_rate", return_value="2/min"),
+            mock.patch("apps.api_auth.backends.hash_password") as hash_password,
+        ):
+            for _ in range(2):
+                response = client.post(url, {"username": "Someone", "password": "password"}, format="json")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = client.post(url, {"username": "someone ", "password": "password"}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(response["Retry-After"], "30")
+            self.assertEqual(hash_password.call_count, 2)
+
+            # Other accounts are not affected
+            response = client.post(url, {"username": "other", "password": "password"}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_login_rejected_by_ip_does_not_charge_username(self):
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        with (
+            mock.patch.object(LoginIPThrottle, "get_rate", return_value="1/min"),
+            mock.patch.object(LoginUsernameThrottle, "get_bucket_key", return_value="someone") as get_bucket_key,
+        ):
+            client.post(url, {"username": "someone", "password": "password"}, format="json")
+            response = client.post(url, {"username": "someone", "password": "password"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        get_bucket_key.assert_called_once()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_ip_throttle_ignores_spoofed_forwarded_for(self):
+        client = APIClient()
+        url = reverse("customer-auth-login")
+        with mock.patch.object(LoginIPThrottle, "get_rate", return_value="2/min"):
+            for i in range(2):
+                data = {"username": f"user{i}", "password": "password"}
+                response = client.post(url, data, format="json", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            data = {"username": "user2", "password": "password"}
+            response = client.post(url, data, format="json", HTTP_X_FORWARDED_FOR="10.0.0.2")
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+            # Behind a proxy, only the address appended by the proxy is trusted
+            local_token_buckets.clear()
+            with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}):
+                for i in range(2):
+                    data = {"username": f"user{i}", "password": "password"}
+                    forwarded_for = f"10.0.0.{i}, 192.168.1.1"
+                    response = client.post(url, data, format="json", HTTP_X_FORWARDED_FOR=forwarded_for)
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                data = {"username": "user2", "password": "password"}
+                response = client.post(url, data, format="json", HTTP_X_FORWARDED_FOR="10.0.0.2, 192.168.1.1")
+                self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+                response = client.post(url, data, format="json", HTTP_X_FORWARDED_FOR="10.0.0.2, 192.168.1.2")
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
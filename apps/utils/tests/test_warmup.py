@@ -0,0 +1,62 @@
+import logging
+import threading
+from unittest import mock
+
+from apps.utils import warmup
+from apps.utils.cache import cache_global_property, clear_caches
+from apps.utils.testing import TestCase
+
+
+class WarmupTestCase(TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        clear_caches()
+
+    def tearDown(self):
+        clear_caches()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_global_property_is_loaded_on_warmup(self):
+        calls = []
+
+        with mock.patch.dict(warmup._warmers, clear=True):
+
+            @cache_global_property("warmup_global_key", timeout=60, warmup=True)
+            def get_value():
+                calls.append(1)
+                return "value"
+
+            statuses = warmup.run_warmup(budget=5)
+
+        self.assertEqual(statuses, {"warmup_global_key": "ok"})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(get_value(), "value")
+        self.assertEqual(len(calls), 1)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_builtin_warmers_are_registered(self):
+        self.assertIn("apps.utils.warmup.warmup_url_resolver", warmup._warmers)
+        self.assertIn("apps.utils.warmup.warmup_translations", warmup._warmers)
+        self.assertIn("current_global_settings", warmup._warmers)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_failed_warmer_does_not_stop_the_others(self):
+        def failing():
+            raise ValueError("dependency is down")
+
+        with mock.patch.dict(warmup._warmers, {"failing": failing, "working": lambda: None}, clear=True):
+            statuses = warmup.run_warmup(budget=5)
+
+        self.assertEqual(statuses, {"failing": "failed", "working": "ok"})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def test_slow_warmer_does_not_exceed_budget(self):
+        release = threading.Event()
+
+        with mock.patch.dict(warmup._warmers, {"slow": lambda: release.wait(5)}, clear=True):
+            try:
+                statuses = warmup.run_warmup(budget=0.1)
+            finally:
+                release.set()
+
+        self.assertEqual(statuses, {"slow": "pending"})
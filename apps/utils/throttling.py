@@ -0,0 +1,201 @@
+import hashlib
+import threading
+import time
+from typing import Optional
+
+import structlog
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from apps.utils.cache import get_redis_client
+from apps.utils.cache_breaker import CACHE_BACKEND_ERRORS, cache_breaker
+
+logger = structlog.get_logger(__name__)
+
+# Refills the bucket for the time elapsed since it was last used, then takes `cost` tokens if there are enough.
+# Runs atomically in redis, so a check is a single round trip. The redis clock is used, so all workers agree.
+# Returns whether the tokens were taken, and the seconds to wait otherwise (as a string, lua numbers are truncated).
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(wait)}
+"""
+
+
+class LocalTokenBuckets:
+    """
+    Token buckets in process memory, used when redis is not configured or unreachable.
+    Limits are then per process instead of shared by all workers.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, rate: float, cost: int = 1) -> tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            if key not in self._buckets and len(self._buckets) >= self.max_size:
+                self._prune(now)
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def _prune(self, now: float):
+        # Full buckets are the same as missing ones
+        for key in [key for key, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+
+local_token_buckets = LocalTokenBuckets()
+
+
+def consume_token(key: str, capacity: int, rate: float, cost: int = 1) -> tuple[bool, float]:
+    """
+    Take `cost` tokens from the bucket `key`, which holds up to `capacity` tokens and refills `rate` tokens per second.
+    Buckets are kept in redis (guarded by the shared cache circuit breaker), or in process memory as a fallback.
+
+    Returns:
+        Whether the tokens were taken, and if not, the seconds until enough tokens are available.
+    """
+    client = get_redis_client()
+    if client is not None and cache_breaker.allow_request():
+        try:
+            # Sent with EVALSHA, the script itself is only sent again if redis does not know it
+            script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, wait = script(keys=[key], args=[capacity, rate, cost])
+        except CACHE_BACKEND_ERRORS as e:
+            cache_breaker.record_failure(e)
+            logger.warning("could not check throttle in redis", key=key, e=e)
+        else:
+            cache_breaker.record_success()
+            return bool(allowed), float(wait)
+    return local_token_buckets.consume(key, capacity, rate, cost)
+
+
+# Throttles
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttles with a token bucket: bursts of up to N requests, refilled at N per period.
+    The rate is read from `DEFAULT_THROTTLE_RATES[scope]`, in the DRF format (eg. `5/min`).
+    Subclasses define `scope` and which bucket a request uses (`get_bucket_key`).
+    """
+
+    scope: Optional[str] = None
+
+    def __init__(self):
+        self.capacity, self.rate = self.parse_rate(self.get_rate())
+        self.wait_time: Optional[float] = None
+
+    def get_rate(self):
+        if self.scope is None:
+            raise ImproperlyConfigured(f"You must set a scope for '{self.__class__.__name__}' throttle")
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+
+    def parse_rate(self, rate: Optional[str]) -> tuple[int, float]:
+        """Bucket capacity and refill rate (tokens per second) of a rate like `5/min`. No rate disables throttling."""
+        if rate is None:
+            return 0, 0.0
+        num, period = rate.split("/")
+        duration = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+        return int(num), int(num) / duration
+
+    def get_bucket_key(self, request, view) -> Optional[str]:
+        """Identity of the bucket of the request, or `None` to not throttle it."""
+        raise NotImplementedError(".get_bucket_key() must be overridden")
+
+    def allow_request(self, request, view) -> bool:
+        if not self.rate:
+            return True
+        ident = self.get_bucket_key(request, view)
+        if ident is None:
+            return True
+        allowed, self.wait_time = consume_token(f"throttle:{self.scope}:{ident}", self.capacity, self.rate)
+        return allowed
+
+    def wait(self) -> Optional[float]:
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Throttles by client IP. Needs nothing but the request headers."""
+
+    def get_bucket_key(self, request, view) -> Optional[str]:
+        return self.get_ident(request)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Throttles by authenticated user, or by client IP for anonymous requests."""
+
+    def get_bucket_key(self, request, view) -> Optional[str]:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Throttles by the account a request is trying to log in to (`username_fields` of the request data),
+    so an attack spread over many IPs is still limited per account.
+    Needs the request body, so list it after the throttles that do not.
+    """
+
+    username_fields = ("username", "email")
+
+    def get_bucket_key(self, request, view) -> Optional[str]:
+        if not hasattr(request.data, "get"):
+            return None
+        for field in self.username_fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value:
+                # Hashed, so keys stay short whatever is sent
+                return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+        return None
+
+
+class FailFastThrottlingMixin:
+    """
+    Rejects a request at the first throttle that does not allow it (DRF checks all of them),
+    so later throttles are neither checked nor charged for requests that are rejected anyway.
+    """
+
+    def check_throttles(self, request):
+        for throttle in self.get_throttles():  # type: ignore[attr-defined]
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())  # type: ignore[attr-defined]
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import structlog
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = structlog.get_logger(__name__)
+
+# Functions run when a worker process boots: name -> function
+_warmers: dict[str, Callable[[], Any]] = {}
+
+
+def register_warmup(fn: Callable[[], Any], name: Optional[str] = None) -> Callable[[], Any]:
+    """
+    Register a function to be called when a worker process boots, so the first requests do not pay for
+    cold caches. Can be used as a decorator. `cache_global_property(..., warmup=True)` registers itself.
+    """
+    _warmers[name or f"{fn.__module__}.{fn.__qualname__}"] = fn
+    return fn
+
+
+def run_warmup(budget: Optional[float] = None) -> dict[str, str]:
+    """
+    Run all the registered warm-up functions, giving up after `budget` seconds (`CACHE_WARMUP_BUDGET`).
+    Warm-up runs in a background thread so a slow dependency cannot block the worker from booting;
+    whatever is still running when the budget is exhausted finishes in the background.
+
+    Returns:
+        Status of each warm-up function (`ok`, `failed` or `pending` if it did not finish in time).
+    """
+    budget = settings.CACHE_WARMUP_BUDGET if budget is None else budget
+    statuses = {name: "pending" for name in _warmers}
+    thread = threading.Thread(target=_run_warmers, args=(statuses,), name="cache-warmup", daemon=True)
+    started_at = time.monotonic()
+    thread.start()
+    thread.join(timeout=budget)
+
+    pending = [name for name, status in statuses.items() if status == "pending"]
+    if pending:
+        logger.warning("cache warm-up exceeded its budget", budget=budget, pending=pending)
+    else:
+        logger.info("cache warm-up finished", duration=time.monotonic() - started_at)
+    return dict(statuses)
+
+
+def _run_warmers(statuses: dict[str, str]):
+    try:
+        for name, fn in list(_warmers.items()):
+            try:
+                fn()
+                statuses[name] = "ok"
+            except Exception as e:
+                statuses[name] = "failed"
+                logger.error("cache warm-up failed", warmer=name, e=e)
+    finally:
+        # Database connections opened by this thread are not reused by request threads
+        connections.close_all()
+
+
+@register_warmup
+def warmup_url_resolver():
+    # Imports every urlconf and view, and builds the reverse lookup tables
+    resolver = get_resolver()
+    _ = resolver.reverse_dict
+
+
+@register_warmup
+def warmup_translations():
+    # Loads and merges the translation catalogs of every language
+    for language_code, _ in settings.LANGUAGES:
+        with translation.override(language_code):
+            translation.gettext("")
@@ -1,9 +1,10 @@
 import os
 
 from celery import Celery, shared_task
-from celery.signals import worker_process_init
+from celery.signals import task_postrun, task_prerun, worker_process_init
 from django_structlog.celery.steps import DjangoStructLogInitStep
 
+from apps.utils.memo import close_memo_scope, open_memo_scope
 from config.otel import setup_open_telemetry
 
 # Cheat Sheet Documentation
@@ -34,6 +35,27 @@ def init_celery_tracing(*args, **kwargs):
     setup_open_telemetry("django-api-template-celery-worker")
 
 
+@worker_process_init.connect(weak=False)
+def warmup_celery_worker(*args, **kwargs):
+    # Imported here as Django is not set up yet when this module is loaded
+    from apps.utils.warmup import run_warmup
+
+    run_warmup()
+
+
+@task_prerun.connect(weak=False)
+def open_task_memo_scope(task_id=None, task=None, *args, **kwargs):
+    # Each task is a unit of work for `cache_current_scope_result`, like a request
+    task.request.memo_scope_token = open_memo_scope(task.name)
+
+
+@task_postrun.connect(weak=False)
+def close_task_memo_scope(task_id=None, task=None, *args, **kwargs):
+    token = getattr(task.request, "memo_scope_token", None)
+    if token is not None:
+        close_memo_scope(token)
+
+
 @shared_task
 def sample_echo_task():
     return {"message": "Hello World"}
@@ -30,6 +30,8 @@ from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.trace import Span, set_tracer_provider
 
+from apps.utils.cache_metrics import enable_cache_metrics
+
 
 def otel_request_instrument_request_hook(span: Span, request: requests.PreparedRequest):
     if span and span.is_recording():
@@ -85,6 +87,7 @@ def setup_open_telemetry(service_name: str):
     metric_reader = PeriodicExportingMetricReader(metric_exporter)
     meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
     set_meter_provider(meter_provider)
+    enable_cache_metrics()
 
     # Set logger provider
     log_exporter = OTLPLogExporter(endpoint=otel_endpoint)
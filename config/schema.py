@@ -1,3 +1,4 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
 from drf_spectacular.openapi import OpenApiParameter
 from drf_spectacular.plumbing import get_relative_url, set_query_parameters
 from drf_spectacular.settings import spectacular_settings
@@ -28,6 +29,14 @@ class CustomAutoSchema(AutoSchema):
         return super().get_override_parameters(*args, **kwargs) + global_params
 
 
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "apps.api_auth.authentication.CachedJWTAuthentication"
+
+
+class StatelessJWTScheme(SimpleJWTScheme):
+    target_class = "apps.api_auth.authentication.StatelessJWTAuthentication"
+
+
 class SpectacularCustomView(APIView):
     """
     This view returns a standalone HTML page which can be used for manual
@@ -60,9 +60,12 @@ django.conf.locale.LANG_INFO = LANG_INFO
 DATABASES = {
     "default": env.db("DATABASE_URL", default="sqlite:///sqlite.db"),
 }
-# Connection pooling for better DB performance
+# Persistent connections for better DB performance, one per thread that served a request.
+# Gunicorn runs threaded workers (`tools/infra/gunicorn.conf.py`), so a pod holds up to
+# GUNICORN_WORKERS * GUNICORN_THREADS connections (20 by default), plus the celery worker processes.
+# Keep that times the number of pods below the `max_connections` of the database.
 # https://docs.djangoproject.com/en/5.2/ref/settings/#conn-max-age
-DATABASES["default"]["CONN_MAX_AGE"] = 600
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DJANGO_CONN_MAX_AGE", 600)
 DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
 # https://docs.djangoproject.com/en/3.2/releases/3.2/#customizing-type-of-auto-created-primary-keys
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
@@ -117,7 +120,7 @@ CLEANUP_APPS = ["django_cleanup.apps.CleanupConfig"]
 # ---------------------------------------------------------- Authentication --------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#authentication-backends
 AUTHENTICATION_BACKENDS = [
-    "django.contrib.auth.backends.ModelBackend",
+    "apps.api_auth.backends.UsernameOrEmailBackend",
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-user-model
 AUTH_USER_MODEL = "users.User"
@@ -126,11 +129,21 @@ AUTH_USER_MODEL = "users.User"
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
 PASSWORD_HASHERS = [
     # https://docs.djangoproject.com/en/dev/topics/auth/passwords/#using-argon2-with-django
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "apps.users.hashers.TunedArgon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
+# Argon2 cost parameters (defaults are Django's), run `python manage.py calibrate_hasher` to tune them for the host
+ARGON2_TIME_COST = env.int("ARGON2_TIME_COST", 2)
+ARGON2_MEMORY_COST = env.int("ARGON2_MEMORY_COST", 102400)
+ARGON2_PARALLELISM = env.int("ARGON2_PARALLELISM", 8)
+# Password hashing pool used on login, see `apps.api_auth.services.password_hashing`.
+# Logins are rejected with 429 once more than WORKERS + MAX_QUEUE hashes are in progress in a gunicorn worker.
+# Keep WORKERS + MAX_QUEUE below GUNICORN_THREADS, so threads are left for the other requests.
+PASSWORD_HASHING_WORKERS = env.int("PASSWORD_HASHING_WORKERS", 2)
+PASSWORD_HASHING_MAX_QUEUE = env.int("PASSWORD_HASHING_MAX_QUEUE", 1)
+PASSWORD_HASHING_TIMEOUT = env.float("PASSWORD_HASHING_TIMEOUT", 5)
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -143,18 +156,25 @@ AUTH_PASSWORD_VALIDATORS = [
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "apps.utils.middlewares.MemoScopeMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "apps.utils.middlewares.BrowserMiddleware",
+    "django_structlog.middlewares.RequestMiddleware",
+    "apps.dashboard.middlewares.MaintenanceModeMiddleware",
+]
+# Run by `BrowserMiddleware` for the admin and the API docs only, API requests (JWT authenticated) skip them.
+# Run `python tools/benchmarks/middleware_overhead.py` to compare the two stacks.
+BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.common.BrokenLinkEmailsMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "django_structlog.middlewares.RequestMiddleware",
-    "apps.dashboard.middlewares.MaintenanceModeMiddleware",
 ]
+BROWSER_MIDDLEWARE_EXCLUDED_PATH_PREFIXES = ["/api/v1/"]
 
 # ---------------------------------------------------------- Static ----------------------------------------------------
 # Static files will be stored in '.static' directoy.
@@ -272,6 +292,8 @@ SECURE_BROWSER_XSS_FILTER = True
 # https://docs.djangoproject.com/en/dev/ref/settings/#x-frame-options
 X_FRAME_OPTIONS = "SAMEORIGIN"
 SILENCED_SYSTEM_CHECKS = ["security.W019"]
+# These checks only look for their middleware in MIDDLEWARE, `apps.utils.checks` looks in BROWSER_MIDDLEWARE instead
+SILENCED_SYSTEM_CHECKS += ["security.W002", "security.W003", "admin.E408", "admin.E409", "admin.E410"]
 
 # ---------------------------------------------------------- Email -----------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#admins
@@ -422,32 +444,75 @@ DJANGO_STRUCTLOG_CELERY_ENABLED = True
 
 # If redis URL is set, we will use it for caching
 REDIS_URL = env.str("REDIS_URL", default=None)
+# Keep this tight, a slow redis should not hold up requests (see `apps.utils.cache_breaker`)
+REDIS_SOCKET_TIMEOUT = env.float("REDIS_SOCKET_TIMEOUT", 0.25)
 if REDIS_URL:
     CACHES = {
         "default": {
             "BACKEND": "django.core.cache.backends.redis.RedisCache",
             "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "socket_timeout": REDIS_SOCKET_TIMEOUT,
+                "socket_connect_timeout": REDIS_SOCKET_TIMEOUT,
+            },
         }
     }
 
+# Maximum time (in seconds) a worker process waits for cache warm-up when it boots, see `apps.utils.warmup`
+CACHE_WARMUP_BUDGET = env.float("CACHE_WARMUP_BUDGET", 5)
+
 # ---------------------------------------------------------- Django Rest Framework -------------------------------------
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # Cursors instead of page numbers, so deep pages are as fast as the first one (see `KeysetPagination`)
+    "DEFAULT_PAGINATION_CLASS": "apps.utils.pagination.KeysetPagination",
     "PAGE_SIZE": env.int("DJANGO_PAGINATION_PAGE_SIZE", 10),
     "MAX_PAGE_SIZE": env.int("DJANGO_PAGINATION_MAX_PAGE_SIZE", 25),
     "DATETIME_FORMAT": "%Y-%m-%dT%H:%M:%S%z",
     "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
-    "DEFAULT_AUTHENTICATION_CLASSES": ["rest_framework_simplejwt.authentication.JWTAuthentication"],
+    "DEFAULT_AUTHENTICATION_CLASSES": ["apps.api_auth.authentication.CachedJWTAuthentication"],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "EXCEPTION_HANDLER": "drf_standardized_errors.handler.exception_handler",
     "DEFAULT_SCHEMA_CLASS": "config.schema.CustomAutoSchema",
+    # Number of reverse proxies in front of the app. Throttles key clients by the address the nearest proxy saw
+    # (the Nth address from the end of `X-Forwarded-For`), or by `REMOTE_ADDR` with 0, so clients can not spoof it.
+    "NUM_PROXIES": env.int("DJANGO_NUM_PROXIES", 0),
+    # Token buckets (see `apps.utils.throttling`): bursts of up to N requests, refilled at N per period
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": env.str("THROTTLE_RATE_LOGIN_IP", "30/min"),
+        "login_username": env.str("THROTTLE_RATE_LOGIN_USERNAME", "5/min"),
+        "token_ip": env.str("THROTTLE_RATE_TOKEN_IP", "60/min"),
+    },
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=180),
+    # Every refresh returns a new refresh token, and the used one is revoked
+    "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_REFRESH_SERIALIZER": "apps.api_auth.apis.common.serializers.RevocableTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "apps.api_auth.apis.common.serializers.KeyRingTokenVerifySerializer",
+    # Signed with the keys below (see `apps.api_auth.services.token_signing`)
+    "AUTH_TOKEN_CLASSES": ("apps.api_auth.tokens.AccessToken",),
 }
+# Maximum number of tokens checked by a single request to the token introspection endpoint
+TOKEN_INTROSPECTION_MAX_TOKENS = env.int("TOKEN_INTROSPECTION_MAX_TOKENS", 500)
+# Keys of the services allowed to introspect tokens, sent in the `X-Service-Key` header. Without keys, none is allowed.
+TOKEN_INTROSPECTION_SERVICE_KEYS = env.list("TOKEN_INTROSPECTION_SERVICE_KEYS", default=[])
+# PEM files of the P-256 (ES256) or Ed25519 (EdDSA) private keys of the tokens, the first one signs the tokens.
+# eg. `openssl genpkey -algorithm ed25519 -out jwt-2025-01.pem`. Without keys, tokens are signed with `SECRET_KEY`.
+JWT_SIGNING_KEY_FILES = env.list("JWT_SIGNING_KEY_FILES", default=[])
+# Accept tokens signed with `SECRET_KEY` before the keys were configured, until they expire
+JWT_VERIFY_LEGACY_TOKENS = env.bool("JWT_VERIFY_LEGACY_TOKENS", default=True)
+# Time (in seconds) the public keys (/.well-known/jwks.json) may be cached, publish new keys at least this early
+JWKS_CACHE_MAX_AGE = env.int("JWKS_CACHE_MAX_AGE", 3600)
+# Size (in bits) and number of hash functions of the revoked tokens bloom filter (`apps.api_auth.services`).
+# The defaults (2 MiB) keep false positives, which cost a query, under 1% for up to 1.5 million revoked tokens.
+TOKEN_REVOCATION_FILTER_BITS = env.int("TOKEN_REVOCATION_FILTER_BITS", 2**24)
+TOKEN_REVOCATION_FILTER_HASHES = env.int("TOKEN_REVOCATION_FILTER_HASHES", 7)
+# Time (in seconds) the user of an access token is cached for, see `apps.api_auth.authentication`
+JWT_USER_CACHE_TIMEOUT = env.int("JWT_USER_CACHE_TIMEOUT", 60)
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 # Enable CORS to all API endpoints.
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", default=[])
@@ -468,7 +533,11 @@ SPECTACULAR_SETTINGS = {
     "CONTACT": {"name": "kdsuneraavinash", "email": "sunera@ixdlabs.com"},
     "SERVE_PERMISSIONS": ["rest_framework.permissions.IsAdminUser"],
     "SERVE_AUTHENTICATION": ["rest_framework.authentication.SessionAuthentication"],
-    "AUTHENTICATION_WHITELIST": ["rest_framework_simplejwt.authentication.JWTAuthentication"],
+    "AUTHENTICATION_WHITELIST": [
+        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.api_auth.authentication.CachedJWTAuthentication",
+        "apps.api_auth.authentication.StatelessJWTAuthentication",
+    ],
     "POSTPROCESSING_HOOKS": ["drf_standardized_errors.openapi_hooks.postprocess_schema_enums"],
     "ENUM_NAME_OVERRIDES": {
         # Explanation: https://github.com/tfranzel/drf-spectacular/issues/482#issuecomment-904998597
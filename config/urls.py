@@ -8,6 +8,7 @@ from rest_framework.routers import DefaultRouter
 
 from apps.api_auth.apis.common.views import MeCommonViewSet, TokenCommonViewSet
 from apps.api_auth.apis.customer.views import AuthCustomerViewSet
+from apps.api_auth.views import jwks_view
 from apps.dashboard.apis.common.views import GlobalSettingsCommonViewSet
 from apps.users.apis.customer.views import CustomerViewSet
 from apps.utils.views import PrefixedDefaultRouter
@@ -32,6 +33,7 @@ urlpatterns = [
     path("api/v1/", include(common_router.urls)),
     path("api/schema/", spectacular_api_view, name="schema"),
     path("api/docs/", spectacular_api_docs_view, name="api_docs"),
+    path(".well-known/jwks.json", jwks_view, name="jwks"),
     # Admin site URLs
     path("admin/", admin.site.urls),
     path("", RedirectView.as_view(pattern_name="admin:index")),
@@ -0,0 +1,89 @@
+"""
+Compares the cache codecs in `apps.utils.cache_codecs` for the payloads we cache.
+
+Usage:
+    python tools/benchmarks/cache_codecs.py --iterations 20000
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import timeit
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from apps.dashboard.models import GlobalSetting  # noqa: E402
+from apps.utils.cache_codecs import (  # noqa: E402
+    CacheCodec,
+    ModelCodec,
+    MsgpackCodec,
+    PickleCodec,
+)
+
+
+class CodecBenchmark:
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+
+    def measure(self, name: str, value: Any, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+        payload = encode(value)
+        encode_time = timeit.timeit(lambda: encode(value), number=self.iterations) / self.iterations
+        decode_time = timeit.timeit(lambda: decode(payload), number=self.iterations) / self.iterations
+        print(f"{name:<36} {len(payload):>8} {encode_time * 1e6:>12.2f} {decode_time * 1e6:>12.2f}")
+
+    def measure_codec(self, name: str, value: Any, codec: CacheCodec):
+        self.measure(name, value, codec.encode, codec.decode)
+
+    def run(self):
+        now = timezone.now()
+        setting = GlobalSetting(
+            id=uuid.uuid4(),
+            created=now,
+            modified=now,
+            name="Default",
+            is_active=True,
+            is_maintenance_mode=False,
+            maintenance_mode_message="Service temporarily unavailable, try again later",
+        )
+        setting._state.adding = False
+        setting._state.db = "default"
+        json_like = {"items": [{"id": str(uuid.uuid4()), "name": f"item {i}", "rank": i} for i in range(200)]}
+
+        print(f"{'payload / codec':<36} {'bytes':>8} {'encode (us)':>12} {'decode (us)':>12}")
+        print("-" * 72)
+        self.measure("GlobalSetting / pickle (default)", setting, pickle.dumps, pickle.loads)
+        self.measure_codec("GlobalSetting / pickle 5", setting, PickleCodec())
+        self.measure_codec("GlobalSetting / model snapshot", setting, ModelCodec())
+        self.measure("dict / pickle (default)", json_like, pickle.dumps, pickle.loads)
+        self.measure_codec("dict / pickle 5", json_like, PickleCodec())
+        self.measure_codec("dict / pickle 5 + zlib", json_like, PickleCodec(compress="zlib"))
+        for compress in ["zstd", "lz4"]:
+            try:
+                self.measure_codec(f"dict / pickle 5 + {compress}", json_like, PickleCodec(compress=compress))
+            except ImproperlyConfigured as e:
+                print(f"{'dict / pickle 5 + ' + compress:<36} skipped: {e}")
+        try:
+            self.measure_codec("dict / msgpack", json_like, MsgpackCodec())
+            self.measure_codec("dict / msgpack + zlib", json_like, MsgpackCodec(compress="zlib"))
+        except ImproperlyConfigured as e:
+            print(f"{'dict / msgpack':<36} skipped: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache codecs.")
+    parser.add_argument("--iterations", type=int, default=10000, help="Number of encode/decode runs per codec")
+    args = parser.parse_args()
+
+    CodecBenchmark(iterations=args.iterations).run()
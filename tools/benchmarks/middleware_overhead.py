@@ -0,0 +1,93 @@
+"""
+Measures the per-request overhead of the middleware stack for API requests, with all the middleware
+run for every request (the previous setup) and with the browser-only middleware skipped for `/api/v1/`.
+
+Usage:
+    python tools/benchmarks/middleware_overhead.py --iterations 5000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.base import BaseHandler  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+from django.views.decorators.csrf import csrf_exempt  # noqa: E402
+
+from config.urls import urlpatterns as project_urlpatterns  # noqa: E402
+
+BROWSER_MIDDLEWARE_PATH = "apps.utils.middlewares.BrowserMiddleware"
+# Same in both stacks: maintenance mode needs the database, and the others are only enabled in development
+SKIPPED_MIDDLEWARE = [
+    "apps.dashboard.middlewares.MaintenanceModeMiddleware",
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "zeal.middleware.zeal_middleware",
+]
+
+
+@csrf_exempt
+def ping_view(request):
+    # Like DRF views, which are CSRF exempt
+    return HttpResponse(b"{}", content_type="application/json")
+
+
+# Project urls are kept as some middleware (eg. debug toolbar) reverse them
+urlpatterns = [path("api/v1/ping/", ping_view), path("admin/ping/", ping_view), *project_urlpatterns]
+
+
+class MiddlewareBenchmark:
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+        self.factory = RequestFactory()
+
+    def full_stack(self) -> list[str]:
+        middleware = []
+        for middleware_path in settings.MIDDLEWARE:
+            if middleware_path == BROWSER_MIDDLEWARE_PATH:
+                middleware.extend(settings.BROWSER_MIDDLEWARE)
+            elif middleware_path not in SKIPPED_MIDDLEWARE:
+                middleware.append(middleware_path)
+        return middleware
+
+    def lean_stack(self) -> list[str]:
+        return [m for m in settings.MIDDLEWARE if m not in SKIPPED_MIDDLEWARE]
+
+    def measure(self, name: str, middleware: list[str], url: str):
+        with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__, ALLOWED_HOSTS=["testserver"]):
+            handler = BaseHandler()
+            handler.load_middleware()
+            response = handler.get_response(self.factory.get(url))
+            assert response.status_code == 200, response
+            duration = timeit.timeit(lambda: handler.get_response(self.factory.get(url)), number=self.iterations)
+        print(f"{name:<36} {len(middleware):>12} {duration / self.iterations * 1e6:>12.2f}")
+
+    def run(self):
+        print(f"{'stack / path':<36} {'middleware':>12} {'per request (us)':>12}")
+        print("-" * 66)
+        self.measure("full stack / api", self.full_stack(), "/api/v1/ping/")
+        self.measure("lean stack / api", self.lean_stack(), "/api/v1/ping/")
+        self.measure("full stack / admin", self.full_stack(), "/admin/ping/")
+        self.measure("lean stack / admin", self.lean_stack(), "/admin/ping/")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the middleware overhead of API requests.")
+    parser.add_argument("--iterations", type=int, default=5000, help="Number of requests per stack")
+    args = parser.parse_args()
+
+    # Request logging costs the same in both stacks and would flood the output
+    logging.disable(logging.CRITICAL)
+    MiddlewareBenchmark(iterations=args.iterations).run()
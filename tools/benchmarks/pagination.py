@@ -0,0 +1,95 @@
+"""
+Compares page number pagination (`PageNumberPagination`, the previous default) with cursor pagination
+(`apps.utils.pagination.KeysetPagination`) when listing users, at increasing depths into the list.
+Runs on the configured database, which needs enough users for the deepest page (see the `seed_data` command).
+
+Usage:
+    python manage.py seed_data --users 2000000
+    python tools/benchmarks/pagination.py --depths 0 10000 100000 1000000 --iterations 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from rest_framework import generics  # noqa: E402
+from rest_framework.pagination import Cursor, PageNumberPagination  # noqa: E402
+from rest_framework.permissions import AllowAny  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from apps.users.apis.customer.serializers import UserCustomerSerializer  # noqa: E402
+from apps.users.models import User  # noqa: E402
+from apps.utils.pagination import KeysetPagination  # noqa: E402
+
+
+class UserListView(generics.ListAPIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    queryset = User.objects.all()
+    serializer_class = UserCustomerSerializer
+
+
+class PaginationBenchmark:
+    def __init__(self, iterations: int):
+        self.iterations = iterations
+        self.factory = APIRequestFactory()
+        self.page_number_view = UserListView.as_view(pagination_class=PageNumberPagination)
+        self.keyset_view = UserListView.as_view(pagination_class=KeysetPagination)
+
+    def page_number_url(self, depth: int) -> str:
+        return f"/users/?page={depth // settings.REST_FRAMEWORK['PAGE_SIZE'] + 1}"
+
+    def keyset_url(self, depth: int) -> str:
+        # The cursor a client would have after paging down to `depth`
+        if depth == 0:
+            return "/users/"
+        previous_user = User.objects.all()[depth - 1]
+        paginator = KeysetPagination()
+        paginator.base_url = "/users/"
+        # Positions are the string of the first ordering field, see `CursorPagination._get_position_from_instance`
+        cursor = Cursor(offset=0, reverse=False, position=str(previous_user.date_joined))  # type: ignore[arg-type]
+        return paginator.encode_cursor(cursor)
+
+    def measure(self, view, url: str) -> float:
+        response = view(self.factory.get(url))
+        assert response.status_code == 200, response.data
+        duration = timeit.timeit(lambda: view(self.factory.get(url)), number=self.iterations)
+        return duration / self.iterations * 1e3
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def run(self, depths: list[int]):
+        total = User.objects.count()
+        print(f"{total:,} users, pages of {settings.REST_FRAMEWORK['PAGE_SIZE']}")
+        print(f"{'depth':<18} {'page number (ms)':>22} {'cursor (ms)':>22}")
+        print("-" * 66)
+        for depth in depths:
+            if depth >= total:
+                print(f"{depth:<18,} {'not enough users':>46}")
+                continue
+            page_number = self.measure(self.page_number_view, self.page_number_url(depth))
+            keyset = self.measure(self.keyset_view, self.keyset_url(depth))
+            print(f"{depth:<18,} {page_number:>22.2f} {keyset:>22.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark page number and cursor pagination at deep offsets.")
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 1000, 10000, 100000, 1000000], help="Rows before the page"
+    )
+    parser.add_argument("--iterations", type=int, default=20, help="Number of requests per depth")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    PaginationBenchmark(iterations=args.iterations).run(args.depths)
@@ -0,0 +1,101 @@
+"""
+Compares random (uuid4) and time ordered (uuid7, see `apps.utils.models.UUIDv7Model`) primary keys:
+insert throughput and size of the primary key index, on the configured database (set `DATABASE_URL`
+to benchmark PostgreSQL). Rows are inserted in batches into scratch tables, which are dropped afterwards.
+
+Usage:
+    python tools/benchmarks/uuid_primary_keys.py --rows 2000000 --batch-size 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, models, transaction  # noqa: E402
+
+from apps.utils.models import uuid7  # noqa: E402
+
+TABLE_PREFIX = "benchmark_uuid_primary_keys"
+
+
+class UUIDPrimaryKeyBenchmark:
+    def __init__(self, rows: int, batch_size: int):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.field: models.UUIDField = models.UUIDField()
+
+    def create_table(self, table: str):
+        column_type = self.field.db_type(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE TABLE {table} (id {column_type} PRIMARY KEY, payload varchar(32) NOT NULL)")
+
+    def drop_table(self, table: str):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def get_index_size(self, table: str) -> int:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_relation_size(%s)", [f"{table}_pkey"])
+            else:
+                # The primary key of a rowid table is a separate index (requires SQLite built with dbstat)
+                cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [f"sqlite_autoindex_{table}_1"])
+            return cursor.fetchone()[0] or 0
+
+    def insert(self, table: str, generate: Callable[[], uuid.UUID]) -> tuple[float, float]:
+        """Total duration, and duration of the last batch, when the index is at its largest."""
+        sql = f"INSERT INTO {table} (id, payload) VALUES (%s, %s)"
+        duration = batch_duration = 0.0
+        for start in range(0, self.rows, self.batch_size):
+            rows = [
+                (self.field.get_db_prep_value(generate(), connection), "x" * 32)
+                for _ in range(min(self.batch_size, self.rows - start))
+            ]
+            started_at = time.perf_counter()
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            batch_duration = time.perf_counter() - started_at
+            duration += batch_duration
+        return duration, batch_duration
+
+    def measure(self, name: str, generate: Callable[[], uuid.UUID]):
+        table = f"{TABLE_PREFIX}_{name}"
+        self.create_table(table)
+        try:
+            duration, batch_duration = self.insert(table, generate)
+            index_size = self.get_index_size(table)
+        finally:
+            self.drop_table(table)
+        last_batch_size = self.rows % self.batch_size or self.batch_size
+        print(
+            f"{name:<12} {self.rows / duration:>16,.0f} {last_batch_size / batch_duration:>16,.0f}"
+            f" {index_size / 2**20:>18,.1f}"
+        )
+
+    def run(self):
+        print(f"Inserting {self.rows:,} rows in batches of {self.batch_size:,} ({connection.vendor})")
+        print(f"{'key':<12} {'rows/s':>16} {'last batch rows/s':>16} {'pkey index (MiB)':>18}")
+        print("-" * 66)
+        self.measure("uuid4", uuid.uuid4)
+        self.measure("uuid7", uuid7)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark uuid4 and uuid7 primary keys.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Number of rows inserted per key type")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Number of rows inserted per transaction")
+    args = parser.parse_args()
+
+    UUIDPrimaryKeyBenchmark(rows=args.rows, batch_size=args.batch_size).run()
@@ -1,10 +1,25 @@
+import os
+
 from config.otel import setup_open_telemetry
 
 bind = "0.0.0.0:8000"
-workers = 5
+workers = int(os.environ.get("GUNICORN_WORKERS", 5))
+# Threaded workers, so a request waiting on a slow call (eg. a password hash, see `PASSWORD_HASHING_WORKERS`)
+# does not block the whole worker. The hashing pool and its queue must use fewer threads than this.
+# Every thread keeps its own database connection open (see `CONN_MAX_AGE`): a pod holds up to workers * threads
+# connections, size both against the `max_connections` of the database divided by the number of pods.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 timeout = 120
 
 
 # https://signoz.io/docs/instrumentation/opentelemetry-python/#running-applications-with-gunicorn-uwsgi
 def post_fork(server, worker):
     setup_open_telemetry("django-api-template-backend")
+
+
+# Runs after the worker has loaded the application, so Django is ready (unlike in `post_fork`)
+def post_worker_init(worker):
+    from apps.utils.warmup import run_warmup
+
+    run_warmup()